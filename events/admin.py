@@ -1,4 +1,5 @@
-from django.contrib import admin
+from django.contrib import admin, messages
+from shifts.autoschedule import auto_schedule
 from .models import Event, Location
 
 # Register your models here.
@@ -8,6 +9,17 @@ class EventAdmin(admin.ModelAdmin):
     list_display = ('name', 'start_date', 'end_date')
     search_fields = ('name',)
     ordering = ('-start_date',)
+    actions = ['fill_open_shifts']
+
+    @admin.action(description='Auto-fill open shifts with qualified volunteers')
+    def fill_open_shifts(self, request, queryset):
+        for event in queryset:
+            assigned, open_places = auto_schedule(event, assigned_by=request.user)
+            self.message_user(
+                request,
+                f'{event.name}: assigned {len(assigned)} of {open_places} open places',
+                messages.SUCCESS,
+            )
 
 @admin.register(Location)
 class LocationAdmin(admin.ModelAdmin):
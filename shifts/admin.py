@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Position, Shift, ShiftVolunteer
+from .models import NotificationJob, Position, Shift, ShiftVolunteer
 
 # Register your models here.
 
@@ -13,3 +13,8 @@ class ShiftAdmin(admin.ModelAdmin):
     list_display = ('position', 'date', 'start_time', 'end_time', 'location', 'max_volunteers')
     list_filter = ('position', 'date', 'location')
     search_fields = ('position__name', 'location__name')
+
+@admin.register(NotificationJob)
+class NotificationJobAdmin(admin.ModelAdmin):
+    list_display = ('event', 'created_by', 'created_at', 'finished_at')
+    list_filter = ('event',)
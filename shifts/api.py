@@ -0,0 +1,221 @@
+"""
+Read-only JSON API, version 1, for signage screens and other clients.
+
+Every list takes ?fields=a,b to return only some fields, and ?limit= with the
+opaque ?cursor= from a page's "next" link to page through results. Responses
+carry an ETag built from the same data versions as the public day page, so a
+client polling with If-None-Match is answered with a 304 from the versions
+alone until the data actually changes.
+"""
+import base64
+import json
+from datetime import datetime
+from functools import wraps
+
+from django.core.exceptions import ValidationError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Q
+from django.http import JsonResponse
+from django.shortcuts import get_object_or_404
+from django.views.decorators.http import condition, require_GET
+
+from events.models import Event, Location
+
+from .cache import SCHEDULE_SCOPE, day_scope, get_versions, versions_etag
+from .layout import grid_shifts
+from .models import Position
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 500
+
+EVENT_FIELDS = {
+    "id": lambda event: event.id,
+    "name": lambda event: event.name,
+    "description": lambda event: event.description,
+    "start_date": lambda event: event.start_date,
+    "end_date": lambda event: event.end_date,
+}
+
+LOCATION_FIELDS = {
+    "id": lambda location: location.id,
+    "name": lambda location: location.name,
+    "description": lambda location: location.description,
+    "address": lambda location: location.address,
+}
+
+POSITION_FIELDS = {
+    "id": lambda position: position.id,
+    "name": lambda position: position.name,
+    "description": lambda position: position.description,
+    "color": lambda position: position.color,
+}
+
+SHIFT_FIELDS = {
+    "id": lambda shift: shift.id,
+    "location": lambda shift: shift.location_id,
+    "position": lambda shift: shift.position_id,
+    "date": lambda shift: shift.date,
+    "start_time": lambda shift: shift.start_time,
+    "end_time": lambda shift: shift.end_time,
+    "starts_at": lambda shift: shift.starts_at,
+    "ends_at": lambda shift: shift.ends_at,
+    "max_volunteers": lambda shift: shift.max_volunteers,
+    "volunteers": lambda shift: [volunteer.get_full_name() for volunteer in shift.volunteers.all()],
+}
+
+
+class ApiError(ValueError):
+    """A request the API can't answer, reported to the client as a 400."""
+
+
+def api_view(versions_func):
+    """
+    Make a read-only API view, answered with a 304 while the data versions
+    returned by versions_func(request, **kwargs) match the client's ETag.
+    """
+
+    def decorator(view):
+        def etag(request, *args, **kwargs):
+            return versions_etag(versions_func(request, *args, **kwargs))
+
+        conditional_view = require_GET(condition(etag_func=etag)(view))
+
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            try:
+                return conditional_view(request, *args, **kwargs)
+            except ApiError as e:
+                return JsonResponse({"error": str(e)}, status=400)
+
+        return wrapper
+
+    return decorator
+
+
+def _selected_fields(request, available):
+    """The fields asked for with ?fields=, or all of them."""
+    if not request.GET.get("fields"):
+        return list(available)
+    fields = [field.strip() for field in request.GET["fields"].split(",") if field.strip()]
+    unknown = [field for field in fields if field not in available]
+    if unknown:
+        raise ApiError(f"Unknown fields: {', '.join(unknown)}. Available: {', '.join(available)}")
+    return fields
+
+
+def _encode_cursor(values):
+    return base64.urlsafe_b64encode(json.dumps(values, cls=DjangoJSONEncoder).encode()).decode()
+
+
+def _after_cursor(queryset, ordering, cursor):
+    """Rows of queryset that come after the row the cursor points at, in ordering."""
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        if not isinstance(values, list) or len(values) != len(ordering):
+            raise ValueError
+        after = Q()
+        for index, field in enumerate(ordering):
+            after |= Q(**dict(zip(ordering[:index], values[:index])), **{f"{field}__gt": values[index]})
+        return queryset.filter(after)
+    except (ValueError, TypeError, ValidationError):
+        raise ApiError("Invalid cursor")
+
+
+def _page(request, queryset, ordering, serializers):
+    """
+    One page of serialized rows, with a link to the next one.
+
+    Pages are cut on the ordering fields rather than with an offset, so a page
+    costs the same deep into the list and rows are never skipped or repeated
+    when others are added meanwhile.
+    """
+    fields = _selected_fields(request, serializers)
+    try:
+        limit = min(int(request.GET.get("limit", DEFAULT_PAGE_SIZE)), MAX_PAGE_SIZE)
+    except ValueError:
+        raise ApiError("Invalid limit")
+    if limit < 1:
+        raise ApiError("Invalid limit")
+
+    queryset = queryset.order_by(*ordering)
+    if request.GET.get("cursor"):
+        queryset = _after_cursor(queryset, ordering, request.GET["cursor"])
+    rows = list(queryset[:limit + 1])
+
+    next_url = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        query = request.GET.copy()
+        query["cursor"] = _encode_cursor([getattr(rows[-1], field) for field in ordering])
+        next_url = request.build_absolute_uri(f"{request.path}?{query.urlencode()}")
+
+    return JsonResponse({
+        "results": [{field: serializers[field](row) for field in fields} for row in rows],
+        "next": next_url,
+    })
+
+
+def _schedule_versions(request, *args, **kwargs):
+    return get_versions(SCHEDULE_SCOPE)
+
+
+def _shift_versions(request, event_id):
+    """Versions of the days a shift list covers, read once per request."""
+    if not hasattr(request, "_shift_versions"):
+        date = _date_filter(request)
+        if date:
+            dates = [date]
+        else:
+            dates = get_object_or_404(Event, id=event_id).get_dates()
+        request._shift_versions = get_versions(SCHEDULE_SCOPE, *(day_scope(date) for date in dates))
+    return request._shift_versions
+
+
+def _date_filter(request):
+    if not request.GET.get("date"):
+        return None
+    try:
+        return datetime.strptime(request.GET["date"], "%Y-%m-%d").date()
+    except ValueError:
+        raise ApiError("Invalid date")
+
+
+@api_view(_schedule_versions)
+def event_list(request):
+    return _page(request, Event.objects.all(), ("start_date", "id"), EVENT_FIELDS)
+
+
+@api_view(_schedule_versions)
+def location_list(request, event_id):
+    event = get_object_or_404(Event, id=event_id)
+    return _page(request, Location.objects.filter(event=event), ("id",), LOCATION_FIELDS)
+
+
+@api_view(_schedule_versions)
+def position_list(request, event_id):
+    event = get_object_or_404(Event, id=event_id)
+    return _page(request, Position.objects.filter(event=event), ("id",), POSITION_FIELDS)
+
+
+@api_view(_shift_versions)
+def shift_list(request, event_id):
+    """
+    An event's shifts in start order, with the names of their volunteers.
+
+    Filter with ?date=YYYY-MM-DD for one day of the calendar and ?location=
+    for one location.
+    """
+    event = get_object_or_404(Event, id=event_id)
+    date = _date_filter(request)
+    locations = None
+    if request.GET.get("location"):
+        try:
+            locations = [int(request.GET["location"])]
+        except ValueError:
+            raise ApiError("Invalid location")
+
+    # The same shifts the calendar pages render
+    shifts = grid_shifts(event, date, date, locations)
+    if "volunteers" not in _selected_fields(request, SHIFT_FIELDS):
+        shifts = shifts.prefetch_related(None)
+    return _page(request, shifts, ("starts_at", "id"), SHIFT_FIELDS)
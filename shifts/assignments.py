@@ -0,0 +1,115 @@
+from collections import Counter
+
+from django.db import transaction
+from django.db.models import Count
+
+from volunteers.models import Volunteer
+
+from .cache import VOLUNTEERS_SCOPE, bump_versions, day_scope
+from .conflicts import Schedule, interval_minutes, shift_minutes
+from .live import publish_column_change
+from .models import Shift, ShiftVolunteer
+from .signals import reset_notifications
+
+
+def bulk_assign(pairs, assigned_by=None):
+    """
+    Assign volunteers to shifts, given (shift_id, volunteer_id) pairs.
+
+    Everything is validated with a handful of set-based queries and inserted
+    in one transaction. Pairs are accepted in order until a shift is full, so
+    a pair can fail while the others still go through. A volunteer is never
+    given two overlapping shifts, counting the ones they already have.
+
+    Returns (assigned, errors) where assigned is the list of created pairs
+    and errors a list of {"shift", "volunteer", "error"} dicts.
+    """
+    shift_ids = {shift_id for shift_id, _ in pairs}
+    volunteer_ids = {volunteer_id for _, volunteer_id in pairs}
+
+    assigned = []
+    errors = []
+
+    def reject(shift_id, volunteer_id, message):
+        errors.append({"shift": shift_id, "volunteer": volunteer_id, "error": message})
+
+    with transaction.atomic():
+        # Lock the shifts so concurrent requests can't both take their last place
+        shifts = {
+            shift.id: shift
+            for shift in Shift.objects.select_for_update()
+            .filter(id__in=shift_ids)
+            .only("id", "event", "location", "date", "starts_at", "ends_at", "max_volunteers")
+        }
+        known_volunteers = set(
+            Volunteer.objects.filter(id__in=volunteer_ids).values_list("id", flat=True)
+        )
+        taken = Counter(
+            dict(
+                ShiftVolunteer.objects.filter(shift_id__in=shifts)
+                .values("shift_id")
+                .annotate(count=Count("id"))
+                .values_list("shift_id", "count")
+            )
+        )
+        existing = set(
+            ShiftVolunteer.objects.filter(
+                shift_id__in=shifts, volunteer_id__in=known_volunteers
+            ).values_list("shift_id", "volunteer_id")
+        )
+        # The volunteers' bookings around the requested shifts, to refuse double bookings
+        intervals = {shift_id: shift_minutes(shift) for shift_id, shift in shifts.items()}
+        schedule = Schedule()
+        if shifts:
+            for volunteer_id, starts_at, ends_at in ShiftVolunteer.objects.filter(
+                volunteer_id__in=known_volunteers,
+                shift__starts_at__lt=max(shift.ends_at for shift in shifts.values()),
+                shift__ends_at__gt=min(shift.starts_at for shift in shifts.values()),
+            ).values_list("volunteer_id", "shift__starts_at", "shift__ends_at"):
+                schedule.book(volunteer_id, *interval_minutes(starts_at, ends_at))
+
+        for shift_id, volunteer_id in pairs:
+            shift = shifts.get(shift_id)
+            if shift is None:
+                reject(shift_id, volunteer_id, "Shift not found")
+            elif volunteer_id not in known_volunteers:
+                reject(shift_id, volunteer_id, "Volunteer not found")
+            elif (shift_id, volunteer_id) in existing:
+                reject(shift_id, volunteer_id, "Volunteer already assigned to this shift")
+            elif taken[shift_id] >= shift.max_volunteers:
+                reject(shift_id, volunteer_id, "Shift is full")
+            elif not schedule.is_free(volunteer_id, *intervals[shift_id]):
+                reject(shift_id, volunteer_id, "Volunteer already has an overlapping shift")
+            else:
+                existing.add((shift_id, volunteer_id))
+                taken[shift_id] += 1
+                schedule.book(volunteer_id, *intervals[shift_id])
+                assigned.append((shift_id, volunteer_id))
+
+        ShiftVolunteer.objects.bulk_create(
+            [
+                ShiftVolunteer(
+                    shift_id=shift_id,
+                    volunteer_id=volunteer_id,
+                    assigned_by=assigned_by,
+                )
+                for shift_id, volunteer_id in assigned
+            ],
+            ignore_conflicts=True,
+        )
+
+        # bulk_create skips the ShiftVolunteer signals, so reset and invalidate here
+        if assigned:
+            assigned_volunteers = {volunteer_id for _, volunteer_id in assigned}
+            dates = {shifts[shift_id].date for shift_id, _ in assigned}
+            transaction.on_commit(lambda: reset_notifications(assigned_volunteers))
+            transaction.on_commit(
+                lambda: bump_versions(VOLUNTEERS_SCOPE, *(day_scope(date) for date in dates))
+            )
+            for event_id, location_id, date in {
+                (shifts[shift_id].event_id, shifts[shift_id].location_id, shifts[shift_id].date)
+                for shift_id, _ in assigned
+            }:
+                publish_column_change(event_id, location_id, date)
+
+    return assigned, errors
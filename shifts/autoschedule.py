@@ -0,0 +1,124 @@
+import heapq
+from collections import defaultdict, namedtuple
+
+from django.db.models import Count
+
+from .assignments import bulk_assign
+from .conflicts import Schedule, interval_minutes
+from .models import PositionVolunteer, Shift, ShiftVolunteer
+
+# A shift to fill, with start/end in minutes on one timeline for the whole event
+OpenShift = namedtuple("OpenShift", "id position_id start end places")
+
+
+def solve(shifts, eligibility, booked=(), max_minutes=None):
+    """
+    Fill open shift places with eligible volunteers.
+
+    A greedy pass that visits the scarcest shifts first (fewest eligible
+    volunteers per open place) and gives each place to the eligible volunteer
+    with the fewest booked minutes who is free for the whole shift, which
+    keeps hours even across volunteers. A volunteer never works two
+    overlapping shifts and, with max_minutes, never goes over that total.
+
+    Args:
+        shifts: OpenShift tuples
+        eligibility: dict of position id to the ids of volunteers who can work it
+        booked: (volunteer_id, start, end) of shifts volunteers already have
+        max_minutes: optional cap on each volunteer's total minutes
+
+    Returns:
+        list of (shift_id, volunteer_id) pairs to assign
+    """
+    schedule = Schedule()
+    for volunteer_id, start, end in booked:
+        schedule.book(volunteer_id, start, end)
+
+    # Least-loaded volunteer first, per position. Entries go stale when a
+    # volunteer's minutes change, and are skipped when popped.
+    heaps = {}
+    for position_id, volunteer_ids in eligibility.items():
+        heap = [(schedule.minutes[volunteer_id], volunteer_id) for volunteer_id in volunteer_ids]
+        heapq.heapify(heap)
+        heaps[position_id] = heap
+    positions_of = defaultdict(list)
+    for position_id, volunteer_ids in eligibility.items():
+        for volunteer_id in volunteer_ids:
+            positions_of[volunteer_id].append(position_id)
+
+    def scarcity(shift):
+        return len(eligibility.get(shift.position_id, ())) / shift.places, shift.start
+
+    assignments = []
+    for shift in sorted(shifts, key=scarcity):
+        heap = heaps.get(shift.position_id)
+        if not heap:
+            continue
+        duration = shift.end - shift.start
+        skipped = []
+        places = shift.places
+        while places and heap:
+            minutes, volunteer_id = heapq.heappop(heap)
+            if minutes != schedule.minutes[volunteer_id]:
+                continue
+            if max_minutes is not None and minutes + duration > max_minutes:
+                # Everyone left in the heap has at least as many minutes booked
+                skipped.append((minutes, volunteer_id))
+                break
+            if not schedule.is_free(volunteer_id, shift.start, shift.end):
+                skipped.append((minutes, volunteer_id))
+                continue
+
+            schedule.book(volunteer_id, shift.start, shift.end)
+            assignments.append((shift.id, volunteer_id))
+            places -= 1
+            for position_id in positions_of[volunteer_id]:
+                heapq.heappush(heaps[position_id], (schedule.minutes[volunteer_id], volunteer_id))
+
+        # Volunteers who couldn't take this shift may still fit the next one
+        for entry in skipped:
+            heapq.heappush(heap, entry)
+
+    return assignments
+
+
+def auto_schedule(event, max_hours=None, dry_run=False, assigned_by=None):
+    """
+    Fill the open places of an event's shifts with qualified, active volunteers.
+
+    Returns (assigned, open_places): the (shift_id, volunteer_id) pairs that
+    were assigned, or would be with dry_run, and the number of places that
+    were open before.
+    """
+    shifts = [
+        OpenShift(shift["id"], shift["position_id"], *interval_minutes(
+            shift["starts_at"], shift["ends_at"]
+        ), shift["max_volunteers"] - shift["taken"])
+        for shift in Shift.objects.filter(event=event, position__isnull=False)
+        .annotate(taken=Count("shiftvolunteer"))
+        .values("id", "position_id", "starts_at", "ends_at", "max_volunteers", "taken")
+    ]
+    shifts = [shift for shift in shifts if shift.places > 0]
+
+    eligibility = defaultdict(list)
+    for position_id, volunteer_id in PositionVolunteer.objects.filter(
+        position__event=event, volunteer__is_active=True
+    ).values_list("position_id", "volunteer_id"):
+        eligibility[position_id].append(volunteer_id)
+
+    booked = [
+        (volunteer_id, *interval_minutes(starts_at, ends_at))
+        for volunteer_id, starts_at, ends_at in ShiftVolunteer.objects.filter(
+            shift__event=event
+        ).values_list("volunteer_id", "shift__starts_at", "shift__ends_at")
+    ]
+
+    max_minutes = max_hours * 60 if max_hours is not None else None
+    assignments = solve(shifts, eligibility, booked, max_minutes)
+    open_places = sum(shift.places for shift in shifts)
+
+    if dry_run or not assignments:
+        return assignments, open_places
+
+    assigned, _ = bulk_assign(assignments, assigned_by=assigned_by)
+    return assigned, open_places
@@ -0,0 +1,66 @@
+import time
+from datetime import datetime, timezone
+
+from django.core.cache import cache
+from django.db import transaction
+
+# Anything shown next to shifts (event, location, position and volunteer names)
+SCHEDULE_SCOPE = "schedule"
+
+# Volunteer records and their positions, as counted on the volunteer dashboard
+VOLUNTEERS_SCOPE = "volunteers"
+
+
+def day_scope(date):
+    """Scope covering the shifts and assignments of a single calendar day."""
+    return f"day:{date.isoformat()}"
+
+
+def _version_key(scope):
+    return f"shifts:version:{scope}"
+
+
+def get_versions(*scopes):
+    """Return the current data version of each scope, starting any that are missing.
+
+    Versions are nanosecond timestamps of the last change, so they double as
+    Last-Modified values. They live in the cache, so reading them never
+    touches the database.
+    """
+    keys = [_version_key(scope) for scope in scopes]
+    versions = cache.get_many(keys)
+
+    for key in keys:
+        if key not in versions:
+            # Another worker may have started the version in the meantime
+            cache.add(key, time.time_ns(), timeout=None)
+            versions[key] = cache.get(key)
+
+    return tuple(versions[key] for key in keys)
+
+
+def bump_versions(*scopes):
+    """Mark the given scopes as changed, invalidating anything cached against them."""
+    version = time.time_ns()
+    cache.set_many({_version_key(scope): version for scope in scopes}, timeout=None)
+
+
+def bump_versions_on_commit(*scopes):
+    """Bump the given scopes once the current transaction commits.
+
+    A page rendered before the commit still sees the old rows, so bumping
+    earlier would let it be cached under the new version.
+    """
+    transaction.on_commit(lambda: bump_versions(*scopes))
+
+
+def versions_etag(versions):
+    return '"%s"' % "-".join(f"{version:x}" for version in versions)
+
+
+def public_day_cache_key(date, versions):
+    return f"shifts:public-day:{date.isoformat()}:{versions_etag(versions)}"
+
+
+def versions_last_modified(versions):
+    return datetime.fromtimestamp(max(versions) / 1e9, tz=timezone.utc)
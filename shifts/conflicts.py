@@ -0,0 +1,59 @@
+from bisect import bisect_left, insort
+from collections import defaultdict
+
+from .models import ShiftVolunteer
+
+
+def interval_minutes(starts_at, ends_at):
+    """Whole minutes on one timeline for every event, as a Schedule keeps intervals."""
+    return int(starts_at.timestamp()) // 60, int(ends_at.timestamp()) // 60
+
+
+def shift_minutes(shift):
+    return interval_minutes(shift.starts_at, shift.ends_at)
+
+
+def find_conflicts(volunteer_ids, starts_at, ends_at, exclude_shift=None):
+    """
+    Find the assignments of the given volunteers whose shift overlaps
+    [starts_at, ends_at).
+
+    The index on the assignment's volunteer narrows the search to their own
+    assignments, which are compared on their shift's stored starts_at and
+    ends_at. There is no interval index on the assignments themselves: a copy
+    of the interval there had to be kept in sync on every shift edit, and a
+    volunteer only has a handful of assignments to compare.
+
+    Returns a dict of volunteer id to their first overlapping assignment,
+    with its shift, location and position loaded.
+    """
+    bookings = ShiftVolunteer.objects.filter(
+        volunteer_id__in=volunteer_ids,
+        shift__starts_at__lt=ends_at,
+        shift__ends_at__gt=starts_at,
+    )
+    if exclude_shift is not None:
+        bookings = bookings.exclude(shift_id=exclude_shift)
+
+    conflicts = {}
+    for booking in bookings.select_related("shift__location", "shift__position").order_by("shift__starts_at"):
+        conflicts.setdefault(booking.volunteer_id, booking)
+    return conflicts
+
+
+class Schedule:
+    """The intervals and minutes each volunteer is booked for, kept sorted in memory."""
+
+    def __init__(self):
+        self.intervals = defaultdict(list)
+        self.minutes = defaultdict(int)
+
+    def is_free(self, volunteer_id, start, end):
+        intervals = self.intervals[volunteer_id]
+        # Bookings can overlap each other, as editing a shift's times doesn't
+        # recheck its volunteers, so every booking starting before end is checked
+        return all(booked_end <= start for _, booked_end in intervals[:bisect_left(intervals, (end,))])
+
+    def book(self, volunteer_id, start, end):
+        insort(self.intervals[volunteer_id], (start, end))
+        self.minutes[volunteer_id] += end - start
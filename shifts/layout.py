@@ -0,0 +1,195 @@
+import heapq
+from collections import defaultdict
+
+from django.core.exceptions import ObjectDoesNotExist
+from django.db import transaction
+from django.db.models import Q
+
+from .models import Shift, ShiftLayout
+
+# The calendar grid starts at 6am and runs until 5am the next day
+GRID_START_HOUR = 6
+
+MINUTES_PER_DAY = 24 * 60
+
+
+def shift_interval(start_time, end_time, grid_start_hour=GRID_START_HOUR):
+    """Return a shift's (start, end) in minutes from the start of the grid day.
+
+    Shifts starting before the grid start belong to the night after the grid
+    day, and shifts whose end time is before their start time cross midnight,
+    so both ends are placed on a single continuous timeline.
+    """
+    start = start_time.hour * 60 + start_time.minute
+    end = end_time.hour * 60 + end_time.minute
+    duration = (end - start) % MINUTES_PER_DAY
+
+    if start_time.hour < grid_start_hour:
+        start += MINUTES_PER_DAY
+    start -= grid_start_hour * 60
+
+    return start, start + duration
+
+
+def assign_columns(shifts):
+    """Assign a column to every shift so that overlapping shifts never share one.
+
+    This is a sweep-line allocator that replaces the pairwise overlap scan:
+    1. Shifts are visited in start order, keeping a heap of the shifts that are
+       still running, so only live shifts are considered for overlap
+    2. A position keeps the column it was last given whenever that column is free
+    3. Otherwise the lowest free column is taken and becomes the position's column
+
+    Sets ``column`` and ``total_columns`` on each shift and returns the number
+    of columns used. Runs in O(n log n) for n shifts.
+    """
+    if not shifts:
+        return 0
+
+    intervals = [
+        (shift_interval(shift.start_time, shift.end_time), shift) for shift in shifts
+    ]
+    intervals.sort(key=lambda item: item[0][0])
+
+    position_to_column = {}
+    active = []  # heap of (end, start, column) for shifts still running
+    occupied = set()
+    free_columns = []  # heap of released columns, may hold stale entries
+    max_columns = 0
+
+    for (start, end), shift in intervals:
+        # Release shifts that ended before this one starts; shifts starting at the
+        # same time always count as overlapping, even if they have no length
+        while active and (
+            active[0][0] < start or (active[0][0] == start and active[0][1] < start)
+        ):
+            _, _, column = heapq.heappop(active)
+            occupied.discard(column)
+            heapq.heappush(free_columns, column)
+
+        position_id = shift.position_id
+        column = position_to_column.get(position_id)
+        if column is None or column in occupied:
+            # Drop released columns that were taken again by a position since
+            while free_columns and free_columns[0] in occupied:
+                heapq.heappop(free_columns)
+
+            if free_columns:
+                column = heapq.heappop(free_columns)
+            else:
+                column = max_columns
+            position_to_column[position_id] = column
+
+        shift.column = column
+        occupied.add(column)
+        heapq.heappush(active, (end, start, column))
+        max_columns = max(max_columns, column + 1)
+
+    for shift in shifts:
+        shift.total_columns = max_columns
+
+    return max_columns
+
+
+def layout_shifts(shifts):
+    """Compute grid rows and columns for the shifts of one location/day column.
+
+    Sets ``grid_row_start``, ``grid_row_span``, ``column`` and ``total_columns``
+    on each shift. Rows are measured in hours, with row 1 at the grid start.
+    """
+    for shift in shifts:
+        start, end = shift_interval(shift.start_time, shift.end_time)
+        shift.grid_row_start = start / 60 + 1
+        shift.grid_row_span = (end - start) / 60
+
+    assign_columns(shifts)
+
+
+def apply_stored_layout(shifts):
+    """Copy the stored layout of each shift onto it.
+
+    Returns False, leaving the shifts untouched, if any shift has no stored
+    layout yet. Shifts should be fetched with ``select_related("layout")``.
+    """
+    layouts = []
+    for shift in shifts:
+        try:
+            layouts.append(shift.layout)
+        except ObjectDoesNotExist:
+            return False
+
+    for shift, layout in zip(shifts, layouts):
+        shift.grid_row_start = layout.row_start
+        shift.grid_row_span = layout.row_span
+        shift.column = layout.column
+        shift.total_columns = layout.total_columns
+
+    return True
+
+
+def grid_shifts(event, start_date=None, end_date=None, locations=None):
+    """Return the shifts of an event's calendar grid, between two dates
+    included and optionally at some locations only.
+
+    This is the one query behind every calendar render and the API's shift
+    list, with one more for the volunteers, whatever the number of days or
+    locations it covers.
+    """
+    shifts = (
+        Shift.objects.filter(event=event)
+        .select_related("position", "location", "layout")
+        .prefetch_related("volunteers")
+    )
+    if start_date:
+        shifts = shifts.filter(date__gte=start_date)
+    if end_date:
+        shifts = shifts.filter(date__lte=end_date)
+    if locations is not None:
+        shifts = shifts.filter(location__in=locations)
+    return shifts
+
+
+def layout_columns(shifts):
+    """Group fetched shifts into (location, date) calendar columns and lay out each one in memory.
+
+    Each column uses its stored layout, or is laid out as ``rebuild_layout``
+    would store it if any of its shifts has none yet.
+    """
+    columns = defaultdict(list)
+    for shift in shifts:
+        # Shifts that cross midnight stay in the column of their start date
+        columns[(shift.location, shift.date)].append(shift)
+
+    for column_shifts in columns.values():
+        if not apply_stored_layout(column_shifts):
+            layout_shifts(column_shifts)
+    return columns
+
+
+def rebuild_layout(location_id, date):
+    """Recompute and store the layout of every shift in one location/day column."""
+    with transaction.atomic():
+        shifts = list(
+            Shift.objects.filter(location_id=location_id, date=date)
+            .order_by("start_time", "id")
+            .only("event", "location", "date", "start_time", "end_time", "position")
+        )
+        layout_shifts(shifts)
+
+        # Shifts that just moved here still have a row under their old column
+        ShiftLayout.objects.filter(
+            Q(location_id=location_id, date=date) | Q(shift__in=shifts)
+        ).delete()
+        ShiftLayout.objects.bulk_create(
+            ShiftLayout(
+                shift=shift,
+                event_id=shift.event_id,
+                location_id=location_id,
+                date=date,
+                row_start=shift.grid_row_start,
+                row_span=shift.grid_row_span,
+                column=shift.column,
+                total_columns=shift.total_columns,
+            )
+            for shift in shifts
+        )
@@ -0,0 +1,158 @@
+"""
+Live calendar updates.
+
+Saving or deleting a shift, or changing who works it, publishes the calendar
+column that changed as an (event, location, date) message once the
+transaction commits. The live_updates view streams these messages to open
+calendar pages as server-sent events, and the pages refetch just that column.
+
+The default broker fans messages out within one process. With
+LIVE_UPDATES_BACKEND = "postgres", messages travel over PostgreSQL
+LISTEN/NOTIFY, so every worker process sees the changes made in the others.
+That is only worth a NOTIFY per change when pages are streaming, which needs
+the ASGI application.
+"""
+import asyncio
+import json
+import logging
+import select
+import threading
+import time
+
+from django.conf import settings
+from django.db import connections, transaction
+
+logger = logging.getLogger(__name__)
+
+# Messages waiting for a slow client beyond this are dropped
+SUBSCRIPTION_QUEUE_SIZE = 100
+
+
+class Subscription:
+    """A stream of change messages for one client, read from its event loop."""
+
+    def __init__(self, broker):
+        self.broker = broker
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue(SUBSCRIPTION_QUEUE_SIZE)
+
+    def __enter__(self):
+        self.broker.add(self)
+        return self
+
+    def __exit__(self, *exc_info):
+        self.broker.discard(self)
+
+    def offer(self, message):
+        # Runs on the subscription's loop, so the queue is only touched from there
+        if not self.queue.full():
+            self.queue.put_nowait(message)
+
+    async def get(self, timeout=None):
+        """Wait for the next message, raising TimeoutError after timeout seconds."""
+        return await asyncio.wait_for(self.queue.get(), timeout)
+
+
+class LocalBroker:
+    """Delivers messages to the subscriptions of this process."""
+
+    def __init__(self):
+        self.subscriptions = set()
+        self.lock = threading.Lock()
+
+    def add(self, subscription):
+        with self.lock:
+            self.subscriptions.add(subscription)
+
+    def discard(self, subscription):
+        with self.lock:
+            self.subscriptions.discard(subscription)
+
+    def subscribe(self):
+        return Subscription(self)
+
+    def publish(self, message):
+        self.deliver(message)
+
+    def deliver(self, message):
+        # Publishers run in sync views and signal handlers, so hand messages to
+        # each subscriber's event loop instead of touching its queue here
+        with self.lock:
+            subscriptions = list(self.subscriptions)
+        for subscription in subscriptions:
+            try:
+                subscription.loop.call_soon_threadsafe(subscription.offer, message)
+            except RuntimeError:
+                # The client's loop closed before it unsubscribed
+                self.discard(subscription)
+
+
+class PostgresBroker(LocalBroker):
+    """Publishes with NOTIFY and delivers what a LISTEN connection receives, in any process."""
+
+    channel = 'shift_changes'
+    poll_timeout = 5
+    reconnect_delay = 5
+
+    def __init__(self, using='default'):
+        super().__init__()
+        self.using = using
+        self.listener = None
+
+    def add(self, subscription):
+        super().add(subscription)
+        with self.lock:
+            if self.listener is None:
+                self.listener = threading.Thread(target=self.listen, name='live-updates-listener', daemon=True)
+                self.listener.start()
+
+    def publish(self, message):
+        # Our own listener receives it as well, which delivers it locally
+        with connections[self.using].cursor() as cursor:
+            cursor.execute('SELECT pg_notify(%s, %s)', [self.channel, json.dumps(message)])
+
+    def listen(self):
+        wrapper = connections[self.using]
+        while True:
+            try:
+                pg_connection = wrapper.get_new_connection(wrapper.get_connection_params())
+                pg_connection.autocommit = True
+                with pg_connection.cursor() as cursor:
+                    cursor.execute(f'LISTEN {self.channel}')
+                while True:
+                    if select.select([pg_connection], [], [], self.poll_timeout) == ([], [], []):
+                        continue
+                    pg_connection.poll()
+                    while pg_connection.notifies:
+                        self.deliver(json.loads(pg_connection.notifies.pop(0).payload))
+            except Exception:
+                logger.exception('Live updates listener lost its connection, reconnecting')
+                time.sleep(self.reconnect_delay)
+
+
+BROKERS = {
+    'local': LocalBroker,
+    'postgres': PostgresBroker,
+}
+
+_broker = None
+_broker_lock = threading.Lock()
+
+
+def get_broker():
+    global _broker
+    with _broker_lock:
+        if _broker is None:
+            _broker = BROKERS[settings.LIVE_UPDATES_BACKEND]()
+        return _broker
+
+
+def publish_column_change(event_id, location_id, date):
+    """
+    Announce a changed calendar column once the current transaction commits.
+
+    The message carries the commit time, so a page holding a copy of the
+    column rendered after it, such as the editor's own, can skip the refetch.
+    """
+    message = {'event': event_id, 'location': location_id, 'date': date.isoformat()}
+    transaction.on_commit(lambda: get_broker().publish({**message, 'at': time.time()}))
@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from events.models import Event
+from shifts.autoschedule import auto_schedule
+
+
+class Command(BaseCommand):
+    help = 'Fill the open shift places of an event with qualified volunteers'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--event', type=int, help='Event id, defaults to the latest event')
+        parser.add_argument('--max-hours', type=float,
+                            help='Maximum total hours per volunteer, including shifts they already have')
+        parser.add_argument('--dry-run', action='store_true',
+                            help='Report what would be assigned without saving anything')
+
+    def handle(self, *args, **options):
+        if options['event']:
+            event = Event.objects.filter(pk=options['event']).first()
+        else:
+            event = Event.objects.order_by('-start_date').first()
+        if not event:
+            raise CommandError('No event found')
+
+        assigned, open_places = auto_schedule(
+            event, max_hours=options['max_hours'], dry_run=options['dry_run']
+        )
+
+        verb = 'Would assign' if options['dry_run'] else 'Assigned'
+        self.stdout.write(self.style.SUCCESS(
+            f'{verb} {len(assigned)} of {open_places} open places for {event.name}'
+        ))
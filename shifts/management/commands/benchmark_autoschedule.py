@@ -0,0 +1,65 @@
+import random
+import time as timer
+from collections import defaultdict
+
+from django.core.management.base import BaseCommand
+
+from shifts.autoschedule import OpenShift, solve
+
+
+class Command(BaseCommand):
+    help = 'Benchmark the auto-scheduler on a synthetic festival'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--shifts', type=int, default=2000)
+        parser.add_argument('--volunteers', type=int, default=1000)
+        parser.add_argument('--positions', type=int, default=6)
+        parser.add_argument('--days', type=int, default=4)
+        parser.add_argument('--qualifications', type=int, default=2, help='Positions per volunteer')
+        parser.add_argument('--max-hours', type=float, default=12)
+        parser.add_argument('--repeat', type=int, default=3, help='Runs, best time is reported')
+        parser.add_argument('--seed', type=int, default=0)
+
+    def make_festival(self, rng, options):
+        shifts = []
+        for shift_id in range(options['shifts']):
+            day = rng.randrange(options['days'])
+            # Shifts start between 9 AM and 2 AM and run 2-4 hours
+            start = day * 24 * 60 + rng.randrange(9 * 4, 26 * 4) * 15
+            shifts.append(OpenShift(
+                shift_id, rng.randrange(options['positions']), start,
+                start + rng.choice([120, 180, 240]), rng.randint(1, 4),
+            ))
+
+        eligibility = defaultdict(list)
+        for volunteer_id in range(options['volunteers']):
+            for position_id in rng.sample(range(options['positions']), options['qualifications']):
+                eligibility[position_id].append(volunteer_id)
+        return shifts, eligibility
+
+    def handle(self, *args, **options):
+        shifts, eligibility = self.make_festival(random.Random(options['seed']), options)
+        places = sum(shift.places for shift in shifts)
+
+        best = None
+        for _ in range(options['repeat']):
+            started = timer.perf_counter()
+            assignments = solve(shifts, eligibility, max_minutes=options['max_hours'] * 60)
+            elapsed = timer.perf_counter() - started
+            best = elapsed if best is None else min(best, elapsed)
+
+        minutes = defaultdict(int)
+        lengths = {shift.id: shift.end - shift.start for shift in shifts}
+        for shift_id, volunteer_id in assignments:
+            minutes[volunteer_id] += lengths[shift_id]
+        hours = sorted(total / 60 for total in minutes.values())
+
+        self.stdout.write(
+            f'{len(shifts)} shifts ({places} places), {options["volunteers"]} volunteers: '
+            f'filled {len(assignments)} places ({len(assignments) / places:.0%}) in {best:.2f}s'
+        )
+        if hours:
+            self.stdout.write(
+                f'hours per volunteer: min {hours[0]:.1f}, median {hours[len(hours) // 2]:.1f}, '
+                f'max {hours[-1]:.1f}, {options["volunteers"] - len(hours)} without shifts'
+            )
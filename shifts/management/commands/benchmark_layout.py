@@ -0,0 +1,50 @@
+import random
+import time as timer
+from datetime import time
+from types import SimpleNamespace
+
+from django.core.management.base import BaseCommand
+
+from shifts.layout import assign_columns
+
+
+class Command(BaseCommand):
+    help = 'Benchmark the shift column allocator on synthetic days of shifts'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', type=int, nargs='+', default=[100, 1000, 10000],
+                            help='Number of shifts per simulated location/day')
+        parser.add_argument('--positions', type=int, default=8, help='Number of distinct positions')
+        parser.add_argument('--repeat', type=int, default=5, help='Runs per size, best time is reported')
+        parser.add_argument('--seed', type=int, default=0)
+
+    def make_shifts(self, rng, count, positions):
+        shifts = []
+        for _ in range(count):
+            start = rng.randrange(0, 24 * 4)
+            length = rng.randrange(4, 6 * 4)
+            end = (start + length) % (24 * 4)
+            shifts.append(SimpleNamespace(
+                start_time=time(start // 4, start % 4 * 15),
+                end_time=time(end // 4, end % 4 * 15),
+                position_id=rng.randrange(positions),
+            ))
+        return shifts
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+
+        for size in options['sizes']:
+            shifts = self.make_shifts(rng, size, options['positions'])
+
+            best = None
+            for _ in range(options['repeat']):
+                started = timer.perf_counter()
+                columns = assign_columns(shifts)
+                elapsed = timer.perf_counter() - started
+                best = elapsed if best is None else min(best, elapsed)
+
+            self.stdout.write(
+                f'{size:>7} shifts: {best * 1000:9.2f} ms '
+                f'({size / best:,.0f} shifts/s, {columns} columns)'
+            )
@@ -0,0 +1,98 @@
+import asyncio
+import time
+
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.core.management.base import BaseCommand, CommandError
+
+from shifts.notifications import deliver_messages
+
+
+class SlowHandler:
+    """aiosmtpd handler that adds the latency of a remote server and discards the mail."""
+
+    def __init__(self, connect_latency, message_latency):
+        self.connect_latency = connect_latency
+        self.message_latency = message_latency
+
+    async def handle_EHLO(self, server, session, envelope, hostname, responses):
+        # Stands in for the TLS handshake and login of a real provider
+        await asyncio.sleep(self.connect_latency)
+        session.host_name = hostname
+        return responses
+
+    async def handle_DATA(self, server, session, envelope):
+        await asyncio.sleep(self.message_latency)
+        return '250 Message accepted for delivery'
+
+
+class Command(BaseCommand):
+    help = 'Benchmark notification delivery against a local SMTP stand-in (requires aiosmtpd)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--messages', type=int, default=300, help='Number of emails to send')
+        parser.add_argument('--workers', type=int, nargs='+', default=[1, 4, 8],
+                            help='Pool sizes to benchmark')
+        parser.add_argument('--connect-latency', type=float, default=0.3,
+                            help='Seconds spent by the stand-in on every new connection')
+        parser.add_argument('--message-latency', type=float, default=0.05,
+                            help='Seconds spent by the stand-in on every message')
+        parser.add_argument('--port', type=int, default=8025)
+        parser.add_argument('--skip-serial', action='store_true',
+                            help='Skip the one-connection-per-email baseline')
+
+    def make_messages(self, count):
+        messages = []
+        for number in range(count):
+            message = EmailMultiAlternatives(
+                subject='Your Shifts at Benchmark Festival',
+                body='Your shifts',
+                from_email='benchmark@example.com',
+                to=[f'volunteer{number}@example.com'],
+            )
+            message.attach_alternative('<p>Your shifts</p>', 'text/html')
+            messages.append(message)
+        return messages
+
+    def handle(self, *args, **options):
+        try:
+            from aiosmtpd.controller import Controller
+        except ImportError:
+            raise CommandError('aiosmtpd is required for this benchmark: pip install aiosmtpd')
+
+        handler = SlowHandler(options['connect_latency'], options['message_latency'])
+        controller = Controller(handler, hostname='127.0.0.1', port=options['port'])
+        controller.start()
+
+        connection_kwargs = {
+            'backend': 'django.core.mail.backends.smtp.EmailBackend',
+            'host': '127.0.0.1',
+            'port': options['port'],
+            'username': '',
+            'password': '',
+            'use_tls': False,
+            'use_ssl': False,
+        }
+        messages = self.make_messages(options['messages'])
+
+        try:
+            if not options['skip_serial']:
+                # What send_mail did: a new connection and login for every email
+                started = time.perf_counter()
+                for message in messages:
+                    get_connection(fail_silently=False, **connection_kwargs).send_messages([message])
+                elapsed = time.perf_counter() - started
+                self.stdout.write(
+                    f'serial send_mail : {elapsed:7.2f}s ({len(messages) / elapsed:7.1f} emails/s)'
+                )
+
+            for workers in options['workers']:
+                started = time.perf_counter()
+                errors = deliver_messages(messages, workers=workers, **connection_kwargs)
+                elapsed = time.perf_counter() - started
+                failed = sum(error is not None for error in errors)
+                self.stdout.write(
+                    f'{workers:3} pooled workers: {elapsed:7.2f}s ({len(messages) / elapsed:7.1f} emails/s, '
+                    f'{failed} failed)'
+                )
+        finally:
+            controller.stop()
@@ -1,83 +1,237 @@
-from django.core.management.base import BaseCommand
+"""
+Generate shifts for an event from a shift pattern.
+
+A pattern is a JSON file like:
+
+    {
+        "day_start": "09:00",
+        "locations": ["Main Hall", "Studio"],
+        "positions": {"Floor": null, "Registration": 1},
+        "blocks": [
+            {"start": "09:00", "end": "12:00", "max_volunteers": 3},
+            {"start": "21:00", "end": "00:00", "max_volunteers": 3, "locations": ["Main Hall"]},
+            {"start": "00:00", "end": "02:00", "max_volunteers": 2, "positions": {"Floor": 2}}
+        ]
+    }
+
+Every block is created on every event day, at each location and for each
+position listed. "positions" maps a position name to its capacity, where null
+uses the block's max_volunteers. Blocks can override "locations" and
+"positions"; when omitted at the top level, all of the event's locations and
+positions are used. Blocks starting before "day_start" belong to the night of
+the previous day, so they are dated the following day.
+"""
+import json
+from collections import namedtuple
+from datetime import time, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
 from django.utils import timezone
-from datetime import datetime, time, timedelta
+
+from shifts.cache import VOLUNTEERS_SCOPE, bump_versions, day_scope
+from shifts.layout import rebuild_layout
+from shifts.live import publish_column_change
 from shifts.models import Position, Shift
 from events.models import Event, Location
 
+# 3-hour blocks from 9 AM to 5 AM next day, for every location and position
+DEFAULT_PATTERN = {
+    'day_start': '09:00',
+    'blocks': [
+        {'start': '09:00', 'end': '12:00', 'max_volunteers': 3},  # Morning shift
+        {'start': '12:00', 'end': '15:00', 'max_volunteers': 3},  # Early afternoon shift
+        {'start': '15:00', 'end': '18:00', 'max_volunteers': 3},  # Late afternoon shift
+        {'start': '18:00', 'end': '21:00', 'max_volunteers': 3},  # Evening shift
+        {'start': '21:00', 'end': '00:00', 'max_volunteers': 3},  # Night shift
+        {'start': '00:00', 'end': '02:00', 'max_volunteers': 2},  # Late night shift
+        {'start': '02:00', 'end': '05:00', 'max_volunteers': 2},  # Early morning shift
+    ],
+}
+
+PlannedShift = namedtuple('PlannedShift', 'location position date start_time end_time max_volunteers')
+
+
+def parse_time(value):
+    try:
+        return time.fromisoformat(value)
+    except (TypeError, ValueError):
+        raise CommandError(f'Invalid time in shift pattern: {value!r}')
+
+
+def pick(objects_by_name, names, kind):
+    """Look up pattern names (case-insensitively) among the event's locations or positions."""
+    missing = [name for name in names if name.lower() not in objects_by_name]
+    if missing:
+        raise CommandError(f'Unknown {kind} in shift pattern: {", ".join(missing)}')
+    return [objects_by_name[name.lower()] for name in names]
+
+
+def plan_shifts(event, pattern, locations, positions):
+    """Expand a pattern into the shifts it describes for every day of the event."""
+    day_start = parse_time(pattern.get('day_start', '00:00'))
+    locations_by_name = {location.name.lower(): location for location in locations}
+    positions_by_name = {position.name.lower(): position for position in positions}
+
+    default_locations = (
+        pick(locations_by_name, pattern['locations'], 'locations')
+        if 'locations' in pattern else list(locations)
+    )
+    default_positions = pattern.get('positions', {position.name: None for position in positions})
+
+    blocks = []
+    for block in pattern.get('blocks', []):
+        start_time, end_time = parse_time(block.get('start')), parse_time(block.get('end'))
+        block_locations = (
+            pick(locations_by_name, block['locations'], 'locations')
+            if 'locations' in block else default_locations
+        )
+        capacities = block.get('positions', default_positions)
+        block_positions = zip(pick(positions_by_name, list(capacities), 'positions'), capacities.values())
+        blocks.append((start_time, end_time, block.get('max_volunteers', 1), block_locations, list(block_positions)))
+
+    planned = []
+    for current_date in event.get_dates():
+        for start_time, end_time, max_volunteers, block_locations, block_positions in blocks:
+            shift_date = current_date + timedelta(days=1) if start_time < day_start else current_date
+            if shift_date > event.end_date:
+                continue
+            for location in block_locations:
+                for position, capacity in block_positions:
+                    planned.append(PlannedShift(
+                        location, position, shift_date, start_time, end_time,
+                        max_volunteers if capacity is None else capacity,
+                    ))
+    return planned
+
+
 class Command(BaseCommand):
-    help = 'Generate shifts for an event'
+    help = 'Generate shifts for an event from a shift pattern file'
+
+    def add_arguments(self, parser):
+        parser.add_argument('pattern', nargs='?', help='JSON shift pattern, defaults to 3-hour blocks from 9 AM to 5 AM')
+        parser.add_argument('--event', type=int, help='Event id, defaults to the current or next event')
+        parser.add_argument('--dry-run', action='store_true',
+                            help='Show the shifts that would be created without saving anything')
+
+    def get_event(self, event_id):
+        if event_id:
+            event = Event.objects.filter(pk=event_id).first()
+            if not event:
+                raise CommandError(f'Event {event_id} not found')
+            return event
 
-    def handle(self, *args, **options):
         # Get the current or next event
         today = timezone.now().date()
         current_event = Event.objects.filter(
             start_date__lte=today,
             end_date__gte=today
         ).first()
-        
+
         if not current_event:
             current_event = Event.objects.filter(
                 start_date__gte=today
             ).order_by('start_date').first()
-        
+
         if not current_event:
-            self.stdout.write(self.style.ERROR('No events found'))
+            raise CommandError('No events found')
+        return current_event
+
+    def handle(self, *args, **options):
+        if options['pattern']:
+            try:
+                with open(options['pattern']) as pattern_file:
+                    pattern = json.load(pattern_file)
+            except (OSError, ValueError) as e:
+                raise CommandError(f'Could not read shift pattern: {e}')
+        else:
+            pattern = DEFAULT_PATTERN
+
+        event = self.get_event(options['event'])
+        locations = list(Location.objects.filter(event=event))
+        positions = list(Position.objects.filter(event=event))
+        planned = plan_shifts(event, pattern, locations, positions)
+
+        # Shift.clean() treats location, position, date and start time as the identity of a shift
+        existing = {
+            values[:4]: values[4:]
+            for values in Shift.objects.filter(event=event).values_list(
+                'location_id', 'position_id', 'date', 'start_time', 'end_time', 'max_volunteers'
+            )
+        }
+        new_shifts = {}
+        changed = []
+        for shift in planned:
+            key = (shift.location.id, shift.position.id, shift.date, shift.start_time)
+            if key in existing:
+                if existing[key] != (shift.end_time, shift.max_volunteers):
+                    changed.append((shift, *existing[key]))
+                continue
+            new_shifts.setdefault(key, shift)
+
+        if options['dry_run']:
+            for shift in new_shifts.values():
+                self.stdout.write(
+                    f'+ {shift.date} {shift.start_time:%H:%M}-{shift.end_time:%H:%M} '
+                    f'{shift.location.name} / {shift.position.name} (max {shift.max_volunteers})'
+                )
+            # Existing shifts are never modified, only reported when the pattern disagrees
+            for shift, end_time, max_volunteers in changed:
+                self.stdout.write(
+                    f'~ {shift.date} {shift.start_time:%H:%M}-{end_time:%H:%M} '
+                    f'{shift.location.name} / {shift.position.name} (max {max_volunteers}) '
+                    f'differs from pattern {shift.start_time:%H:%M}-{shift.end_time:%H:%M} '
+                    f'(max {shift.max_volunteers}), kept'
+                )
+            self.stdout.write(
+                f'{len(new_shifts)} shifts would be created, '
+                f'{len(planned) - len(new_shifts)} already exist'
+            )
             return
 
-        # Get all locations and positions
-        locations = Location.objects.filter(event=current_event)
-        positions = Position.objects.all()
-
-        # Define shift times (3-hour blocks from 9 AM to 5 AM next day)
-        shift_times = [
-            (time(9, 0), time(12, 0), 3),   # Morning shift
-            (time(12, 0), time(15, 0), 3),  # Early afternoon shift
-            (time(15, 0), time(18, 0), 3),  # Late afternoon shift
-            (time(18, 0), time(21, 0), 3),  # Evening shift
-            (time(21, 0), time(0, 0), 3),   # Night shift
-            (time(0, 0), time(2, 0), 2),    # Late night shift
-            (time(2, 0), time(5, 0), 2),    # Early morning shift
+        shifts = [
+            Shift(
+                event=event,
+                location=shift.location,
+                position=shift.position,
+                date=shift.date,
+                start_time=shift.start_time,
+                end_time=shift.end_time,
+                max_volunteers=shift.max_volunteers,
+            )
+            for shift in new_shifts.values()
         ]
+        # bulk_create skips save(), which sets the derived interval columns
+        for shift in shifts:
+            shift.update_interval()
+
+        with transaction.atomic():
+            # Runs for the same event wait for each other here, and the shifts
+            # another run created since these were planned are left out
+            Event.objects.select_for_update().get(pk=event.pk)
+            event_shifts = Shift.objects.filter(event=event)
+            taken = set(event_shifts.values_list('location_id', 'position_id', 'date', 'start_time'))
+            shifts = [
+                shift for shift in shifts
+                if (shift.location_id, shift.position_id, shift.date, shift.start_time) not in taken
+            ]
+            # The unique_shift_slot constraint still skips a shift added from the
+            # calendar meanwhile, and skipped rows get no id, so count the rows instead
+            count_before = event_shifts.count()
+            Shift.objects.bulk_create(shifts, batch_size=1000, ignore_conflicts=True)
+            created = event_shifts.count() - count_before
+
+            # bulk_create skips the save signals that keep layouts, caches and open calendars up to date
+            columns = {(shift.location.id, shift.date) for shift in new_shifts.values()}
+            for location_id, date in columns:
+                rebuild_layout(location_id, date)
+                publish_column_change(event.id, location_id, date)
 
-        # Generate shifts for each day of the event
-        event_length = (current_event.end_date - current_event.start_date).days + 1
-        
-        for day_offset in range(event_length):
-            current_date = current_event.start_date + timedelta(days=day_offset)
-            
-            for location in locations:
-                for start_time, end_time, max_volunteers in shift_times:
-                    # Determine the correct date for the shift
-                    shift_date = current_date
-                    if start_time < time(9, 0):  # If it's an early morning shift
-                        shift_date = current_date + timedelta(days=1)
-                    
-                    # Create shifts for each position
-                    for position in positions:
-                        try:
-                            Shift.objects.create(
-                                event=current_event,
-                                location=location,
-                                date=shift_date,
-                                start_time=start_time,
-                                end_time=end_time,
-                                position=position,
-                                max_volunteers=max_volunteers
-                            )
-                            self.stdout.write(
-                                self.style.SUCCESS(
-                                    f'Created shifts for {location.name} on {shift_date} at {start_time.strftime("%H:%M:%S")}'
-                                )
-                            )
-                        except Exception as e:
-                            self.stdout.write(
-                                self.style.WARNING(
-                                    f'Failed to create shift for {location.name} on {shift_date} at {start_time.strftime("%H:%M:%S")}: {str(e)}'
-                                )
-                            )
+        bump_versions(VOLUNTEERS_SCOPE, *{day_scope(date) for _, date in columns})
 
         self.stdout.write(
             self.style.SUCCESS(
-                f'Successfully generated shifts from {current_event.start_date} to {current_event.end_date}'
+                f'Created {created} shifts from {event.start_date} to {event.end_date} '
+                f'({len(planned) - created} already existed)'
             )
         )
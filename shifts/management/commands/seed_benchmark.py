@@ -0,0 +1,193 @@
+import random
+import time as timer
+from collections import defaultdict
+from datetime import date, time, timedelta
+from itertools import groupby
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from events.models import Event, Location
+from shifts.cache import SCHEDULE_SCOPE, VOLUNTEERS_SCOPE, bump_versions
+from shifts.conflicts import Schedule, shift_minutes
+from shifts.layout import layout_shifts
+from shifts.models import Position, PositionVolunteer, Shift, ShiftLayout, ShiftVolunteer
+from volunteers.models import Volunteer
+
+EVENT_PREFIX = 'Benchmark Festival'
+EMAIL_DOMAIN = 'seed.example.com'
+
+FIRST_NAMES = ['Maria', 'Eleni', 'Giorgos', 'Nikos', 'Anna', 'Dimitra', 'Kostas', 'Sofia',
+               'Yannis', 'Katerina', 'Alex', 'Chloe', 'Lucas', 'Emma', 'Noah', 'Mia']
+LAST_NAMES = ['Papadopoulos', 'Georgiou', 'Nikolaou', 'Ioannou', 'Smith', 'Martin',
+              'Dubois', 'Rossi', 'Garcia', 'Novak', 'Jensen', 'Kowalski']
+LOCATION_NAMES = ['Main Hall', 'Studio', 'Ballroom', 'Garden', 'Lobby', 'Rooftop', 'Annex', 'Terrace']
+POSITION_NAMES = ['Floor', 'Registration', 'Pass Check', 'Decoration', 'Bar', 'Sound', 'First Aid', 'Cloakroom']
+COLORS = [color for color, _ in Position._meta.get_field('color').choices]
+
+# Shifts tile each day from 9 AM until 5 AM the next morning, in minutes
+DAY_START = 9 * 60
+DAY_END = 29 * 60
+
+BATCH_SIZE = 2000
+
+# Qualified volunteers tried per open place before it is left empty
+CANDIDATES_PER_PLACE = 8
+
+
+class Command(BaseCommand):
+    help = 'Bulk-generate a deterministic festival dataset for benchmarks and load tests'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--events', type=int, default=1)
+        parser.add_argument('--days', type=int, default=4, help='Days per event')
+        parser.add_argument('--locations', type=int, default=4, help='Locations per event')
+        parser.add_argument('--positions', type=int, default=4, help='Positions per event')
+        parser.add_argument('--volunteers', type=int, default=500)
+        parser.add_argument('--qualifications', type=int, default=2,
+                            help='Positions each volunteer is qualified for, per event')
+        parser.add_argument('--fill', type=float, default=0.8,
+                            help='Share of shift places that get a volunteer assigned')
+        parser.add_argument('--scale', type=int, default=1,
+                            help='Multiply locations and volunteers, e.g. 10 or 100')
+        parser.add_argument('--seed', type=int, default=0)
+
+    def make_shifts(self, rng, event, location, position, shift_date):
+        shifts = []
+        start = DAY_START
+        while start < DAY_END:
+            end = min(start + rng.choice([120, 180, 240]), DAY_END)
+            shift = Shift(
+                event=event,
+                location=location,
+                position=position,
+                date=shift_date,
+                start_time=time(start // 60 % 24, start % 60),
+                end_time=time(end // 60 % 24, end % 60),
+                max_volunteers=rng.randint(1, 4),
+            )
+            # bulk_create skips save(), which keeps the derived interval columns
+            shift.update_interval()
+            shifts.append(shift)
+            start = end
+        return shifts
+
+    def position_name(self, n):
+        name = POSITION_NAMES[n % len(POSITION_NAMES)]
+        if n < len(POSITION_NAMES):
+            return name
+        return f'{name} {n // len(POSITION_NAMES) + 1}'
+
+    def make_layouts(self, shifts):
+        """Lay out every location/day column in memory, as rebuild_layout would."""
+        layouts = []
+        column_key = lambda shift: (shift.location_id, shift.date)
+        for (location_id, shift_date), column in groupby(sorted(shifts, key=column_key), key=column_key):
+            column = sorted(column, key=lambda shift: (shift.start_time, shift.pk))
+            layout_shifts(column)
+            layouts.extend(
+                ShiftLayout(
+                    shift=shift,
+                    event_id=shift.event_id,
+                    location_id=location_id,
+                    date=shift_date,
+                    row_start=shift.grid_row_start,
+                    row_span=shift.grid_row_span,
+                    column=shift.column,
+                    total_columns=shift.total_columns,
+                )
+                for shift in column
+            )
+        return layouts
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        location_count = options['locations'] * options['scale']
+        volunteer_count = options['volunteers'] * options['scale']
+        started = timer.perf_counter()
+
+        # Deleting a seeded dataset row by row would fire every shift signal, so
+        # benchmarks are meant to run against a fresh database (manage.py flush)
+        if Event.objects.filter(name__startswith=f'{EVENT_PREFIX} {options["seed"]}.').exists():
+            raise CommandError(f'Seed {options["seed"]} is already loaded, flush the database or pick another --seed')
+
+        with transaction.atomic():
+            volunteers = Volunteer.objects.bulk_create(
+                [
+                    Volunteer(
+                        first_name=rng.choice(FIRST_NAMES),
+                        last_name=rng.choice(LAST_NAMES),
+                        email=f'volunteer{number}.{options["seed"]}@{EMAIL_DOMAIN}',
+                        phone_number=f'+30{rng.randrange(10 ** 9, 10 ** 10)}',
+                        is_active=rng.random() < 0.9,
+                    )
+                    for number in range(volunteer_count)
+                ],
+                batch_size=BATCH_SIZE,
+            )
+
+            shifts = []
+            qualifications = []
+            qualified = defaultdict(list)
+            for event_number in range(options['events']):
+                start_date = date(2030, 7, 1) + timedelta(days=30 * event_number)
+                event = Event.objects.create(
+                    name=f'{EVENT_PREFIX} {options["seed"]}.{event_number + 1}',
+                    start_date=start_date,
+                    end_date=start_date + timedelta(days=options['days'] - 1),
+                )
+                locations = Location.objects.bulk_create([
+                    Location(
+                        event=event,
+                        name=f'{LOCATION_NAMES[n % len(LOCATION_NAMES)]} {n // len(LOCATION_NAMES) + 1}',
+                    )
+                    for n in range(location_count)
+                ])
+                positions = Position.objects.bulk_create([
+                    Position(
+                        event=event,
+                        name=self.position_name(n),
+                        color=COLORS[n % len(COLORS)],
+                    )
+                    for n in range(options['positions'])
+                ])
+
+                for volunteer in volunteers:
+                    for position in rng.sample(positions, min(options['qualifications'], len(positions))):
+                        qualified[position.pk].append(volunteer)
+                        qualifications.append(PositionVolunteer(position=position, volunteer=volunteer))
+
+                for shift_date in event.get_dates():
+                    for location in locations:
+                        for position in positions:
+                            shifts.extend(self.make_shifts(rng, event, location, position, shift_date))
+
+            PositionVolunteer.objects.bulk_create(qualifications, batch_size=BATCH_SIZE)
+            Shift.objects.bulk_create(shifts, batch_size=BATCH_SIZE)
+            ShiftLayout.objects.bulk_create(self.make_layouts(shifts), batch_size=BATCH_SIZE)
+
+            # Pick among the qualified volunteers who are free, so nobody is double-booked
+            assignments = []
+            schedule = Schedule()
+            for shift in shifts:
+                candidates = qualified[shift.position_id]
+                places = sum(rng.random() < options['fill'] for _ in range(shift.max_volunteers))
+                interval = shift_minutes(shift)
+                for volunteer in rng.sample(candidates, min(places * CANDIDATES_PER_PLACE, len(candidates))):
+                    if places == 0:
+                        break
+                    if schedule.is_free(volunteer.pk, *interval):
+                        schedule.book(volunteer.pk, *interval)
+                        assignments.append(ShiftVolunteer(shift=shift, volunteer=volunteer))
+                        places -= 1
+            ShiftVolunteer.objects.bulk_create(assignments, batch_size=BATCH_SIZE)
+
+        # bulk_create skips the save signals that invalidate cached pages
+        bump_versions(SCHEDULE_SCOPE, VOLUNTEERS_SCOPE)
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Seeded {options["events"]} events, {location_count * options["events"]} locations, '
+            f'{options["positions"] * options["events"]} positions, {len(shifts)} shifts, '
+            f'{volunteer_count} volunteers, {len(qualifications)} qualifications and '
+            f'{len(assignments)} assignments in {timer.perf_counter() - started:.1f}s'
+        ))
@@ -0,0 +1,30 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from shifts.notifications import process_deliveries
+
+
+class Command(BaseCommand):
+    help = 'Send queued shift notification emails, retrying failed ones with backoff'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=50, help='Deliveries claimed per batch')
+        parser.add_argument('--sleep', type=float, default=5, help='Seconds to wait when the queue is empty')
+        parser.add_argument('--once', action='store_true',
+                            help='Exit once no deliveries are due instead of polling forever')
+
+    def handle(self, *args, **options):
+        self.stdout.write('Notification worker started')
+        try:
+            while True:
+                processed = process_deliveries(limit=options['batch_size'])
+                if processed:
+                    self.stdout.write(f'Processed {processed} deliveries')
+                    continue
+                if options['once']:
+                    break
+                time.sleep(options['sleep'])
+        except KeyboardInterrupt:
+            pass
+        self.stdout.write(self.style.SUCCESS('Notification worker stopped'))
@@ -0,0 +1,113 @@
+# Generated by Django 5.2.18 on 2026-10-18 15:11
+
+import django.db.models.deletion
+import heapq
+from itertools import groupby
+from operator import attrgetter
+
+from django.db import migrations, models
+
+# Frozen copy of shifts.layout as of this migration, so later changes to the
+# layout engine don't change what this backfill does
+GRID_START_HOUR = 6
+MINUTES_PER_DAY = 24 * 60
+
+
+def shift_interval(start_time, end_time):
+    start = start_time.hour * 60 + start_time.minute
+    end = end_time.hour * 60 + end_time.minute
+    duration = (end - start) % MINUTES_PER_DAY
+    if start_time.hour < GRID_START_HOUR:
+        start += MINUTES_PER_DAY
+    start -= GRID_START_HOUR * 60
+    return start, start + duration
+
+
+def layout_shifts(shifts):
+    intervals = []
+    for shift in shifts:
+        start, end = shift_interval(shift.start_time, shift.end_time)
+        shift.grid_row_start = start / 60 + 1
+        shift.grid_row_span = (end - start) / 60
+        intervals.append((start, end, shift))
+    intervals.sort(key=lambda item: item[0])
+
+    position_to_column = {}
+    active = []
+    occupied = set()
+    free_columns = []
+    max_columns = 0
+    for start, end, shift in intervals:
+        while active and (active[0][0] < start or (active[0][0] == start and active[0][1] < start)):
+            _, _, column = heapq.heappop(active)
+            occupied.discard(column)
+            heapq.heappush(free_columns, column)
+
+        column = position_to_column.get(shift.position_id)
+        if column is None or column in occupied:
+            while free_columns and free_columns[0] in occupied:
+                heapq.heappop(free_columns)
+            column = heapq.heappop(free_columns) if free_columns else max_columns
+            position_to_column[shift.position_id] = column
+
+        shift.column = column
+        occupied.add(column)
+        heapq.heappush(active, (end, start, column))
+        max_columns = max(max_columns, column + 1)
+
+    for shift in shifts:
+        shift.total_columns = max_columns
+
+
+def backfill_layouts(apps, schema_editor):
+    Shift = apps.get_model('shifts', 'Shift')
+    ShiftLayout = apps.get_model('shifts', 'ShiftLayout')
+
+    shifts = Shift.objects.order_by('location_id', 'date', 'start_time', 'id')
+    layouts = []
+    for (location_id, date), column_shifts in groupby(shifts, key=attrgetter('location_id', 'date')):
+        column_shifts = list(column_shifts)
+        layout_shifts(column_shifts)
+        layouts.extend(
+            ShiftLayout(
+                shift_id=shift.id,
+                event_id=shift.event_id,
+                location_id=location_id,
+                date=date,
+                row_start=shift.grid_row_start,
+                row_span=shift.grid_row_span,
+                column=shift.column,
+                total_columns=shift.total_columns,
+            )
+            for shift in column_shifts
+        )
+    ShiftLayout.objects.bulk_create(layouts, batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0002_location_address_alter_location_name'),
+        ('shifts', '0004_position_color'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ShiftLayout',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('row_start', models.FloatField()),
+                ('row_span', models.FloatField()),
+                ('column', models.PositiveIntegerField()),
+                ('total_columns', models.PositiveIntegerField()),
+                ('event', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='events.event')),
+                ('location', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='events.location')),
+                ('shift', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='layout', to='shifts.shift')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['event', 'location', 'date'], name='shifts_shif_event_i_0c28a5_idx')],
+            },
+        ),
+        migrations.RunPython(backfill_layouts, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,54 @@
+# Generated by Django 5.2.18 on 2026-10-18 15:32
+
+from django.conf import settings
+from django.db import migrations, models
+
+# Frozen copy of shifts.conflicts.event_minutes as of this migration
+GRID_START_HOUR = 6
+MINUTES_PER_DAY = 24 * 60
+
+
+def event_minutes(date, start_time, end_time):
+    start = start_time.hour * 60 + start_time.minute
+    end = end_time.hour * 60 + end_time.minute
+    duration = (end - start) % MINUTES_PER_DAY
+    if start_time.hour < GRID_START_HOUR:
+        start += MINUTES_PER_DAY
+    start += date.toordinal() * MINUTES_PER_DAY - GRID_START_HOUR * 60
+    return start, start + duration
+
+
+def backfill_intervals(apps, schema_editor):
+    Shift = apps.get_model('shifts', 'Shift')
+    ShiftVolunteer = apps.get_model('shifts', 'ShiftVolunteer')
+
+    for shift in Shift.objects.filter(shiftvolunteer__isnull=False).distinct().iterator():
+        start, end = event_minutes(shift.date, shift.start_time, shift.end_time)
+        ShiftVolunteer.objects.filter(shift_id=shift.id).update(start_minute=start, end_minute=end)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('shifts', '0006_notificationjob_notificationdelivery'),
+        ('volunteers', '0004_volunteer_search_trgm_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='shiftvolunteer',
+            name='end_minute',
+            field=models.IntegerField(editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='shiftvolunteer',
+            name='start_minute',
+            field=models.IntegerField(editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='shiftvolunteer',
+            index=models.Index(fields=['volunteer', 'start_minute'], name='shifts_shif_volunte_04f65e_idx'),
+        ),
+        migrations.RunPython(backfill_intervals, migrations.RunPython.noop),
+    ]
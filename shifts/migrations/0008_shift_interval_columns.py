@@ -0,0 +1,80 @@
+# Generated by Django 5.2.18 on 2026-10-18 15:34
+
+from datetime import datetime, time, timedelta
+
+from django.db import migrations, models
+from django.utils import timezone
+
+# Frozen copy of shifts.layout.shift_interval as of this migration
+GRID_START_HOUR = 6
+MINUTES_PER_DAY = 24 * 60
+
+
+def shift_interval(start_time, end_time):
+    start = start_time.hour * 60 + start_time.minute
+    end = end_time.hour * 60 + end_time.minute
+    duration = (end - start) % MINUTES_PER_DAY
+    if start_time.hour < GRID_START_HOUR:
+        start += MINUTES_PER_DAY
+    start -= GRID_START_HOUR * 60
+    return start, start + duration
+
+
+def backfill_intervals(apps, schema_editor):
+    Shift = apps.get_model('shifts', 'Shift')
+
+    shifts = list(Shift.objects.only('date', 'start_time', 'end_time'))
+    for shift in shifts:
+        start, end = shift_interval(shift.start_time, shift.end_time)
+        grid_start = datetime.combine(shift.date, time(GRID_START_HOUR))
+        shift.starts_at = timezone.make_aware(grid_start + timedelta(minutes=start))
+        shift.ends_at = timezone.make_aware(grid_start + timedelta(minutes=end))
+        shift.duration_minutes = end - start
+    Shift.objects.bulk_update(shifts, ['starts_at', 'ends_at', 'duration_minutes'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0002_location_address_alter_location_name'),
+        ('shifts', '0007_shiftvolunteer_interval'),
+        ('volunteers', '0004_volunteer_search_trgm_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='shift',
+            name='duration_minutes',
+            field=models.PositiveIntegerField(editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='shift',
+            name='ends_at',
+            field=models.DateTimeField(editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='shift',
+            name='starts_at',
+            field=models.DateTimeField(editable=False, null=True),
+        ),
+        migrations.RunPython(backfill_intervals, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='shift',
+            name='duration_minutes',
+            field=models.PositiveIntegerField(editable=False),
+        ),
+        migrations.AlterField(
+            model_name='shift',
+            name='ends_at',
+            field=models.DateTimeField(editable=False),
+        ),
+        migrations.AlterField(
+            model_name='shift',
+            name='starts_at',
+            field=models.DateTimeField(editable=False),
+        ),
+        migrations.AddIndex(
+            model_name='shift',
+            index=models.Index(fields=['event', 'starts_at'], name='shifts_shif_event_i_5a9132_idx'),
+        ),
+    ]
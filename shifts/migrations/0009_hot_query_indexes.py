@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-18 15:35
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0002_location_address_alter_location_name'),
+        ('shifts', '0008_shift_interval_columns'),
+        ('volunteers', '0005_hot_query_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='shift',
+            index=models.Index(fields=['event', 'location', 'date', 'start_time'], name='shifts_shif_event_i_571a7d_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='shift',
+            index=models.Index(fields=['event', 'date', 'start_time'], name='shifts_shif_event_i_d9b8f6_idx'),
+        ),
+    ]
@@ -0,0 +1,77 @@
+# Generated by Django 5.2.18 on 2026-10-18 15:37
+
+import logging
+
+from django.db import migrations, models
+from django.db.models import Count, Max
+
+logger = logging.getLogger(__name__)
+
+SLOT_FIELDS = ('event_id', 'location_id', 'position_id', 'date', 'start_time')
+
+
+def merge_duplicate_shifts(apps, schema_editor):
+    """
+    Merge shifts that share a slot, which the old application-level check let
+    through under concurrent requests, so the constraint can be added.
+
+    The oldest shift of each slot is kept with the largest capacity of the
+    group, and the other shifts' volunteers move to it. Layouts of the
+    affected columns are dropped and get computed again on the next render.
+    """
+    Shift = apps.get_model('shifts', 'Shift')
+    ShiftLayout = apps.get_model('shifts', 'ShiftLayout')
+    ShiftVolunteer = apps.get_model('shifts', 'ShiftVolunteer')
+
+    # Shifts without a position never clash, as NULLs are distinct in unique constraints
+    slots = (
+        Shift.objects.filter(position__isnull=False)
+        .order_by()
+        .values(*SLOT_FIELDS)
+        .annotate(count=Count('id'), max_volunteers=Max('max_volunteers'))
+        .filter(count__gt=1)
+    )
+    for slot in slots:
+        kept, *duplicates = Shift.objects.filter(
+            **{field: slot[field] for field in SLOT_FIELDS}
+        ).order_by('id')
+        duplicate_ids = [shift.id for shift in duplicates]
+
+        # A volunteer booked on several of the shifts keeps a single assignment
+        for booking in ShiftVolunteer.objects.filter(shift_id__in=duplicate_ids).order_by('id'):
+            if ShiftVolunteer.objects.filter(shift=kept, volunteer_id=booking.volunteer_id).exists():
+                booking.delete()
+            else:
+                booking.shift = kept
+                booking.save(update_fields=['shift'])
+
+        kept.max_volunteers = max(slot['max_volunteers'], ShiftVolunteer.objects.filter(shift=kept).count())
+        kept.save(update_fields=['max_volunteers'])
+        Shift.objects.filter(id__in=duplicate_ids).delete()
+        ShiftLayout.objects.filter(location_id=kept.location_id, date=kept.date).delete()
+        logger.info(
+            'Merged %d duplicate shift(s) into shift %d (%s %s, location %d, position %d)',
+            len(duplicate_ids), kept.id, kept.date, kept.start_time, kept.location_id, kept.position_id,
+        )
+
+    # Run the deferred foreign key checks now, as PostgreSQL refuses to alter
+    # a table that still has pending trigger events in the same transaction
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute('SET CONSTRAINTS ALL IMMEDIATE')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0002_location_address_alter_location_name'),
+        ('shifts', '0009_hot_query_indexes'),
+        ('volunteers', '0005_hot_query_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_duplicate_shifts, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='shift',
+            constraint=models.UniqueConstraint(fields=('event', 'location', 'position', 'date', 'start_time'), name='unique_shift_slot', violation_error_message='A shift for this position already exists at this location and time'),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-18 15:54
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('shifts', '0010_unique_shift_slot'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='shiftlayout',
+            name='shifts_shif_event_i_0c28a5_idx',
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.2.18 on 2026-10-18 15:58
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('shifts', '0011_remove_shiftlayout_column_index'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='shiftvolunteer',
+            name='shifts_shif_volunte_04f65e_idx',
+        ),
+        migrations.RemoveField(
+            model_name='shiftvolunteer',
+            name='end_minute',
+        ),
+        migrations.RemoveField(
+            model_name='shiftvolunteer',
+            name='start_minute',
+        ),
+    ]
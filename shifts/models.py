@@ -1,5 +1,9 @@
-from django.db import models
+from contextlib import nullcontext
+
+from django.core.exceptions import ValidationError
+from django.db import IntegrityError, models, router, transaction
 from django.contrib.auth.models import User
+from django.utils import timezone
 from volunteers.models import Volunteer
 from events.models import Event, Location
 from datetime import datetime, time, timedelta
@@ -56,6 +60,8 @@ class PositionVolunteer(models.Model):
     def __str__(self):
         return f"{self.volunteer} - {self.position}"
 
+DUPLICATE_SHIFT_MESSAGE = 'A shift for this position already exists at this location and time'
+
 class Shift(models.Model):
     event = models.ForeignKey(Event, on_delete=models.CASCADE, related_name='shifts')
     location = models.ForeignKey(Location, on_delete=models.CASCADE, related_name='shifts')
@@ -65,6 +71,11 @@ class Shift(models.Model):
     position = models.ForeignKey(Position, on_delete=models.PROTECT, null=True)
     max_volunteers = models.IntegerField(default=1, help_text="Maximum number of volunteers for this position")
     notes = models.TextField(blank=True)
+    # Derived from date, start_time and end_time on save (see update_interval),
+    # so durations, overlaps and ranges need no midnight handling in queries
+    starts_at = models.DateTimeField(editable=False)
+    ends_at = models.DateTimeField(editable=False)
+    duration_minutes = models.PositiveIntegerField(editable=False)
     volunteers = models.ManyToManyField(
         Volunteer,
         through='ShiftVolunteer',
@@ -73,9 +84,33 @@ class Shift(models.Model):
 
     class Meta:
         ordering = ['date', 'start_time']
+        indexes = [
+            models.Index(fields=['event', 'starts_at']),
+            # Week view: one location of an event, in calendar order
+            models.Index(fields=['event', 'location', 'date', 'start_time']),
+            # Day view: all locations of an event on one date
+            models.Index(fields=['event', 'date', 'start_time']),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=['event', 'location', 'position', 'date', 'start_time'],
+                name='unique_shift_slot',
+                violation_error_message=DUPLICATE_SHIFT_MESSAGE,
+            ),
+        ]
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember which calendar column the shift was loaded from, so moving it
+        # rebuilds the layout of the column it left as well
+        instance._loaded_layout_key = (
+            instance.__dict__.get('location_id'),
+            instance.__dict__.get('date'),
+        )
+        return instance
 
     def clean(self):
-        from django.core.exceptions import ValidationError
         if not self.event or not self.date:
             return
 
@@ -88,25 +123,57 @@ class Shift(models.Model):
         #     prev_day = self.date - timedelta(days=1)
         #     if prev_day < self.event.start_date or prev_day > self.event.end_date:
         #         raise ValidationError('Shift date must be within event dates')
-        if self.location.event != self.event:
+        if self.location.event_id != self.event_id:
             raise ValidationError('Location must belong to the same event')
 
-        # Check for duplicate shifts (same position, location, date, and time)
-        duplicate_shifts = Shift.objects.filter(
-            event=self.event,
-            location=self.location,
-            position=self.position,
+        # Duplicates are rejected by the unique_shift_slot constraint, except
+        # for shifts without a position since NULLs never compare equal
+        if self.position_id is None and self._duplicates().exists():
+            raise ValidationError(DUPLICATE_SHIFT_MESSAGE)
+
+    def _duplicates(self):
+        """Other shifts for the same position, location, date and start time."""
+        return Shift.objects.filter(
+            event_id=self.event_id,
+            location_id=self.location_id,
+            position_id=self.position_id,
             date=self.date,
-            start_time=self.start_time
-        )
-        if self.pk:  # If updating existing shift
-            duplicate_shifts = duplicate_shifts.exclude(pk=self.pk)
-        if duplicate_shifts.exists():
-            raise ValidationError('A shift for this position already exists at this location and time')
+            start_time=self.start_time,
+        ).exclude(pk=self.pk)
+
+    def update_interval(self):
+        """
+        Set starts_at, ends_at and duration_minutes from the date and times.
+
+        Like the calendar grid, a shift starting before the grid start hour
+        belongs to the night after its date, and one whose end time is before
+        its start time ends the next day. Call this before bulk_create, which
+        skips save().
+        """
+        from .layout import GRID_START_HOUR, shift_interval
+
+        start, end = shift_interval(self.start_time, self.end_time)
+        grid_start = datetime.combine(self.date, time(GRID_START_HOUR))
+        self.starts_at = timezone.make_aware(grid_start + timedelta(minutes=start))
+        self.ends_at = timezone.make_aware(grid_start + timedelta(minutes=end))
+        self.duration_minutes = end - start
 
     def save(self, *args, **kwargs):
         self.clean()
-        super().save(*args, **kwargs)
+        self.update_interval()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and {'date', 'start_time', 'end_time'} & set(update_fields):
+            kwargs['update_fields'] = {*update_fields, 'starts_at', 'ends_at', 'duration_minutes'}
+
+        # Inside a transaction, a savepoint keeps it usable after a duplicate is rejected
+        connection = transaction.get_connection(kwargs.get('using') or router.db_for_write(Shift))
+        try:
+            with transaction.atomic(using=connection.alias) if connection.in_atomic_block else nullcontext():
+                super().save(*args, **kwargs)
+        except IntegrityError as error:
+            if self._duplicates().exists():
+                raise ValidationError(DUPLICATE_SHIFT_MESSAGE) from error
+            raise
 
     def __str__(self):
         return f"{self.date} {self.start_time}-{self.end_time} ({self.position} at {self.location})"
@@ -116,12 +183,21 @@ class Shift(models.Model):
         return reverse('day_view', args=[str(self.date)])
     
     def get_duration_hours(self):
-        start_datetime = datetime.combine(self.date, self.start_time)
-        end_datetime = datetime.combine(self.date, self.end_time)
-        if end_datetime < start_datetime:  # If shift ends next day
-            end_datetime += timedelta(days=1)
-        duration = end_datetime - start_datetime
-        return duration.total_seconds() / 3600  # Convert to hours
+        return self.duration_minutes / 60
+
+class ShiftLayout(models.Model):
+    """Stored grid placement of a shift within its location/day calendar column."""
+    shift = models.OneToOneField(Shift, on_delete=models.CASCADE, related_name='layout')
+    event = models.ForeignKey(Event, on_delete=models.CASCADE, related_name='+')
+    location = models.ForeignKey(Location, on_delete=models.CASCADE, related_name='+')
+    date = models.DateField()
+    row_start = models.FloatField()
+    row_span = models.FloatField()
+    column = models.PositiveIntegerField()
+    total_columns = models.PositiveIntegerField()
+
+    def __str__(self):
+        return f"{self.shift} [{self.column + 1}/{self.total_columns}]"
 
 class ShiftVolunteer(models.Model):
     shift = models.ForeignKey(Shift, on_delete=models.CASCADE, null=True)
@@ -137,3 +213,63 @@ class ShiftVolunteer(models.Model):
 
     def __str__(self):
         return f"{self.shift} - {self.volunteer}"
+
+class NotificationJob(models.Model):
+    """A bulk send of shift notification emails, drained by the send_notifications worker."""
+    event = models.ForeignKey(Event, on_delete=models.CASCADE, related_name='notification_jobs')
+    created_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    # Confirmation links are built outside of a request, so keep the site root the job was created from
+    base_url = models.CharField(max_length=200)
+
+    class Meta:
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return f"Notifications for {self.event} ({self.created_at:%Y-%m-%d %H:%M})"
+
+    def get_progress(self):
+        """Count deliveries by state with a single aggregate query."""
+        return self.deliveries.aggregate(
+            total=models.Count('id'),
+            sent=models.Count('id', filter=models.Q(status=NotificationDelivery.SENT)),
+            failed=models.Count('id', filter=models.Q(status=NotificationDelivery.FAILED)),
+            remaining=models.Count('id', filter=models.Q(
+                status__in=[NotificationDelivery.PENDING, NotificationDelivery.SENDING]
+            )),
+        )
+
+class NotificationDelivery(models.Model):
+    """One volunteer's email within a NotificationJob, retried with backoff until it is sent."""
+    PENDING = 'pending'
+    SENDING = 'sending'
+    SENT = 'sent'
+    FAILED = 'failed'
+
+    job = models.ForeignKey(NotificationJob, on_delete=models.CASCADE, related_name='deliveries')
+    volunteer = models.ForeignKey(Volunteer, on_delete=models.CASCADE, related_name='notification_deliveries')
+    status = models.CharField(
+        max_length=10,
+        default=PENDING,
+        choices=[
+            (PENDING, 'Pending'),
+            (SENDING, 'Sending'),
+            (SENT, 'Sent'),
+            (FAILED, 'Failed'),
+        ],
+    )
+    attempts = models.PositiveIntegerField(default=0)
+    next_attempt_at = models.DateTimeField()
+    claimed_at = models.DateTimeField(null=True, blank=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+
+    class Meta:
+        unique_together = [('job', 'volunteer')]
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.volunteer} - {self.get_status_display()}"
@@ -0,0 +1,244 @@
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from urllib.parse import urljoin
+
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.db import transaction
+from django.template.loader import render_to_string
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.html import strip_tags
+
+from events.models import Event
+from volunteers.models import Volunteer
+
+from .cache import VOLUNTEERS_SCOPE, bump_versions
+from .models import NotificationDelivery, NotificationJob
+
+# Gmail throttles accounts that open many parallel SMTP sessions, so keep the pool small
+DEFAULT_NOTIFICATION_WORKERS = 4
+
+# A failed delivery is retried after 1, 2, 4 and 8 minutes before it is given up on
+MAX_DELIVERY_ATTEMPTS = 5
+RETRY_BASE_DELAY = timedelta(minutes=1)
+
+# Deliveries claimed longer ago than this belong to a worker that died mid-send
+CLAIM_TIMEOUT = timedelta(minutes=10)
+
+
+def prepare_notification_context(volunteer, event, base_url, preview=False):
+    """
+    Prepare the template context of a volunteer's shift notification email.
+
+    Returns (shifts, context), or (None, None) if the volunteer has no shifts
+    in the event. Unless previewing, a new confirmation token is issued.
+    """
+    shifts = list(
+        volunteer.shifts.filter(event=event)
+        .select_related("location", "position")
+        .order_by("date", "start_time")
+    )
+    if not shifts:
+        return None, None
+
+    if preview:
+        confirmation_token = "preview-token"
+    else:
+        confirmation_token = volunteer.generate_confirmation_token()
+
+    context = {
+        "volunteer": volunteer,
+        "shifts": shifts,
+        "event": event,
+        "confirmation_url": urljoin(
+            base_url, reverse("confirm_shifts", kwargs={"token": confirmation_token})
+        ),
+    }
+    return shifts, context
+
+
+def build_notification_message(event, context):
+    """Render the shift notification email for a prepared template context."""
+    html_message = render_to_string("shifts/email/shift_notification.html", context)
+    message = EmailMultiAlternatives(
+        subject=f"Your Shifts at {event.name}",
+        body=strip_tags(html_message),
+        from_email=f"Athens Rhythm Hop <{settings.EMAIL_HOST_USER}>",
+        to=[context["volunteer"].email],
+    )
+    message.attach_alternative(html_message, "text/html")
+    return message
+
+
+def _deliver_batch(messages, connection_kwargs):
+    """Send messages over one SMTP connection, capturing the error of each message."""
+    errors = [None] * len(messages)
+    connection = get_connection(fail_silently=False, **connection_kwargs)
+    try:
+        connection.open()
+    except Exception as e:
+        return [e] * len(messages)
+
+    try:
+        for index, message in enumerate(messages):
+            try:
+                connection.send_messages([message])
+            except Exception as e:
+                errors[index] = e
+    finally:
+        try:
+            connection.close()
+        except Exception:
+            pass
+    return errors
+
+
+def deliver_messages(messages, workers=None, **connection_kwargs):
+    """
+    Send email messages concurrently, reusing one SMTP connection per worker.
+
+    Messages are split round-robin between at most ``workers`` threads and
+    each thread keeps a single authenticated connection open for its share.
+    A failure only affects its own message.
+
+    Returns a list with the exception raised for each message, or None if it
+    was sent, in the same order as ``messages``.
+    """
+    if not messages:
+        return []
+    if workers is None:
+        workers = getattr(settings, "NOTIFICATION_EMAIL_WORKERS", DEFAULT_NOTIFICATION_WORKERS)
+    workers = max(1, min(workers, len(messages)))
+
+    batches = [messages[worker::workers] for worker in range(workers)]
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        results = list(executor.map(lambda batch: _deliver_batch(batch, connection_kwargs), batches))
+
+    errors = [None] * len(messages)
+    for worker, batch_errors in enumerate(results):
+        errors[worker::workers] = batch_errors
+    return errors
+
+
+def enqueue_notifications(event, base_url, volunteers=None, created_by=None):
+    """
+    Queue a notification email for each volunteer and return the NotificationJob.
+
+    If volunteers is None, every volunteer with shifts in the event who hasn't
+    been notified yet is queued. Volunteers with a delivery for the event still
+    pending or sending are skipped, so a repeated request doesn't queue a second
+    email. The emails are sent by the send_notifications worker, see
+    process_deliveries.
+    """
+    if volunteers is None:
+        volunteers = Volunteer.objects.filter(
+            shifts__event=event, notification_email_sent=False
+        ).distinct()
+
+    now = timezone.now()
+    with transaction.atomic():
+        # Serialize concurrent requests for the event, so each sees the other's deliveries
+        Event.objects.select_for_update().get(pk=event.pk)
+        queued = NotificationDelivery.objects.filter(
+            job__event=event,
+            status__in=[NotificationDelivery.PENDING, NotificationDelivery.SENDING],
+        ).values("volunteer_id")
+        job = NotificationJob.objects.create(event=event, created_by=created_by, base_url=base_url)
+        deliveries = NotificationDelivery.objects.bulk_create(
+            NotificationDelivery(job=job, volunteer_id=volunteer_id, next_attempt_at=now)
+            for volunteer_id in volunteers.exclude(pk__in=queued).values_list("pk", flat=True)
+        )
+        if not deliveries:
+            job.finished_at = now
+            job.save(update_fields=["finished_at"])
+    return job
+
+
+def claim_deliveries(limit, now=None):
+    """Mark up to ``limit`` due deliveries as sending and return them."""
+    now = now or timezone.now()
+    with transaction.atomic():
+        NotificationDelivery.objects.filter(
+            status=NotificationDelivery.SENDING, claimed_at__lt=now - CLAIM_TIMEOUT
+        ).update(status=NotificationDelivery.PENDING)
+
+        # skip_locked lets several workers drain the queue on PostgreSQL
+        delivery_ids = list(
+            NotificationDelivery.objects.select_for_update(skip_locked=True)
+            .filter(status=NotificationDelivery.PENDING, next_attempt_at__lte=now)
+            .order_by("next_attempt_at", "id")
+            .values_list("id", flat=True)[:limit]
+        )
+        NotificationDelivery.objects.filter(id__in=delivery_ids).update(
+            status=NotificationDelivery.SENDING, claimed_at=now
+        )
+    return list(
+        NotificationDelivery.objects.filter(id__in=delivery_ids).select_related("volunteer", "job__event")
+    )
+
+
+def _record_failure(delivery, error, now, retry=True):
+    delivery.attempts += 1
+    delivery.last_error = str(error)
+    if retry and delivery.attempts < MAX_DELIVERY_ATTEMPTS:
+        delivery.status = NotificationDelivery.PENDING
+        delivery.next_attempt_at = now + RETRY_BASE_DELAY * 2 ** (delivery.attempts - 1)
+    else:
+        delivery.status = NotificationDelivery.FAILED
+
+
+def process_deliveries(limit=50, now=None):
+    """
+    Send one batch of due deliveries and record the outcome of each.
+
+    Failed sends are rescheduled with exponential backoff until
+    MAX_DELIVERY_ATTEMPTS is reached. Returns the number of deliveries processed.
+    """
+    now = now or timezone.now()
+    deliveries = claim_deliveries(limit, now)
+    if not deliveries:
+        return 0
+
+    pending = []
+    email_messages = []
+    for delivery in deliveries:
+        try:
+            shifts, context = prepare_notification_context(
+                delivery.volunteer, delivery.job.event, delivery.job.base_url
+            )
+            if not shifts:
+                # Unassigned since the job was queued, retrying won't help
+                _record_failure(delivery, "No shifts found for this volunteer", now, retry=False)
+                continue
+            email_messages.append(build_notification_message(delivery.job.event, context))
+            pending.append(delivery)
+        except Exception as e:
+            _record_failure(delivery, e, now)
+
+    sent_volunteer_ids = []
+    for delivery, error in zip(pending, deliver_messages(email_messages)):
+        if error is None:
+            delivery.attempts += 1
+            delivery.status = NotificationDelivery.SENT
+            delivery.sent_at = timezone.now()
+            delivery.last_error = ""
+            sent_volunteer_ids.append(delivery.volunteer_id)
+        else:
+            _record_failure(delivery, error, now)
+
+    with transaction.atomic():
+        NotificationDelivery.objects.bulk_update(
+            deliveries, ["status", "attempts", "next_attempt_at", "sent_at", "last_error"]
+        )
+        if sent_volunteer_ids:
+            Volunteer.objects.filter(pk__in=sent_volunteer_ids).update(notification_email_sent=True)
+        NotificationJob.objects.filter(
+            id__in={delivery.job_id for delivery in deliveries}, finished_at__isnull=True
+        ).exclude(
+            deliveries__status__in=[NotificationDelivery.PENDING, NotificationDelivery.SENDING]
+        ).update(finished_at=timezone.now())
+
+    if sent_volunteer_ids:
+        bump_versions(VOLUNTEERS_SCOPE)
+    return len(deliveries)
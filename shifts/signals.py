@@ -1,15 +1,74 @@
+import threading
+import weakref
+
+from django.db import transaction
 from django.db.models.signals import post_save, post_delete, m2m_changed
 from django.dispatch import receiver
-from .models import ShiftVolunteer, Shift
+from events.models import Event, Location
+from volunteers.models import Volunteer
+from .cache import SCHEDULE_SCOPE, VOLUNTEERS_SCOPE, bump_versions, bump_versions_on_commit, day_scope
+from .layout import rebuild_layout
+from .live import publish_column_change
+from .models import Position, PositionVolunteer, ShiftVolunteer, Shift
+
+# Volunteer fields that never appear on the calendar pages
+VOLUNTEER_PRIVATE_FIELDS = {'notification_email_sent', 'has_confirmed', 'confirmation_token'}
+
+class _PendingResets(threading.local):
+    """Per thread, a weak reference to the resets waiting on each connection's transaction."""
+
+    def __init__(self):
+        self.by_alias = {}
+
+_pending_resets = _PendingResets()
+
+def _dead():
+    return None
+
+class PendingNotificationResets:
+    """Volunteers whose notification status is reset in one UPDATE once the transaction commits."""
+
+    def __init__(self, using):
+        self.using = using
+        self.volunteer_ids = set()
+
+    def __call__(self):
+        if _pending_resets.by_alias.get(self.using, _dead)() is self:
+            del _pending_resets.by_alias[self.using]
+        reset_notifications(self.volunteer_ids)
+
+def reset_notifications(volunteer_ids):
+    if volunteer_ids:
+        Volunteer.objects.filter(pk__in=volunteer_ids).update(
+            notification_email_sent=False, has_confirmed=False
+        )
+        bump_versions(VOLUNTEERS_SCOPE)
+
+def _pending_notification_resets(using):
+    # Only the on_commit callback holds the buffer, so when a rollback drops
+    # the callback the buffer goes with it and the next change starts afresh
+    buffer = _pending_resets.by_alias.get(using, _dead)()
+    if buffer is None:
+        buffer = PendingNotificationResets(using)
+        _pending_resets.by_alias[using] = weakref.ref(buffer)
+        transaction.on_commit(buffer, using=using)
+    return buffer
 
 @receiver(post_save, sender=ShiftVolunteer)
 @receiver(post_delete, sender=ShiftVolunteer)
-def reset_notification_status(sender, instance, **kwargs):
-    """Reset notification_email_sent and has_confirmed when a volunteer's shifts change."""
-    if instance.volunteer:
-        instance.volunteer.notification_email_sent = False
-        instance.volunteer.has_confirmed = False
-        instance.volunteer.save(update_fields=['notification_email_sent', 'has_confirmed'])
+def reset_notification_status(sender, instance, raw=False, **kwargs):
+    """Reset notification_email_sent and has_confirmed when a volunteer's shifts change.
+
+    Inside a transaction the affected volunteers are collected and reset with a
+    single UPDATE on commit, so bulk assignment flows don't pay a write per row.
+    """
+    if raw or not instance.volunteer_id:
+        return
+    connection = transaction.get_connection()
+    if connection.in_atomic_block:
+        _pending_notification_resets(connection.alias).volunteer_ids.add(instance.volunteer_id)
+    else:
+        reset_notifications({instance.volunteer_id})
 
 @receiver(m2m_changed, sender=Shift.volunteers.through)
 def handle_shift_changes(sender, instance, action, pk_set, **kwargs):
@@ -21,3 +80,99 @@ def handle_shift_changes(sender, instance, action, pk_set, **kwargs):
         
         # Reset notification status and confirmation for all affected volunteers
         affected_volunteers.update(notification_email_sent=False, has_confirmed=False)
+
+        if isinstance(instance, Shift):
+            publish_column_change(instance.event_id, instance.location_id, instance.date)
+            bump_versions_on_commit(day_scope(instance.date), VOLUNTEERS_SCOPE)
+        else:
+            if pk_set:
+                for shift in Shift.objects.filter(pk__in=pk_set).only('event', 'location', 'date'):
+                    publish_column_change(shift.event_id, shift.location_id, shift.date)
+            bump_versions_on_commit(SCHEDULE_SCOPE, VOLUNTEERS_SCOPE)
+
+@receiver(post_save, sender=ShiftVolunteer)
+@receiver(post_delete, sender=ShiftVolunteer)
+def bump_assignment_version(sender, instance, raw=False, **kwargs):
+    """Invalidate cached pages of the day a volunteer was assigned to or removed from."""
+    if raw:
+        return
+    try:
+        shift_date = instance.shift.date if instance.shift_id else None
+    except Shift.DoesNotExist:
+        shift_date = None
+    bump_versions_on_commit(day_scope(shift_date) if shift_date else SCHEDULE_SCOPE)
+
+@receiver(post_save, sender=ShiftVolunteer)
+@receiver(post_delete, sender=ShiftVolunteer)
+def publish_assignment_change(sender, instance, raw=False, **kwargs):
+    """Tell open calendar pages to refresh the column of a shift whose volunteers changed."""
+    if raw or not instance.shift_id:
+        return
+    try:
+        shift = instance.shift
+    except Shift.DoesNotExist:
+        return
+    publish_column_change(shift.event_id, shift.location_id, shift.date)
+
+@receiver(post_save, sender=Shift)
+def rebuild_layout_on_save(sender, instance, raw=False, **kwargs):
+    """Rebuild the stored layout of the calendar column a shift is in, and of the one it left."""
+    if raw:
+        return
+    columns = {(instance.location_id, instance.date)}
+    loaded_key = getattr(instance, '_loaded_layout_key', None)
+    if loaded_key and None not in loaded_key:
+        columns.add(loaded_key)
+
+    for location_id, date in columns:
+        rebuild_layout(location_id, date)
+        publish_column_change(instance.event_id, location_id, date)
+    bump_versions_on_commit(*{day_scope(date) for _, date in columns})
+    instance._loaded_layout_key = (instance.location_id, instance.date)
+
+@receiver(post_delete, sender=Shift)
+def rebuild_layout_on_delete(sender, instance, **kwargs):
+    """Rebuild the stored layout of the calendar column a shift was removed from."""
+    rebuild_layout(instance.location_id, instance.date)
+    publish_column_change(instance.event_id, instance.location_id, instance.date)
+    bump_versions_on_commit(day_scope(instance.date))
+
+@receiver(post_save, sender=Event)
+@receiver(post_delete, sender=Event)
+@receiver(post_save, sender=Location)
+@receiver(post_delete, sender=Location)
+def bump_schedule_version(sender, raw=False, **kwargs):
+    """Invalidate all cached calendar pages when names or colors shown on them change."""
+    if not raw:
+        bump_versions_on_commit(SCHEDULE_SCOPE)
+
+@receiver(post_save, sender=Position)
+@receiver(post_delete, sender=Position)
+def bump_position_version(sender, raw=False, **kwargs):
+    """Invalidate cached calendar pages and volunteer stats when a position changes."""
+    if not raw:
+        bump_versions_on_commit(SCHEDULE_SCOPE, VOLUNTEERS_SCOPE)
+
+@receiver(post_save, sender=PositionVolunteer)
+@receiver(post_delete, sender=PositionVolunteer)
+def bump_position_volunteer_version(sender, raw=False, **kwargs):
+    """Invalidate cached volunteer stats when a volunteer gains or loses a position."""
+    if not raw:
+        bump_versions_on_commit(VOLUNTEERS_SCOPE)
+
+@receiver(m2m_changed, sender=Position.volunteers.through)
+def handle_position_changes(sender, action, **kwargs):
+    """Invalidate cached volunteer stats when positions are set in bulk."""
+    if action in ["post_add", "post_remove", "post_clear"]:
+        bump_versions_on_commit(VOLUNTEERS_SCOPE)
+
+@receiver(post_save, sender=Volunteer)
+@receiver(post_delete, sender=Volunteer)
+def bump_volunteer_version(sender, raw=False, update_fields=None, **kwargs):
+    """Invalidate cached volunteer stats, and calendar pages unless only notification bookkeeping changed."""
+    if raw:
+        return
+    if update_fields and set(update_fields) <= VOLUNTEER_PRIVATE_FIELDS:
+        bump_versions_on_commit(VOLUNTEERS_SCOPE)
+    else:
+        bump_versions_on_commit(SCHEDULE_SCOPE, VOLUNTEERS_SCOPE)
@@ -1,3 +1,1337 @@
-from django.test import TestCase
+import asyncio
+import json
+import os
+import random
+import re
+import tempfile
+import threading
+from collections import defaultdict
+from io import StringIO
+from smtplib import SMTPRecipientsRefused
+from datetime import date, datetime, time, timedelta, timezone as dt_timezone
+from types import SimpleNamespace
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.core import mail
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.exceptions import ValidationError
+from django.core.management.base import CommandError
+from django.core.mail.backends import locmem
+from django.db import connection, transaction
+from django.db.models import Count, F, Q
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from events.models import Event, Location
+from volunteers.models import Volunteer
+
+from .assignments import bulk_assign
+from .autoschedule import OpenShift, auto_schedule, solve
+from .conflicts import Schedule, find_conflicts
+from .layout import assign_columns, shift_interval
+from .live import LocalBroker, get_broker
+from .management.commands import generate_shifts
+from .models import (
+    DUPLICATE_SHIFT_MESSAGE,
+    NotificationDelivery,
+    NotificationJob,
+    Position,
+    PositionVolunteer,
+    Shift,
+    ShiftLayout,
+    ShiftVolunteer,
+)
+from .notifications import (
+    CLAIM_TIMEOUT,
+    MAX_DELIVERY_ATTEMPTS,
+    RETRY_BASE_DELAY,
+    claim_deliveries,
+    enqueue_notifications,
+    process_deliveries,
+)
+from .views import send_shift_notifications
+
+
+def _make_shift(start, end, position_id):
+    return SimpleNamespace(start_time=start, end_time=end, position_id=position_id)
+
+
+def _legacy_process_overlapping_shifts(shifts):
+    """The pairwise overlap scan that assign_columns replaced, kept for parity checks."""
+    all_shifts = sorted(shifts, key=lambda s: (s.start_time.hour, s.start_time.minute))
+    position_to_column = {}
+    all_shifts[0].column = 0
+    position_to_column[all_shifts[0].position_id] = 0
+    max_columns = 1
+
+    for i, shift in enumerate(all_shifts[1:], 1):
+        overlapping_shifts = [
+            s for s in all_shifts[:i]
+            if (s.start_time < shift.end_time and s.end_time > shift.start_time)
+            or (s.start_time == shift.start_time)
+        ]
+        used_columns = set(s.column for s in overlapping_shifts)
+        column = position_to_column.get(shift.position_id)
+        if column is None or column in used_columns:
+            column = 0
+            while column in used_columns:
+                column += 1
+            position_to_column[shift.position_id] = column
+        shift.column = column
+        max_columns = max(max_columns, column + 1)
+
+    for shift in all_shifts:
+        shift.total_columns = max_columns
+
+
+class AssignColumnsTests(SimpleTestCase):
+    def _random_day(self, rng, count):
+        """Shifts within a single 6am-midnight day, so the legacy scan is exact."""
+        shifts = []
+        for _ in range(count):
+            start = rng.randrange(6 * 4, 23 * 4)
+            length = rng.randrange(0, 6 * 4)
+            end = min(start + length, 23 * 4 + 3)
+            shifts.append(_make_shift(
+                time(start // 4, start % 4 * 15),
+                time(end // 4, end % 4 * 15),
+                rng.randrange(1, 6),
+            ))
+        return shifts
+
+    def test_matches_legacy_scan(self):
+        rng = random.Random(1234)
+        for count in (1, 2, 5, 20, 80):
+            for _ in range(50):
+                shifts = self._random_day(rng, count)
+                expected = [_make_shift(s.start_time, s.end_time, s.position_id) for s in shifts]
+                _legacy_process_overlapping_shifts(expected)
+
+                assign_columns(shifts)
+
+                self.assertEqual(
+                    [(s.column, s.total_columns) for s in shifts],
+                    [(s.column, s.total_columns) for s in expected],
+                )
+
+    def test_position_keeps_its_column(self):
+        shifts = [
+            _make_shift(time(9), time(12), 1),
+            _make_shift(time(9), time(12), 2),
+            _make_shift(time(12), time(15), 2),
+            _make_shift(time(12), time(15), 1),
+        ]
+        assign_columns(shifts)
+        self.assertEqual([s.column for s in shifts], [0, 1, 1, 0])
+        self.assertEqual({s.total_columns for s in shifts}, {2})
+
+    def test_shifts_crossing_midnight_overlap_late_shifts(self):
+        shifts = [
+            _make_shift(time(22), time(2), 1),
+            _make_shift(time(1), time(3), 2),
+            _make_shift(time(3), time(5), 3),
+        ]
+        assign_columns(shifts)
+        self.assertEqual([s.column for s in shifts], [0, 1, 0])
+
+    def test_empty(self):
+        self.assertEqual(assign_columns([]), 0)
+
+
+class ShiftIntervalTests(SimpleTestCase):
+    def test_interval_is_relative_to_grid_start(self):
+        self.assertEqual(shift_interval(time(6), time(9)), (0, 180))
+        self.assertEqual(shift_interval(time(21), time(0)), (900, 1080))
+        self.assertEqual(shift_interval(time(2), time(5)), (1200, 1380))
+
+
+class FestivalTestCase(TestCase):
+    """A festival with a Stage and a Gym to staff with Floor shifts."""
+
+    start_date = date(2025, 5, 1)
+    end_date = date(2025, 5, 2)
+
+    def setUp(self):
+        self.event = Event.objects.create(
+            name="Festival", start_date=self.start_date, end_date=self.end_date
+        )
+        self.stage = Location.objects.create(name="Stage", event=self.event)
+        self.gym = Location.objects.create(name="Gym", event=self.event)
+        self.floor = Position.objects.create(name="Floor", event=self.event)
+
+    def _shift(self, start, end, location=None, position=None, day=date(2025, 5, 1), **fields):
+        return Shift.objects.create(
+            event=self.event,
+            location=location or self.stage,
+            position=position or self.floor,
+            date=day,
+            start_time=start,
+            end_time=end,
+            **fields,
+        )
+
+
+class ShiftLayoutTests(FestivalTestCase):
+    start_date = date(2025, 4, 30)
+    end_date = date(2025, 5, 5)
+
+    def setUp(self):
+        super().setUp()
+        self.bar = Position.objects.create(name="Bar", event=self.event)
+
+    def _layout(self, shift):
+        layout = ShiftLayout.objects.get(shift=shift)
+        return layout.column, layout.total_columns
+
+    def test_layout_is_stored_for_column(self):
+        floor = self._shift(time(9), time(12))
+        bar = self._shift(time(10), time(13), position=self.bar)
+
+        self.assertEqual(self._layout(floor), (0, 2))
+        self.assertEqual(self._layout(bar), (1, 2))
+        self.assertEqual(ShiftLayout.objects.get(shift=floor).row_start, 4.0)
+        self.assertEqual(ShiftLayout.objects.get(shift=bar).row_span, 3.0)
+
+    def test_moving_shift_rebuilds_both_columns(self):
+        floor = self._shift(time(9), time(12))
+        bar = self._shift(time(10), time(13), position=self.bar)
+
+        bar = Shift.objects.get(pk=bar.pk)
+        bar.location = self.gym
+        bar.save()
+
+        self.assertEqual(self._layout(floor), (0, 1))
+        self.assertEqual(self._layout(bar), (0, 1))
+        self.assertEqual(ShiftLayout.objects.get(shift=bar).location, self.gym)
+
+    def test_deleting_shift_rebuilds_column(self):
+        floor = self._shift(time(9), time(12))
+        bar = self._shift(time(10), time(13), position=self.bar)
+
+        floor.delete()
+
+        self.assertEqual(self._layout(bar), (0, 1))
+        self.assertEqual(ShiftLayout.objects.count(), 1)
+
+    def test_interval_columns_follow_times(self):
+        night = self._shift(time(22), time(1, 30))
+        early = self._shift(time(2), time(5), position=self.bar)
+
+        self.assertEqual(night.starts_at, datetime(2025, 5, 1, 22, tzinfo=dt_timezone.utc))
+        self.assertEqual(night.ends_at, datetime(2025, 5, 2, 1, 30, tzinfo=dt_timezone.utc))
+        self.assertEqual(night.get_duration_hours(), 3.5)
+        # Shifts before the grid start belong to the night after their date
+        self.assertEqual(early.starts_at, datetime(2025, 5, 2, 2, tzinfo=dt_timezone.utc))
+
+        night.end_time = time(23)
+        night.save(update_fields=["end_time"])
+        night.refresh_from_db()
+        self.assertEqual(night.ends_at, datetime(2025, 5, 1, 23, tzinfo=dt_timezone.utc))
+        self.assertEqual(night.duration_minutes, 60)
+        self.assertEqual(
+            list(Shift.objects.filter(starts_at__lt=datetime(2025, 5, 2, tzinfo=dt_timezone.utc))),
+            [night],
+        )
+
+
+class PublicDayViewCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.event = Event.objects.create(
+            name="Festival", start_date=date(2025, 4, 30), end_date=date(2025, 5, 5)
+        )
+        location = Location.objects.create(name="Stage", event=self.event)
+        position = Position.objects.create(name="Floor", event=self.event)
+        self.shift = Shift.objects.create(
+            event=self.event,
+            location=location,
+            position=position,
+            date=date(2025, 5, 1),
+            start_time=time(9),
+            end_time=time(12),
+        )
+        self.volunteer = Volunteer.objects.create(
+            first_name="Ada", last_name="Lovelace", email="ada@example.com"
+        )
+        self.url = reverse("public_day_view", args=[2025, 5, 1])
+
+    def test_unchanged_day_is_not_modified_without_queries(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+
+        with self.assertNumQueries(0):
+            response = self.client.get(self.url, HTTP_IF_NONE_MATCH=response["ETag"])
+        self.assertEqual(response.status_code, 304)
+
+    def test_rendered_page_is_reused(self):
+        first = self.client.get(self.url)
+
+        with self.assertNumQueries(0):
+            second = self.client.get(self.url)
+        self.assertEqual(second.content, first.content)
+
+    def test_assignment_invalidates_day(self):
+        etag = self.client.get(self.url)["ETag"]
+
+        with self.captureOnCommitCallbacks(execute=True):
+            ShiftVolunteer.objects.create(shift=self.shift, volunteer=self.volunteer)
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+        self.assertContains(response, "Ada Lovelace")
+
+    def test_other_days_stay_cached(self):
+        url = reverse("public_day_view", args=[2025, 5, 2])
+        etag = self.client.get(url)["ETag"]
+
+        with self.captureOnCommitCallbacks(execute=True):
+            ShiftVolunteer.objects.create(shift=self.shift, volunteer=self.volunteer)
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+    def test_day_is_invalidated_only_once_the_change_commits(self):
+        assignment = ShiftVolunteer.objects.create(shift=self.shift, volunteer=self.volunteer)
+        etag = self.client.get(self.url)["ETag"]
+
+        with self.captureOnCommitCallbacks(execute=True):
+            with transaction.atomic():
+                assignment.delete()
+                # A render meanwhile still sees the assignment, so it must not be cached as new
+                self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+
+class AssignVolunteersModalTests(TestCase):
+    def setUp(self):
+        self.event = Event.objects.create(
+            name="Festival", start_date=date(2025, 4, 30), end_date=date(2025, 5, 5)
+        )
+        self.location = Location.objects.create(name="Stage", event=self.event)
+        self.position = Position.objects.create(name="Floor", event=self.event)
+        self.shift = self._shift(time(9), time(12))
+        self.night_shift = self._shift(time(22), time(1, 30))
+        self.client.force_login(User.objects.create_user("coordinator"))
+        self.url = reverse("assign_volunteers_modal", args=[self.shift.id])
+
+    def _shift(self, start, end):
+        return Shift.objects.create(
+            event=self.event,
+            location=self.location,
+            position=self.position,
+            date=date(2025, 5, 1),
+            start_time=start,
+            end_time=end,
+            max_volunteers=3,
+        )
+
+    def _add_candidates(self, count):
+        for _ in range(count):
+            number = Volunteer.objects.count()
+            volunteer = Volunteer.objects.create(
+                first_name=f"Volunteer{number}", last_name="Test", email=f"v{number}@example.com"
+            )
+            PositionVolunteer.objects.create(position=self.position, volunteer=volunteer)
+            ShiftVolunteer.objects.create(shift=self.night_shift, volunteer=volunteer)
+
+    def _count_queries(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        return len(queries)
+
+    def test_query_count_does_not_grow_with_candidates(self):
+        self._add_candidates(2)
+        baseline = self._count_queries()
+
+        self._add_candidates(25)
+        self.assertEqual(self._count_queries(), baseline)
+
+    def test_candidates_have_event_stats(self):
+        self._add_candidates(1)
+        other_event = Event.objects.create(
+            name="Other", start_date=date(2025, 4, 30), end_date=date(2025, 5, 5)
+        )
+        other_location = Location.objects.create(name="Hall", event=other_event)
+        other_shift = Shift.objects.create(
+            event=other_event,
+            location=other_location,
+            position=self.position,
+            date=date(2025, 5, 1),
+            start_time=time(9),
+            end_time=time(17),
+        )
+        volunteer = Volunteer.objects.get()
+        ShiftVolunteer.objects.create(shift=other_shift, volunteer=volunteer)
+
+        candidate = self.client.get(self.url).context["available_volunteers"][0]
+        self.assertEqual(candidate.shift_count, 1)
+        self.assertEqual(candidate.total_hours, 3.5)
+
+    def test_candidates_on_overlapping_shifts_are_flagged(self):
+        self._add_candidates(2)
+        busy, free = Volunteer.objects.order_by("id")
+        # The night shift runs until 1:30, so a 1:00 shift on the same grid day overlaps it
+        late = self._shift(time(1), time(3))
+        ShiftVolunteer.objects.filter(volunteer=free).delete()
+
+        response = self.client.get(reverse("assign_volunteers_modal", args=[late.id]))
+
+        candidates = {volunteer.id: volunteer for volunteer in response.context["available_volunteers"]}
+        self.assertEqual(candidates[busy.id].conflict.shift, self.night_shift)
+        self.assertIsNone(candidates[free.id].conflict)
+        self.assertContains(response, "22:00-01:30")
+
+
+class FailingEmailBackend(locmem.EmailBackend):
+    """Locmem backend that rejects one address and counts opened connections."""
+
+    opened = 0
+
+    def open(self):
+        FailingEmailBackend.opened += 1
+        return super().open()
+
+    def send_messages(self, messages):
+        if any("bounce@example.com" in message.to for message in messages):
+            raise SMTPRecipientsRefused({"bounce@example.com": (550, b"No such user")})
+        return super().send_messages(messages)
+
+
+class NotificationTestCase(TestCase):
+    def setUp(self):
+        self.event = Event.objects.create(
+            name="Festival", start_date=date(2025, 4, 30), end_date=date(2025, 5, 2)
+        )
+        location = Location.objects.create(name="Stage", event=self.event)
+        position = Position.objects.create(name="Floor", event=self.event)
+        shift = Shift.objects.create(
+            event=self.event,
+            location=location,
+            position=position,
+            date=date(2025, 5, 1),
+            start_time=time(9),
+            end_time=time(12),
+            max_volunteers=10,
+        )
+        for name in ["ada", "alan", "grace", "bounce"]:
+            volunteer = Volunteer.objects.create(
+                first_name=name, last_name="Test", email=f"{name}@example.com"
+            )
+            ShiftVolunteer.objects.create(shift=shift, volunteer=volunteer)
+        Volunteer.objects.create(first_name="idle", last_name="Test", email="idle@example.com")
+        FailingEmailBackend.opened = 0
+        self.request = RequestFactory().get("/")
+
+
+@override_settings(EMAIL_BACKEND="shifts.tests.FailingEmailBackend", NOTIFICATION_EMAIL_WORKERS=2)
+class SendShiftNotificationsTests(NotificationTestCase):
+    def test_failures_are_reported_per_recipient(self):
+        with self.assertRaisesMessage(Exception, "Error sending email to bounce@example.com"):
+            send_shift_notifications(self.request, self.event)
+
+        self.assertEqual(
+            sorted(message.to[0] for message in mail.outbox),
+            ["ada@example.com", "alan@example.com", "grace@example.com"],
+        )
+        self.assertEqual(
+            sorted(Volunteer.objects.filter(notification_email_sent=True).values_list("first_name", flat=True)),
+            ["ada", "alan", "grace"],
+        )
+        # One connection per worker, not one per email
+        self.assertEqual(FailingEmailBackend.opened, 2)
+
+    def test_notified_volunteers_are_skipped(self):
+        Volunteer.objects.filter(email="bounce@example.com").update(notification_email_sent=True)
+        send_shift_notifications(self.request, self.event)
+        self.assertEqual(len(mail.outbox), 3)
+
+        mail.outbox = []
+        send_shift_notifications(self.request, self.event)
+        self.assertEqual(mail.outbox, [])
+
+
+@override_settings(EMAIL_BACKEND="shifts.tests.FailingEmailBackend")
+class NotificationQueueTests(NotificationTestCase):
+    def test_worker_sends_queued_notifications_and_retries_failures(self):
+        job = enqueue_notifications(self.event, "https://example.com/")
+        self.assertEqual(mail.outbox, [])
+        self.assertEqual(job.get_progress(), {"total": 4, "sent": 0, "failed": 0, "remaining": 4})
+
+        now = timezone.now()
+        self.assertEqual(process_deliveries(now=now), 4)
+        self.assertEqual(len(mail.outbox), 3)
+        confirm_url = reverse("confirm_shifts", args=[Volunteer.objects.get(email=mail.outbox[0].to[0]).confirmation_token])
+        self.assertIn(f"https://example.com{confirm_url}", mail.outbox[0].body)
+        self.assertEqual(job.get_progress(), {"total": 4, "sent": 3, "failed": 0, "remaining": 1})
+
+        bounce = NotificationDelivery.objects.get(volunteer__email="bounce@example.com")
+        self.assertEqual(bounce.status, NotificationDelivery.PENDING)
+        self.assertEqual(bounce.next_attempt_at, now + RETRY_BASE_DELAY)
+        # Not due yet
+        self.assertEqual(process_deliveries(now=now), 0)
+
+        for attempt in range(1, MAX_DELIVERY_ATTEMPTS):
+            self.assertEqual(process_deliveries(now=now + RETRY_BASE_DELAY * 2 ** attempt), 1)
+        bounce.refresh_from_db()
+        self.assertEqual(bounce.status, NotificationDelivery.FAILED)
+        self.assertEqual(bounce.attempts, MAX_DELIVERY_ATTEMPTS)
+        self.assertIn("No such user", bounce.last_error)
+
+        job.refresh_from_db()
+        self.assertIsNotNone(job.finished_at)
+        self.assertEqual(job.get_progress(), {"total": 4, "sent": 3, "failed": 1, "remaining": 0})
+        self.assertFalse(Volunteer.objects.get(email="bounce@example.com").notification_email_sent)
+
+    def test_repeated_request_does_not_queue_twice(self):
+        first = enqueue_notifications(self.event, "https://example.com/")
+        second = enqueue_notifications(self.event, "https://example.com/")
+
+        self.assertEqual(first.get_progress()["total"], 4)
+        self.assertEqual(second.get_progress()["total"], 0)
+        self.assertIsNotNone(second.finished_at)
+        process_deliveries()
+        self.assertEqual(len(mail.outbox), 3)
+
+    def test_abandoned_claims_are_retried(self):
+        enqueue_notifications(self.event, "https://example.com/")
+        claim_deliveries(limit=10)
+        self.assertEqual(process_deliveries(), 0)
+        self.assertEqual(process_deliveries(now=timezone.now() + CLAIM_TIMEOUT * 2), 4)
+
+    def test_progress_endpoint(self):
+        self.event.end_date = timezone.now().date() + timedelta(days=1)
+        self.event.save()
+        self.client.force_login(User.objects.create_user("coordinator"))
+
+        response = self.client.post(reverse("notify_volunteers"), HTTP_HX_REQUEST="true")
+        job = NotificationJob.objects.get()
+        progress_url = reverse("notification_progress", args=[job.id])
+        self.assertContains(response, progress_url)
+        self.assertContains(response, "4 remaining")
+
+        process_deliveries()
+        response = self.client.get(progress_url)
+        self.assertContains(response, "3 sent")
+        self.assertContains(response, "1 remaining")
+
+
+class GenerateShiftsTests(TestCase):
+    def setUp(self):
+        self.event = Event.objects.create(
+            name="Festival", start_date=date(2025, 5, 1), end_date=date(2025, 5, 2)
+        )
+        self.hall = Location.objects.create(name="Hall", event=self.event)
+        self.studio = Location.objects.create(name="Studio", event=self.event)
+        self.floor = Position.objects.create(name="Floor", event=self.event)
+        self.bar = Position.objects.create(name="Bar", event=self.event)
+
+    def _generate(self, *args):
+        out = StringIO()
+        call_command("generate_shifts", "--event", str(self.event.id), *args, stdout=out)
+        return out.getvalue()
+
+    def _write_pattern(self, pattern):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        path = os.path.join(directory.name, "pattern.json")
+        with open(path, "w") as pattern_file:
+            json.dump(pattern, pattern_file)
+        return path
+
+    def test_default_pattern(self):
+        self._generate()
+
+        # 5 daytime blocks per day, and the 2 blocks after midnight only for the first night
+        self.assertEqual(Shift.objects.count(), 2 * 2 * (5 * 2 + 2))
+        self.assertFalse(Shift.objects.filter(date__gt=self.event.end_date).exists())
+        # Layouts are built even though bulk_create skips the save signals
+        self.assertEqual(ShiftLayout.objects.count(), Shift.objects.count())
+
+        self.assertIn("Created 0 shifts", self._generate())
+
+    def test_shifts_created_meanwhile_are_not_counted(self):
+        plan_shifts = generate_shifts.plan_shifts
+
+        def concurrent_run(*args):
+            # Another run creates one of the shifts once they are planned
+            planned = plan_shifts(*args)
+            Shift.objects.create(
+                event=self.event, location=planned[0].location, position=planned[0].position,
+                date=planned[0].date, start_time=planned[0].start_time, end_time=planned[0].end_time,
+            )
+            return planned
+
+        with mock.patch.object(generate_shifts, "plan_shifts", side_effect=concurrent_run):
+            output = self._generate()
+
+        total = 2 * 2 * (5 * 2 + 2)
+        self.assertEqual(Shift.objects.count(), total)
+        self.assertIn(f"Created {total - 1} shifts", output)
+        self.assertIn("(1 already existed)", output)
+
+    def test_pattern_file_and_dry_run(self):
+        Shift.objects.create(
+            event=self.event, location=self.hall, position=self.bar,
+            date=date(2025, 5, 1), start_time=time(10), end_time=time(14), max_volunteers=1,
+        )
+        path = self._write_pattern({
+            "locations": ["hall"],
+            "positions": {"Floor": None, "Bar": 2},
+            "blocks": [
+                {"start": "10:00", "end": "14:00", "max_volunteers": 4},
+                {"start": "20:00", "end": "23:00", "locations": ["Studio"], "positions": {"Floor": 1}},
+            ],
+        })
+
+        output = self._generate(path, "--dry-run")
+        self.assertIn("+ 2025-05-01 10:00-14:00 Hall / Floor (max 4)", output)
+        self.assertIn("~ 2025-05-01 10:00-14:00 Hall / Bar (max 1) differs from pattern", output)
+        self.assertIn("5 shifts would be created", output)
+        self.assertEqual(Shift.objects.count(), 1)
+
+        self._generate(path)
+        self.assertEqual(Shift.objects.count(), 6)
+        self.assertEqual(
+            Shift.objects.get(date=date(2025, 5, 2), location=self.hall, position=self.bar).max_volunteers, 2
+        )
+        self.assertEqual(Shift.objects.filter(location=self.studio, position=self.floor).count(), 2)
+
+    def test_unknown_position(self):
+        path = self._write_pattern({"positions": {"Stage": 1}, "blocks": [{"start": "10:00", "end": "12:00"}]})
+        with self.assertRaisesMessage(CommandError, "Unknown positions in shift pattern: Stage"):
+            self._generate(path)
+
+
+class SeedBenchmarkTests(TestCase):
+    def test_seed_dataset(self):
+        call_command(
+            "seed_benchmark", "--days", "2", "--locations", "2", "--positions", "10",
+            "--volunteers", "20", "--seed", "7", stdout=StringIO(),
+        )
+
+        event = Event.objects.get()
+        self.assertEqual(len(event.get_dates()), 2)
+        self.assertEqual(Volunteer.objects.count(), 20)
+        self.assertEqual(PositionVolunteer.objects.count(), 20 * 2)
+        self.assertEqual(ShiftLayout.objects.count(), Shift.objects.count())
+        self.assertTrue(ShiftVolunteer.objects.exists())
+        positions = Position.objects.values_list("name", flat=True)
+        self.assertEqual(len(set(positions)), 10)
+
+        # Assignments respect qualifications, capacity and each volunteer's other shifts
+        self.assertFalse(
+            ShiftVolunteer.objects.exclude(
+                volunteer__available_positions=F("shift__position")
+            ).exists()
+        )
+        self.assertFalse(
+            Shift.objects.annotate(assigned=Count("shiftvolunteer"))
+            .filter(assigned__gt=F("max_volunteers"))
+            .exists()
+        )
+        for booking in ShiftVolunteer.objects.select_related("shift"):
+            self.assertEqual(
+                find_conflicts([booking.volunteer_id], booking.shift.starts_at, booking.shift.ends_at,
+                               exclude_shift=booking.shift_id),
+                {},
+            )
+
+        with self.assertRaisesMessage(CommandError, "Seed 7 is already loaded"):
+            call_command("seed_benchmark", "--seed", "7", stdout=StringIO())
+
+
+class NotificationResetTests(TestCase):
+    def setUp(self):
+        event = Event.objects.create(
+            name="Festival", start_date=date(2025, 4, 30), end_date=date(2025, 5, 2)
+        )
+        location = Location.objects.create(name="Stage", event=event)
+        position = Position.objects.create(name="Floor", event=event)
+        self.shifts = [
+            Shift.objects.create(
+                event=event, location=location, position=position,
+                date=date(2025, 5, 1), start_time=time(hour), end_time=time(hour + 1),
+            )
+            for hour in (9, 10, 11)
+        ]
+        self.volunteers = [
+            Volunteer.objects.create(
+                first_name=name, last_name="Test", email=f"{name}@example.com",
+                notification_email_sent=True, has_confirmed=True,
+            )
+            for name in ("ada", "alan")
+        ]
+
+    def _reset_updates(self, queries):
+        return [
+            query for query in queries.captured_queries
+            if query["sql"].startswith('UPDATE "volunteers_volunteer"')
+        ]
+
+    def test_resets_are_coalesced_until_commit(self):
+        with CaptureQueriesContext(connection) as queries, self.captureOnCommitCallbacks(execute=True):
+            with transaction.atomic():
+                for shift in self.shifts:
+                    for volunteer in self.volunteers:
+                        ShiftVolunteer.objects.create(shift=shift, volunteer=volunteer)
+                # Nothing is written until the transaction commits
+                self.assertEqual(self._reset_updates(queries), [])
+
+        self.assertEqual(len(self._reset_updates(queries)), 1)
+        self.assertFalse(
+            Volunteer.objects.filter(Q(notification_email_sent=True) | Q(has_confirmed=True)).exists()
+        )
+
+    def test_rolled_back_savepoint_drops_its_resets(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            with transaction.atomic():
+                try:
+                    with transaction.atomic():
+                        ShiftVolunteer.objects.create(shift=self.shifts[1], volunteer=self.volunteers[1])
+                        raise RuntimeError
+                except RuntimeError:
+                    pass
+                ShiftVolunteer.objects.create(shift=self.shifts[0], volunteer=self.volunteers[0])
+
+        self.volunteers[0].refresh_from_db()
+        self.volunteers[1].refresh_from_db()
+        self.assertFalse(self.volunteers[0].notification_email_sent)
+        self.assertTrue(self.volunteers[1].notification_email_sent)
+
+    def test_resets_after_a_rollback_still_run(self):
+        try:
+            with transaction.atomic():
+                ShiftVolunteer.objects.create(shift=self.shifts[0], volunteer=self.volunteers[0])
+                raise RuntimeError
+        except RuntimeError:
+            pass
+
+        with self.captureOnCommitCallbacks(execute=True):
+            with transaction.atomic():
+                ShiftVolunteer.objects.create(shift=self.shifts[1], volunteer=self.volunteers[1])
+
+        self.volunteers[0].refresh_from_db()
+        self.volunteers[1].refresh_from_db()
+        self.assertTrue(self.volunteers[0].notification_email_sent)
+        self.assertFalse(self.volunteers[1].notification_email_sent)
+
+
+class BulkAssignTests(TestCase):
+    def setUp(self):
+        event = Event.objects.create(
+            name="Festival", start_date=date(2025, 4, 30), end_date=date(2025, 5, 2)
+        )
+        location = Location.objects.create(name="Stage", event=event)
+        position = Position.objects.create(name="Floor", event=event)
+        self.shifts = [
+            Shift.objects.create(
+                event=event, location=location, position=position,
+                date=date(2025, 5, 1), start_time=time(hour), end_time=time(hour + 1),
+                max_volunteers=2,
+            )
+            for hour in (9, 10)
+        ]
+        self.volunteers = [
+            Volunteer.objects.create(
+                first_name=name, last_name="Test", email=f"{name}@example.com", has_confirmed=True
+            )
+            for name in ("ada", "alan", "grace")
+        ]
+        ShiftVolunteer.objects.create(shift=self.shifts[0], volunteer=self.volunteers[0])
+        self.user = User.objects.create_user("coordinator")
+        self.client.force_login(self.user)
+
+    def _post(self, assignments):
+        return self.client.post(
+            reverse("bulk_assign_volunteers"),
+            json.dumps({"assignments": assignments}),
+            content_type="application/json",
+        )
+
+    def test_bulk_assign(self):
+        first, second = self.shifts
+        ada, alan, grace = self.volunteers
+
+        with self.captureOnCommitCallbacks(execute=True), CaptureQueriesContext(connection) as queries:
+            response = self._post([
+                {"shift": first.id, "volunteer": ada.id},
+                {"shift": first.id, "volunteer": alan.id},
+                {"shift": first.id, "volunteer": grace.id},
+                {"shift": second.id, "volunteer": alan.id},
+                {"shift": second.id, "volunteer": grace.id},
+                {"shift": second.id, "volunteer": grace.id},
+                {"shift": 0, "volunteer": ada.id},
+            ])
+
+        self.assertEqual(response.json(), {
+            "assigned": [
+                {"shift": first.id, "volunteer": alan.id},
+                {"shift": second.id, "volunteer": alan.id},
+                {"shift": second.id, "volunteer": grace.id},
+            ],
+            "errors": [
+                {"shift": first.id, "volunteer": ada.id, "error": "Volunteer already assigned to this shift"},
+                {"shift": first.id, "volunteer": grace.id, "error": "Shift is full"},
+                {"shift": second.id, "volunteer": grace.id, "error": "Volunteer already assigned to this shift"},
+                {"shift": 0, "volunteer": ada.id, "error": "Shift not found"},
+            ],
+        })
+        self.assertEqual(ShiftVolunteer.objects.filter(assigned_by=self.user).count(), 3)
+        # Validation and insert don't grow with the number of pairs
+        self.assertLess(len(queries), 15)
+        grace.refresh_from_db()
+        self.assertFalse(grace.has_confirmed)
+
+    def test_invalid_body(self):
+        response = self._post([{"shift": "x", "volunteer": 1}])
+        self.assertEqual(response.status_code, 400)
+
+    def test_single_assignment_reports_full_shift(self):
+        ShiftVolunteer.objects.create(shift=self.shifts[0], volunteer=self.volunteers[1])
+        response = self.client.post(
+            reverse("assign_volunteer", args=[self.shifts[0].id]), {"volunteer_id": self.volunteers[2].id}
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.content, b"Shift is full")
+
+
+class AutoScheduleTests(TestCase):
+    def test_solve_respects_constraints(self):
+        shifts = [
+            OpenShift(1, "floor", 0, 180, 2),
+            OpenShift(2, "floor", 120, 240, 1),
+            OpenShift(3, "bar", 0, 120, 1),
+            OpenShift(4, "floor", 300, 480, 1),
+        ]
+        eligibility = {"floor": ["ada", "alan", "grace"], "bar": ["ada"]}
+
+        assignments = solve(shifts, eligibility, max_minutes=300)
+
+        by_volunteer = defaultdict(list)
+        for shift_id, volunteer_id in assignments:
+            by_volunteer[volunteer_id].append(shifts[shift_id - 1])
+        for volunteer_id, booked in by_volunteer.items():
+            booked.sort(key=lambda shift: shift.start)
+            self.assertTrue(all(a.end <= b.start for a, b in zip(booked, booked[1:])), volunteer_id)
+            self.assertTrue(all(volunteer_id in eligibility[shift.position_id] for shift in booked))
+            self.assertLessEqual(sum(shift.end - shift.start for shift in booked), 300)
+        # Only three volunteers can work floor, so shifts 1 and 2 can't both be full
+        self.assertEqual(len(assignments), 4)
+        self.assertIn((3, "ada"), assignments)
+
+    def test_auto_schedule_fills_event(self):
+        event = Event.objects.create(
+            name="Festival", start_date=date(2025, 5, 1), end_date=date(2025, 5, 1)
+        )
+        location = Location.objects.create(name="Stage", event=event)
+        floor = Position.objects.create(name="Floor", event=event)
+        late = Shift.objects.create(
+            event=event, location=location, position=floor, date=date(2025, 5, 1),
+            start_time=time(23), end_time=time(2), max_volunteers=2,
+        )
+        # Starts after midnight, so it is the same night and overlaps the late shift
+        night = Shift.objects.create(
+            event=event, location=location, position=floor, date=date(2025, 5, 1),
+            start_time=time(1), end_time=time(3), max_volunteers=2,
+        )
+        volunteers = [
+            Volunteer.objects.create(first_name=name, last_name="Test", email=f"{name}@example.com")
+            for name in ("ada", "alan", "grace")
+        ]
+        Volunteer.objects.filter(pk=volunteers[2].pk).update(is_active=False)
+        for volunteer in volunteers:
+            PositionVolunteer.objects.create(position=floor, volunteer=volunteer)
+        ShiftVolunteer.objects.create(shift=late, volunteer=volunteers[0])
+
+        assigned, open_places = auto_schedule(event, dry_run=True)
+        self.assertEqual(open_places, 3)
+        self.assertFalse(ShiftVolunteer.objects.filter(shift=night).exists())
+
+        assigned, _ = auto_schedule(event)
+        self.assertEqual(len(assigned), 1)
+        # Ada already works the overlapping late shift and Grace is inactive,
+        # so only Alan is left, on the scarcer of the two shifts
+        self.assertEqual(
+            set(ShiftVolunteer.objects.values_list("shift_id", "volunteer_id")),
+            {(late.id, volunteers[0].id), (night.id, volunteers[1].id)},
+        )
+
+
+class ConflictIndexTests(FestivalTestCase):
+    start_date = date(2025, 4, 30)
+    end_date = date(2025, 5, 3)
+
+    def setUp(self):
+        super().setUp()
+        self.volunteer = Volunteer.objects.create(
+            first_name="Ada", last_name="Test", email="ada@example.com"
+        )
+
+    def _conflicts(self, shift):
+        return find_conflicts([self.volunteer.id], shift.starts_at, shift.ends_at, exclude_shift=shift.id)
+
+    def test_overlaps_across_midnight_and_locations(self):
+        night = self._shift(time(23), time(2))
+        ShiftVolunteer.objects.create(shift=night, volunteer=self.volunteer)
+
+        early = self._shift(time(1), time(3), self.gym)
+        next_night = self._shift(time(1), time(3), self.gym, day=date(2025, 5, 2))
+        evening = self._shift(time(20), time(23), self.gym)
+
+        self.assertEqual(self._conflicts(early)[self.volunteer.id].shift, night)
+        self.assertEqual(self._conflicts(next_night), {})
+        self.assertEqual(self._conflicts(evening), {})
+
+    def test_schedule_sees_past_overlapping_bookings(self):
+        schedule = Schedule()
+        schedule.book(1, 600, 1200)
+        schedule.book(1, 660, 720)
+
+        self.assertFalse(schedule.is_free(1, 840, 900))
+        self.assertTrue(schedule.is_free(1, 1200, 1260))
+        self.assertTrue(schedule.is_free(1, 540, 600))
+
+    def test_index_follows_shift_changes(self):
+        morning = self._shift(time(9), time(12))
+        afternoon = self._shift(time(14), time(17), self.gym)
+        morning.volunteers.add(self.volunteer)
+        self.assertEqual(self._conflicts(afternoon), {})
+
+        morning.end_time = time(15)
+        morning.save()
+
+        self.assertEqual(self._conflicts(afternoon)[self.volunteer.id].shift, morning)
+
+    def test_bulk_assign_refuses_double_booking(self):
+        morning = self._shift(time(9), time(12))
+        overlapping = self._shift(time(11), time(14), self.gym, max_volunteers=2)
+        later = self._shift(time(12), time(15), self.gym, max_volunteers=2)
+        other = Volunteer.objects.create(first_name="Alan", last_name="Test", email="alan@example.com")
+        ShiftVolunteer.objects.create(shift=morning, volunteer=self.volunteer)
+
+        assigned, errors = bulk_assign([
+            (overlapping.id, self.volunteer.id),
+            (later.id, self.volunteer.id),
+            (overlapping.id, other.id),
+            (later.id, other.id),
+        ])
+
+        self.assertEqual(assigned, [(later.id, self.volunteer.id), (overlapping.id, other.id)])
+        self.assertEqual(
+            [error["error"] for error in errors],
+            ["Volunteer already has an overlapping shift"] * 2,
+        )
+        self.assertTrue(ShiftVolunteer.objects.filter(shift=later, volunteer=self.volunteer).exists())
+
+
+class QueryPlanTests(FestivalTestCase):
+    """The calendar and confirmation lookups are served by their dedicated indexes."""
+
+    def _plan(self, queryset):
+        if connection.vendor == "postgresql":
+            # Test tables are tiny and cheaper to scan, so have the planner show its index choice
+            with connection.cursor() as cursor:
+                cursor.execute("SET LOCAL enable_seqscan = off")
+        return queryset.explain()
+
+    def _index(self, model, fields):
+        return next(index.name for index in model._meta.indexes if index.fields == fields)
+
+    def test_week_view_query(self):
+        plan = self._plan(Shift.objects.filter(event=self.event, location=self.stage))
+        self.assertIn(self._index(Shift, ["event", "location", "date", "start_time"]), plan)
+
+    def test_day_view_query(self):
+        plan = self._plan(Shift.objects.filter(date=date(2025, 5, 1), event=self.event))
+        self.assertIn(self._index(Shift, ["event", "date", "start_time"]), plan)
+
+    def test_confirm_query(self):
+        plan = self._plan(Volunteer.objects.filter(confirmation_token="token"))
+        self.assertIn(self._index(Volunteer, ["confirmation_token"]), plan)
+
+    def test_active_roster_query(self):
+        plan = self._plan(
+            Volunteer.objects.filter(is_active=True).order_by("first_name", "last_name", "id")
+        )
+        self.assertIn("volunteer_active_name_idx", plan)
+
+
+class ShiftUniquenessTests(FestivalTestCase):
+    def _unsaved_shift(self, position, start=time(9)):
+        return Shift(
+            event=self.event, location=self.stage, position=position,
+            date=date(2025, 5, 1), start_time=start, end_time=time(12),
+        )
+
+    def test_duplicate_is_rejected_by_the_database(self):
+        self._unsaved_shift(self.floor).save()
+
+        with CaptureQueriesContext(connection) as queries:
+            with self.assertRaisesMessage(ValidationError, DUPLICATE_SHIFT_MESSAGE):
+                self._unsaved_shift(self.floor).save()
+        # No duplicate lookup before the insert, only once it has failed
+        statements = [query["sql"] for query in queries]
+        insert = next(i for i, sql in enumerate(statements) if sql.startswith("INSERT"))
+        self.assertFalse([sql for sql in statements[:insert] if sql.startswith("SELECT 1")])
+
+        # The surrounding transaction is still usable
+        self.assertEqual(Shift.objects.count(), 1)
+        self._unsaved_shift(self.floor, start=time(12)).save()
+
+    def test_full_clean_reports_duplicate(self):
+        self._unsaved_shift(self.floor).save()
+        with self.assertRaisesMessage(ValidationError, DUPLICATE_SHIFT_MESSAGE):
+            self._unsaved_shift(self.floor).full_clean()
+
+    def test_duplicate_without_position(self):
+        self._unsaved_shift(None).save()
+        with self.assertRaisesMessage(ValidationError, DUPLICATE_SHIFT_MESSAGE):
+            self._unsaved_shift(None).save()
+
+
+class GridUpdateTests(FestivalTestCase):
+    """Modal mutations re-render only the affected calendar columns or card."""
+
+    def setUp(self):
+        super().setUp()
+        self.shift = self._shift(time(9), time(12))
+        self.other_shift = self._shift(time(9), time(12), self.gym)
+        self.client.force_login(User.objects.create_user("coordinator"))
+        self.day_url = reverse("location_day_view", args=[2025, 5, 1])
+
+    def _column(self, location, day=date(2025, 5, 1)):
+        return f'id="column-{location.id}-{day.isoformat()}" hx-swap-oob="true"'
+
+    def test_full_day_view_has_column_and_card_ids(self):
+        response = self.client.get(self.day_url)
+        self.assertContains(response, f'id="column-{self.stage.id}-2025-05-01"')
+        self.assertContains(response, f'id="shift-{self.shift.id}"')
+        self.assertNotContains(response, "hx-swap-oob")
+
+    def test_add_shift_renders_its_column(self):
+        response = self.client.post(
+            reverse("add_shift_modal"),
+            {
+                "position": self.floor.id, "date": "2025-05-01", "location": self.stage.id,
+                "start_time": "13:00", "end_time": "15:00", "event": self.event.id,
+            },
+            HTTP_REFERER=f"http://testserver{self.day_url}",
+        )
+
+        self.assertEqual(response["HX-Reswap"], "none")
+        self.assertContains(response, self._column(self.stage))
+        self.assertNotContains(response, f"column-{self.gym.id}-")
+        self.assertNotContains(response, f"shift-{self.other_shift.id}")
+        self.assertContains(response, 'id="shift-', count=2)
+
+    def _move_to_gym(self, page_url):
+        return self.client.post(
+            reverse("edit_shift_modal", args=[self.shift.id]),
+            {
+                "position": self.floor.id, "location": self.gym.id,
+                "start_time": "10:00", "end_time": "12:00", "max_volunteers": 1,
+            },
+            HTTP_REFERER=f"http://testserver{page_url}",
+        )
+
+    def test_moving_shift_renders_both_columns(self):
+        response = self._move_to_gym(self.day_url)
+
+        self.assertContains(response, self._column(self.stage))
+        self.assertContains(response, self._column(self.gym))
+        self.assertContains(response, f'id="shift-{self.shift.id}"', count=1)
+        self.assertContains(response, f'id="shift-{self.other_shift.id}"', count=1)
+
+    def test_moving_shift_in_week_view_renders_only_the_shown_location(self):
+        # Week view columns are dates of one location
+        response = self._move_to_gym(reverse("week_view") + f"?location={self.stage.id}")
+
+        self.assertContains(response, self._column(self.stage))
+        self.assertNotContains(response, f"column-{self.gym.id}-")
+        self.assertNotContains(response, 'id="shift-')
+
+    def test_delete_renders_its_column(self):
+        response = self.client.delete(
+            reverse("edit_shift_modal", args=[self.shift.id]),
+            HTTP_REFERER=f"http://testserver{self.day_url}",
+        )
+
+        self.assertContains(response, self._column(self.stage))
+        self.assertNotContains(response, 'id="shift-')
+
+    def test_closing_assign_modal_renders_the_card(self):
+        response = self.client.post(
+            reverse("assign_volunteers_modal", args=[self.shift.id]),
+            {"action": "close", "source": "week"},
+        )
+
+        self.assertEqual(response["HX-Reswap"], "none")
+        self.assertContains(response, f'id="shift-{self.shift.id}" hx-swap-oob="true"')
+        self.assertNotContains(response, "column-")
+
+
+class GridQueryCountTests(FestivalTestCase):
+    """Calendar renders cost the same number of queries however long the event runs."""
+
+    def setUp(self):
+        super().setUp()
+        self.volunteer = Volunteer.objects.create(
+            first_name="Ada", last_name="Lovelace", email="ada@example.com", phone_number="+301"
+        )
+        self._add_days(date(2025, 5, 1), 2)
+        self.client.force_login(User.objects.create_user("coordinator"))
+
+    def _add_days(self, first_day, days):
+        for offset in range(days):
+            for location in (self.stage, self.gym):
+                for hour in (9, 10, 22):
+                    shift = self._shift(
+                        time(hour), time((hour + 3) % 24), location, day=first_day + timedelta(days=offset)
+                    )
+                    ShiftVolunteer.objects.create(shift=shift, volunteer=self.volunteer)
+
+    def _count_queries(self, url):
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(self.client.get(url).status_code, 200)
+        return len(queries)
+
+    def test_week_view_queries_do_not_grow_with_event_length(self):
+        url = reverse("week_view") + f"?location={self.stage.id}"
+        short_event = self._count_queries(url)
+
+        self.event.end_date = date(2025, 5, 10)
+        self.event.save()
+        self._add_days(date(2025, 5, 3), 8)
+
+        self.assertEqual(self._count_queries(url), short_event)
+
+    def test_shifts_without_stored_layout_are_laid_out_in_memory(self):
+        ShiftLayout.objects.all().delete()
+        url = reverse("week_view") + f"?location={self.stage.id}"
+
+        response = self.client.get(url)
+
+        # 9-12 and 10-13 overlap, 22-01 stays in the column its position last had
+        cards = re.findall(r"left: calc\((\d) \* \(100% / (\d)\)\)", response.content.decode())
+        self.assertCountEqual(cards, [("0", "2"), ("1", "2"), ("1", "2")] * 2)
+
+
+class OverviewTests(TestCase):
+    """The all-locations overview renders a frame whose columns load as they scroll into view."""
+
+    def setUp(self):
+        self.event = Event.objects.create(
+            name="Festival", start_date=date(2025, 5, 1), end_date=date(2025, 5, 3)
+        )
+        self.locations = [
+            Location.objects.create(name=f"Room {number}", event=self.event) for number in range(3)
+        ]
+        self.floor = Position.objects.create(name="Floor", event=self.event)
+        self.shift = Shift.objects.create(
+            event=self.event, location=self.locations[0], position=self.floor,
+            date=date(2025, 5, 2), start_time=time(9), end_time=time(12),
+        )
+        self.client.force_login(User.objects.create_user("coordinator"))
+
+    def test_overview_has_a_lazy_column_per_location_and_day(self):
+        with self.assertNumQueries(4):
+            response = self.client.get(reverse("overview"))
+
+        self.assertContains(response, 'hx-trigger="intersect once"', count=9)
+        self.assertContains(
+            response,
+            f'hx-get="{reverse("grid_column")}?location={self.locations[0].id}&date=2025-05-02&view=day"',
+        )
+        self.assertNotContains(response, f'id="shift-{self.shift.id}"')
+
+    def test_edits_from_the_overview_render_location_columns(self):
+        response = self.client.post(
+            reverse("edit_shift_modal", args=[self.shift.id]),
+            {
+                "position": self.floor.id, "location": self.locations[0].id,
+                "start_time": "10:00", "end_time": "12:00", "max_volunteers": 1,
+            },
+            HTTP_REFERER=f"http://testserver{reverse('overview')}",
+        )
+
+        self.assertContains(response, f'id="column-{self.locations[0].id}-2025-05-02" hx-swap-oob="true"')
+        self.assertNotContains(response, "source=week")
+
+
+class LiveUpdatesTests(FestivalTestCase):
+    """Committed changes are streamed to open calendars, which refetch one column."""
+
+    def setUp(self):
+        super().setUp()
+        self.shift = self._shift(time(9), time(12))
+        self.volunteer = Volunteer.objects.create(
+            first_name="Ada", last_name="Lovelace", email="ada@example.com", phone_number="+301"
+        )
+        self.user = User.objects.create_user("coordinator")
+
+    def _published(self, change, with_time=False):
+        broker = mock.Mock()
+        with mock.patch("shifts.live.get_broker", return_value=broker):
+            with self.captureOnCommitCallbacks(execute=True):
+                change()
+        messages = [call.args[0] for call in broker.publish.call_args_list]
+        if with_time:
+            return messages
+        return [{key: value for key, value in message.items() if key != "at"} for message in messages]
+
+    def _column(self, location, day="2025-05-01"):
+        return {"event": self.event.id, "location": location.id, "date": day}
+
+    def test_moving_shift_publishes_both_columns(self):
+        self.shift.location = self.gym
+        published = self._published(self.shift.save)
+
+        self.assertCountEqual(published, [self._column(self.stage), self._column(self.gym)])
+
+    def test_assignments_publish_their_column(self):
+        published = self._published(lambda: bulk_assign([(self.shift.id, self.volunteer.id)]))
+        self.assertEqual(published, [self._column(self.stage)])
+
+        published = self._published(
+            lambda: ShiftVolunteer.objects.get(shift=self.shift).delete()
+        )
+        self.assertEqual(published, [self._column(self.stage)])
+
+    def test_rolled_back_changes_are_not_published(self):
+        def change():
+            with transaction.atomic():
+                self.shift.delete()
+                transaction.set_rollback(True)
+
+        self.assertEqual(self._published(change), [])
+
+    def test_broker_delivers_from_other_threads(self):
+        async def receive():
+            broker = LocalBroker()
+            with broker.subscribe() as subscription:
+                threading.Thread(target=broker.publish, args=[{"event": 1}]).start()
+                return await subscription.get(timeout=5)
+
+        self.assertEqual(asyncio.run(receive()), {"event": 1})
+
+    async def test_stream_sends_changes_of_its_columns(self):
+        await self.async_client.aforce_login(self.user)
+        response = await self.async_client.get(
+            reverse("live_updates"), {"event": self.event.id, "date": "2025-05-01"}
+        )
+        self.assertEqual(response["Content-Type"], "text/event-stream")
+        stream = aiter(response.streaming_content)
+        self.assertTrue((await anext(stream)).startswith(b"retry:"))
+
+        get_broker().publish(self._column(self.stage, day="2025-05-02"))
+        get_broker().publish(self._column(self.gym))
+        chunk = await asyncio.wait_for(anext(stream), 5)
+        self.assertEqual(chunk, f"event: column\ndata: {json.dumps(self._column(self.gym))}\n\n".encode())
+        await response.streaming_content.aclose()
+
+    def test_stream_is_refused_without_asgi(self):
+        self.client.force_login(self.user)
+        response = self.client.get(reverse("live_updates"), {"event": self.event.id})
+        self.assertEqual(response.status_code, 204)
+
+    def test_column_is_rendered_for_swapping_in_place(self):
+        self.client.force_login(self.user)
+        response = self.client.get(
+            reverse("grid_column"), {"location": self.stage.id, "date": "2025-05-01", "view": "day"}
+        )
+
+        self.assertContains(response, f'id="column-{self.stage.id}-2025-05-01"')
+        self.assertContains(response, f'id="shift-{self.shift.id}"')
+        self.assertNotContains(response, "hx-swap-oob")
+
+    def test_column_rendered_after_a_change_is_marked_current(self):
+        [change] = self._published(
+            lambda: ShiftVolunteer.objects.create(shift=self.shift, volunteer=self.volunteer), with_time=True
+        )
+        self.client.force_login(self.user)
+        response = self.client.get(
+            reverse("grid_column"), {"location": self.stage.id, "date": "2025-05-01", "view": "day"}
+        )
+
+        rendered_at = re.search(r'data-rendered-at="([\d.]+)"', response.content.decode()).group(1)
+        self.assertGreaterEqual(float(rendered_at), change["at"])
+
+
+class ApiTests(FestivalTestCase):
+    """The read-only JSON API pages through results, trims fields and answers polls with 304."""
+
+    def setUp(self):
+        cache.clear()
+        super().setUp()
+        self.shifts = [
+            self._shift(time(hour), time(hour + 2), location, day=day)
+            for day in (date(2025, 5, 1), date(2025, 5, 2))
+            for hour in (18, 9)
+            for location in (self.stage, self.gym)
+        ]
+        self.volunteer = Volunteer.objects.create(
+            first_name="Ada", last_name="Lovelace", email="ada@example.com", phone_number="+301"
+        )
+        ShiftVolunteer.objects.create(shift=self.shifts[0], volunteer=self.volunteer)
+        self.url = reverse("api_shift_list", args=[self.event.id])
+
+    def test_shifts_are_listed_in_start_order_with_volunteer_names(self):
+        response = self.client.get(self.url, {"date": "2025-05-01", "location": self.stage.id})
+
+        results = response.json()["results"]
+        self.assertEqual([shift["start_time"] for shift in results], ["09:00:00", "18:00:00"])
+        self.assertEqual(results[1]["volunteers"], ["Ada Lovelace"])
+        self.assertIsNone(response.json()["next"])
+
+    def test_sparse_fieldsets(self):
+        with self.assertNumQueries(2):
+            response = self.client.get(self.url, {"fields": "id,starts_at", "date": "2025-05-01"})
+        self.assertEqual(set(response.json()["results"][0]), {"id", "starts_at"})
+
+        response = self.client.get(self.url, {"fields": "id,email"})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("email", response.json()["error"])
+
+    def test_cursor_pagination_visits_every_shift_once(self):
+        seen = []
+        url, params = self.url, {"limit": 3, "fields": "id"}
+        while url:
+            page = self.client.get(url, params).json()
+            seen.extend(shift["id"] for shift in page["results"])
+            url, params = page["next"], None
+
+        expected = Shift.objects.filter(event=self.event).order_by("starts_at", "id")
+        self.assertEqual(seen, list(expected.values_list("id", flat=True)))
+        self.assertEqual(self.client.get(self.url, {"cursor": "nope"}).status_code, 400)
+
+    def test_unchanged_data_is_answered_with_not_modified(self):
+        etag = self.client.get(self.url, {"date": "2025-05-02"})["ETag"]
+
+        with self.assertNumQueries(0):
+            response = self.client.get(self.url, {"date": "2025-05-02"}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+        self.shifts[-1].max_volunteers = 5
+        with self.captureOnCommitCallbacks(execute=True):
+            self.shifts[-1].save()
+        response = self.client.get(self.url, {"date": "2025-05-02"}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+    def test_events_locations_and_positions(self):
+        events = self.client.get(reverse("api_event_list")).json()["results"]
+        self.assertEqual(events[0]["name"], "Festival")
+
+        locations = self.client.get(
+            reverse("api_location_list", args=[self.event.id]), {"fields": "name"}
+        ).json()["results"]
+        self.assertEqual(locations, [{"name": "Stage"}, {"name": "Gym"}])
+
+        positions = self.client.get(reverse("api_position_list", args=[self.event.id])).json()["results"]
+        self.assertEqual(positions[0]["color"], self.floor.color)
@@ -1,17 +1,25 @@
 from django.urls import path
-from . import views
+from . import api, views
 
 urlpatterns = [
     path("", views.week_view, name="week_view"),
     path("day/<int:year>/<int:month>/<int:day>/", views.location_day_view, name="location_day_view"),
     path("public/day/<int:year>/<int:month>/<int:day>/", views.public_day_view, name="public_day_view"),
+    path("overview/", views.overview, name="overview"),
+    path("column/", views.grid_column, name="grid_column"),
+    path("live/", views.live_updates, name="live_updates"),
     path("add-shift/", views.add_shift_modal, name="add_shift_modal"),
     path("shifts/<int:shift_id>/edit/", views.edit_shift_modal, name="edit_shift_modal"),
     path("shifts/<int:shift_id>/assign/", views.assign_volunteers_modal, name="assign_volunteers_modal"),
     path("assign-volunteer/<int:shift_id>/", views.assign_volunteer_modal, name="assign_volunteer_modal"),
     path("assign-volunteer/<int:shift_id>/save/", views.assign_volunteer, name="assign_volunteer"),
+    path("assign-volunteers/bulk/", views.bulk_assign_volunteers, name="bulk_assign_volunteers"),
     path("unassign-volunteer/<int:shift_id>/<int:volunteer_id>/", views.unassign_volunteer, name="unassign_volunteer"),
     path("close-modal/", views.close_modal, name="close_modal"),
     path("manage-volunteer-positions/<int:volunteer_id>/", views.manage_volunteer_positions, name="manage_volunteer_positions"),
     path("preview-email/<int:volunteer_id>/", views.preview_email, name="preview_email"),
+    path("api/v1/events/", api.event_list, name="api_event_list"),
+    path("api/v1/events/<int:event_id>/locations/", api.location_list, name="api_location_list"),
+    path("api/v1/events/<int:event_id>/positions/", api.position_list, name="api_position_list"),
+    path("api/v1/events/<int:event_id>/shifts/", api.shift_list, name="api_shift_list"),
 ]
@@ -1,25 +1,59 @@
+import asyncio
 import json
+import logging
 from collections import defaultdict
 from datetime import datetime, time, timedelta
 from itertools import groupby
 from operator import attrgetter
+from urllib.parse import parse_qs, urlparse
 
-from django.conf import settings
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth.models import User
-from django.core.mail import send_mail
+from django.core.cache import cache
 from django.core.exceptions import ValidationError
-from django.http import HttpRequest, HttpResponse, HttpResponseBadRequest, JsonResponse
+from django.core.handlers.asgi import ASGIRequest
+from django.db.models import Count, F, FloatField, Q, Sum
+from django.db.models.functions import Coalesce, Round
+from django.http import HttpRequest, HttpResponse, HttpResponseBadRequest, JsonResponse, StreamingHttpResponse
 from django.shortcuts import get_object_or_404, redirect, render
 from django.template.loader import render_to_string
 from django.urls import reverse
 from django.utils import timezone
-from django.utils.html import strip_tags
+from django.utils.http import urlencode
+from django.views.decorators.http import condition
 
 from events.models import Event
 from volunteers.models import Volunteer
 
+from .assignments import bulk_assign
+from .cache import (
+    SCHEDULE_SCOPE,
+    VOLUNTEERS_SCOPE,
+    bump_versions,
+    day_scope,
+    get_versions,
+    public_day_cache_key,
+    versions_etag,
+    versions_last_modified,
+)
+from .conflicts import find_conflicts
+from .layout import apply_stored_layout, grid_shifts, layout_columns
+from .live import get_broker
 from .models import Location, Position, PositionVolunteer, Shift, ShiftVolunteer
+from .notifications import build_notification_message, deliver_messages, prepare_notification_context
+
+logger = logging.getLogger(__name__)
+
+# Rendered public day pages are keyed by data version, so this only bounds memory use
+PUBLIC_DAY_CACHE_TIMEOUT = 60 * 60 * 24
+
+# URL parts of the pages that lay shifts out in location columns, like the day view
+DAY_LAYOUT_PAGES = ("day/", "overview/")
+
+# Seconds between keepalive comments on an idle live update stream
+LIVE_UPDATES_HEARTBEAT = 15
+# How long browsers wait before reconnecting a dropped stream, in milliseconds
+LIVE_UPDATES_RETRY_MS = 5000
 
 
 def _generate_hour_slots(hour_start=6, hour_end=5):
@@ -33,184 +67,43 @@ def _generate_hour_slots(hour_start=6, hour_end=5):
     return hour_slots
 
 
-def _get_hour_position_mapping(hour_slots):
-    """Create a mapping of hours to their position in the grid."""
-    return {slot.hour: idx for idx, slot in enumerate(hour_slots)}
-
-
-def _calculate_shift_grid_position(shift, hour_to_position):
-    """Calculate grid positioning for a single shift."""
-    start_hour = shift.start_time.hour
-    start_minute = shift.start_time.minute
-    end_hour = shift.end_time.hour
-    end_minute = shift.end_time.minute
-
-    # Handle shifts that cross midnight
-    if shift.end_time < shift.start_time:
-        end_hour += 24
-
-    # Adjust for grid starting at 6am
-    if start_hour < 6:
-        start_hour += 24
-    if end_hour < 6:
-        end_hour += 24
-
-    # Calculate grid positions with minute precision
-    base_row = hour_to_position[start_hour % 24]
-    # Add fractional position based on minutes (e.g., 30 minutes = 0.5 rows)
-    shift.grid_row_start = base_row + 1 + (start_minute / 60)
-    
-    # Calculate span including partial hours for both start and end
-    total_minutes = ((end_hour - start_hour) * 60) + (end_minute - start_minute)
-    shift.grid_row_span = total_minutes / 60
-
-    return start_hour % 24
-
-
-def _process_overlapping_shifts(shifts):
-    """Process a list of shifts to detect overlaps and set column positions.
-
-    This implementation organizes shifts by position when they overlap:
-    1. Shifts of the same position are grouped together in the same column
-    2. Different positions get different columns when they overlap
-    3. Positions are consistently assigned to the same column when possible
-    """
-    if not shifts:
-        return
-    
-    # First sort all shifts by start time
-    all_shifts = sorted(shifts, key=lambda s: (s.start_time.hour, s.start_time.minute))
-    
-    # Create a mapping of position IDs to column numbers
-    position_to_column = {}
-    max_columns = 0
-    
-    # Assign column 0 to the first shift
-    if all_shifts:
-        all_shifts[0].column = 0
-        position_to_column[all_shifts[0].position.id] = 0
-        max_columns = 1
-    
-    # For each shift, try to assign it to its position's column if possible
-    for i, shift in enumerate(all_shifts[1:], 1):
-        position_id = shift.position.id
-        
-        # Find all shifts that overlap with this one
-        overlapping_shifts = [
-            s for s in all_shifts[:i]  # Only consider shifts we've already processed
-            if (s.start_time < shift.end_time and s.end_time > shift.start_time)
-            or (s.start_time == shift.start_time)  # Explicitly check for same start time
-        ]
-        
-        # Get the columns used by overlapping shifts
-        used_columns = set(s.column for s in overlapping_shifts)
-        
-        # If this position already has a column assigned and it's not used by any overlapping shift,
-        # use that column
-        if position_id in position_to_column and position_to_column[position_id] not in used_columns:
-            shift.column = position_to_column[position_id]
-        else:
-            # Otherwise, find the first available column
-            column = 0
-            while column in used_columns:
-                column += 1
-                
-            # Assign the column to this shift
-            shift.column = column
-            
-            # Update the position-to-column mapping
-            position_to_column[position_id] = column
-        
-        # Update the maximum number of columns needed
-        max_columns = max(max_columns, shift.column + 1)
-    
-    # Set the total columns for all shifts
-    for shift in all_shifts:
-        shift.total_columns = max_columns
-
-
-def _process_shifts_for_week_view(shifts, hour_to_position):
+def _process_shifts_for_week_view(shifts):
     """Process shifts and calculate their grid positions.
 
     Args:
-        shifts: QuerySet of shifts to process
-        hour_to_position: Mapping of hours to grid positions
+        shifts: shifts of one location, as fetched by grid_shifts
 
     Returns:
         shifts_by_date: Dictionary of shifts organized by date and hour
     """
-    # First, organize shifts by date
-    shifts_by_date_dict = defaultdict(list)
-    for shift in shifts:
-        # Convert date to datetime.date for consistent key lookup
-        shift_date = shift.date.date() if hasattr(shift.date, "date") else shift.date
-
-        # Always add the shift to its start date, even if it crosses midnight
-        shifts_by_date_dict[shift_date].append(shift)
-
-    # Process each date's shifts separately
     result = {}
-    for date, date_shifts in shifts_by_date_dict.items():
-        # Calculate grid positions for all shifts on this date
-        for shift in date_shifts:
-            _calculate_shift_grid_position(shift, hour_to_position)
-
-        # Process overlapping shifts for this date
-        _process_overlapping_shifts(date_shifts)
-
-        # Organize shifts by hour for template rendering
+    for (location, date), date_shifts in layout_columns(shifts).items():
+        # Organize shifts by the hour they start in for template rendering
         shifts_by_hour = defaultdict(list)
         for shift in date_shifts:
-            # Convert start_hour to time object for template rendering
-            hour_time = time(shift.start_time.hour, 0)
-            shifts_by_hour[hour_time].append(shift)
-
-        # Convert hour keys to string format for template
-        hour_shifts_str = {}
-        for hour_key, hour_shifts in shifts_by_hour.items():
-            hour_str = hour_key.strftime("%H:%M")
-            hour_shifts_str[hour_str] = hour_shifts
+            shifts_by_hour[time(shift.start_time.hour, 0).strftime("%H:%M")].append(shift)
 
         # Add to result with date as string key
-        result[date.isoformat()] = hour_shifts_str
+        result[date.isoformat()] = dict(shifts_by_hour)
 
     return result
 
 
-def _process_shifts_for_day_view(shifts, hour_to_position):
+def _process_shifts_for_day_view(shifts):
     """Process shifts for day view, organizing them by location.
 
     Args:
-        shifts: QuerySet of shifts to process
-        hour_to_position: Mapping of hours to grid positions
+        shifts: shifts of one date, as fetched by grid_shifts
 
     Returns:
         shifts_by_location: Dictionary of shifts organized by location and hour
     """
-    # Create a dictionary with location objects as keys and shifts organized by hour as values
     shifts_by_location = {}
-
-    # First, organize shifts by location
-    location_shifts_dict = defaultdict(list)
-    for shift in shifts:
-        # For shifts that cross midnight, we still want them to appear in their start day
-        location_shifts_dict[shift.location].append(shift)
-
-    # Then process each location's shifts
-    for location, location_shifts in location_shifts_dict.items():
-        # Calculate grid positions for all shifts at this location
-        for shift in location_shifts:
-            _calculate_shift_grid_position(shift, hour_to_position)
-
-        # Process overlapping shifts for this location
-        _process_overlapping_shifts(location_shifts)
-
+    for (location, date), location_shifts in layout_columns(shifts).items():
         # Organize shifts by hour for template rendering
         shifts_by_hour = defaultdict(list)
         for shift in location_shifts:
-            # Convert hour to string format for template
-            hour_str = shift.start_time.strftime("%H:%M")
-            shifts_by_hour[hour_str].append(shift)
+            shifts_by_hour[shift.start_time.strftime("%H:%M")].append(shift)
 
         # Store the processed shifts with the location as key
         shifts_by_location[location] = dict(shifts_by_hour)
@@ -218,78 +111,146 @@ def _process_shifts_for_day_view(shifts, hour_to_position):
     return shifts_by_location
 
 
-def _enhance_volunteers_with_stats(volunteers, event):
+def _render_grid_columns(request, event, columns, is_day_view, oob=False):
     """
-    Enhance volunteer objects with shift count and total hours for a specific event.
+    Render only the given (location, date) calendar columns.
+
+    Only the shifts of those columns are fetched and laid out, so the cost of
+    an update does not depend on how busy the rest of the day or week is.
     """
-    for volunteer in volunteers:
-        # Get all shifts for this volunteer in this event
-        volunteer_shifts = ShiftVolunteer.objects.filter(
-            volunteer=volunteer, shift__event=event
-        ).select_related("shift")
+    hour_slots = _generate_hour_slots()
+    # Taken before the shifts are read, so changes committed after it are refetched
+    rendered_at = f"{timezone.now().timestamp():f}"
+
+    column_filter = Q()
+    for location, date in columns:
+        column_filter |= Q(location=location, date=date)
+    shifts_by_column = defaultdict(list)
+    for shift in grid_shifts(event).filter(column_filter):
+        shifts_by_column[(shift.location_id, shift.date)].append(shift)
+
+    fragments = []
+    for location, date in columns:
+        shifts = shifts_by_column[(location.id, date)]
+        context = {"hour_slots": hour_slots, "current_event": event, "oob": oob, "rendered_at": rendered_at}
+        if is_day_view:
+            template = "shifts/partials/location_column.html"
+            context.update({
+                "location": location,
+                "current_date": date,
+                "location_shifts": _process_shifts_for_day_view(shifts).get(location, {}),
+            })
+        else:
+            template = "shifts/partials/day_column.html"
+            context.update({
+                "date": date,
+                "selected_location": location,
+                "day_shifts": _process_shifts_for_week_view(shifts).get(date.isoformat(), {}),
+            })
+        fragments.append(render_to_string(template, context, request))
+    return "".join(fragments)
+
+
+def _grid_columns_response(request, event, columns, is_day_view):
+    """
+    Re-render the given calendar columns as out-of-band swaps, and close the modal.
+
+    A week view page shows a single location, so columns of other locations,
+    like the one a shift was moved to, are left out.
+    """
+    if not is_day_view:
+        shown = _week_view_location(request, event)
+        columns = [(location, date) for location, date in columns if location == shown]
+    response = HttpResponse(_render_grid_columns(request, event, columns, is_day_view, oob=True))
+    response["HX-Trigger"] = json.dumps({"closeModal": True})
+    response["HX-Reswap"] = "none"
+    return response
+
+
+def _selected_location(locations, location_id):
+    """The location a week view page shows: the one asked for, or the first."""
+    if location_id:
+        try:
+            return locations.get(id=location_id)
+        except (Location.DoesNotExist, ValueError):
+            pass
+    return locations.first()
+
+
+def _week_view_location(request, event):
+    """The location shown by the week view page a modal was opened from."""
+    query = parse_qs(urlparse(request.META.get("HTTP_REFERER", "")).query)
+    return _selected_location(Location.objects.filter(event=event), query.get("location", [None])[0])
+
+
+def _is_day_view(request):
+    """Whether a modal was opened from a page of location columns, rather than the week view."""
+    referer = request.META.get("HTTP_REFERER", "")
+    return any(
+        page in referer or page in request.path for page in DAY_LAYOUT_PAGES
+    )
+
 
-        # Calculate total shifts and hours
-        volunteer.shift_count = volunteer_shifts.count()
+def _live_updates_url(**filters):
+    return f"{reverse('live_updates')}?{urlencode(filters)}"
 
-        total_hours = 0
-        for vs in volunteer_shifts:
-            # Calculate hours for each shift
-            start_time = vs.shift.start_time
-            end_time = vs.shift.end_time
 
-            # Handle shifts that cross midnight
-            if end_time < start_time:
-                end_time_hours = end_time.hour + 24
-            else:
-                end_time_hours = end_time.hour
+def _shift_hours(prefix=""):
+    """Database expression for the length of a shift in hours."""
+    return F(f"{prefix}duration_minutes") / 60.0
 
-            hours = end_time_hours - start_time.hour
-            minutes = end_time.minute - start_time.minute
 
-            total_hours += hours + (minutes / 60)
+def _enhance_volunteers_with_stats(volunteers, event):
+    """
+    Annotate volunteers with shift count and total hours for a specific event.
 
-        volunteer.total_hours = round(total_hours, 1)
+    The stats are aggregated in the same query that fetches the volunteers,
+    so the cost does not grow with the number of candidates.
+    """
+    event_shifts = Q(shifts__event=event)
+    return volunteers.annotate(
+        shift_count=Count("shifts", filter=event_shifts),
+        total_hours=Round(
+            Coalesce(
+                Sum(_shift_hours("shifts__"), filter=event_shifts, output_field=FloatField()),
+                0.0,
+            ),
+            1,
+        ),
+    )
 
+
+def _flag_conflicts(volunteers, shift):
+    """
+    Set ``conflict`` on each volunteer to the assignment of theirs that overlaps
+    the shift, or None. All candidates are checked with one indexed query.
+    """
+    volunteers = list(volunteers)
+    conflicts = find_conflicts(
+        [volunteer.id for volunteer in volunteers], shift.starts_at, shift.ends_at, exclude_shift=shift.id
+    )
+    for volunteer in volunteers:
+        volunteer.conflict = conflicts.get(volunteer.id)
     return volunteers
 
 
 def _prepare_shift_email_context(request, volunteer, event, preview=False):
     """
     Prepare the context for shift notification emails.
-    
+
     Args:
-        request: The HTTP request object
+        request: The HTTP request object, used for the confirmation link
         volunteer: The volunteer to prepare the email for
         event: The event containing the shifts
         preview: Whether this is for preview (uses dummy token) or actual email
-        
+
     Returns:
-        tuple: (shifts, context) where shifts is the queryset of shifts and
+        tuple: (shifts, context) where shifts is the list of shifts and
                context is the dictionary of template context variables
     """
-    # Get all shifts for this volunteer in the event
-    shifts = volunteer.shifts.filter(event=event).order_by("date", "start_time")
-    
-    if not shifts.exists():
-        return None, None
-    
-    # Generate confirmation token
-    if preview:
-        confirmation_token = "preview-token"
-    else:
-        confirmation_token = volunteer.generate_confirmation_token()
-    
-    # Prepare email context
-    context = {
-        "volunteer": volunteer,
-        "shifts": shifts,
-        "event": event,
-        "confirmation_url": request.build_absolute_uri(
-            reverse("confirm_shifts", kwargs={"token": confirmation_token})
-        ),
-    }
-    
-    return shifts, context
+    return prepare_notification_context(
+        volunteer, event, request.build_absolute_uri("/"), preview=preview
+    )
 
 
 @login_required
@@ -313,30 +274,14 @@ def week_view(request):
 
     # Get selected location from query params or default to first
     locations = Location.objects.filter(event=current_event)
-    location_id = request.GET.get("location")
-    if location_id:
-        try:
-            selected_location = locations.get(id=location_id)
-        except Location.DoesNotExist:
-            selected_location = locations.first()
-    else:
-        selected_location = locations.first()
+    selected_location = _selected_location(locations, request.GET.get("location"))
 
     hour_slots = _generate_hour_slots()
-    hour_to_position = _get_hour_position_mapping(hour_slots)
-
-    # Get all shifts for the selected location with improved prefetching
-    shifts = (
-        Shift.objects.filter(event=current_event, location=selected_location)
-        .select_related("position", "location")
-        .prefetch_related(
-            "volunteers",
-            "shiftvolunteer_set",
-            "shiftvolunteer_set__volunteer",
-        )
-    )
 
-    shifts_by_date = _process_shifts_for_week_view(shifts, hour_to_position)
+    # The whole event at this location in one query, however many days it runs
+    shifts = grid_shifts(current_event, locations=[selected_location])
+
+    shifts_by_date = _process_shifts_for_week_view(shifts)
 
     return render(
         request,
@@ -349,6 +294,8 @@ def week_view(request):
             "locations": locations,
             "selected_location": selected_location,
             "current_date": current_date,
+            "live_updates_url": _live_updates_url(event=current_event.id, location=selected_location.id)
+            if selected_location else None,
         },
     )
 
@@ -370,24 +317,15 @@ def location_day_view(request, year, month, day):
     show_prev = prev_day >= current_event.start_date
 
     hour_slots = _generate_hour_slots()
-    hour_to_position = _get_hour_position_mapping(hour_slots)
 
     # Get all locations for this event
     locations = Location.objects.filter(event=current_event)
 
-    # Get all shifts for the current date with improved prefetching
-    shifts = (
-        Shift.objects.filter(date=current_date, event=current_event)
-        .select_related("position", "location")
-        .prefetch_related(
-            "volunteers",
-            "shiftvolunteer_set",
-            "shiftvolunteer_set__volunteer",
-        )
-    )
+    # Every location's shifts for the day in one query
+    shifts = grid_shifts(current_event, current_date, current_date)
 
     # Process shifts by location
-    shifts_by_location = _process_shifts_for_day_view(shifts, hour_to_position)
+    shifts_by_location = _process_shifts_for_day_view(shifts)
 
     return render(
         request,
@@ -402,15 +340,125 @@ def location_day_view(request, year, month, day):
             "show_prev": show_prev,
             "next_day": next_day,
             "prev_day": prev_day,
+            "live_updates_url": _live_updates_url(event=current_event.id, date=current_date.isoformat()),
+        },
+    )
+
+
+@login_required
+def grid_column(request):
+    """One calendar column, fetched by pages that heard it changed from live_updates."""
+    location = get_object_or_404(Location.objects.select_related("event"), id=request.GET.get("location"))
+    try:
+        date = datetime.strptime(request.GET.get("date", ""), "%Y-%m-%d").date()
+    except ValueError:
+        return HttpResponseBadRequest("Invalid date")
+    is_day_view = request.GET.get("view") == "day"
+    return HttpResponse(_render_grid_columns(request, location.event, [(location, date)], is_day_view))
+
+
+@login_required
+async def live_updates(request):
+    """
+    Stream the calendar columns that change as server-sent events.
+
+    Day pages pass ?event=&date= and week pages ?event=&location=, and only
+    hear about their own columns. Streaming needs the ASGI application; under
+    WSGI it would tie up a worker thread per open page, so the stream is
+    refused with a 204, which tells browsers not to reconnect.
+    """
+    if not isinstance(request, ASGIRequest):
+        return HttpResponse(status=204)
+    try:
+        event_id = int(request.GET["event"])
+        location_id = int(request.GET["location"]) if "location" in request.GET else None
+        date = datetime.strptime(request.GET["date"], "%Y-%m-%d").date().isoformat() if "date" in request.GET else None
+    except (KeyError, ValueError):
+        return HttpResponseBadRequest("Invalid live update filter")
+
+    def wanted(change):
+        return (
+            change["event"] == event_id
+            and (location_id is None or change["location"] == location_id)
+            and (date is None or change["date"] == date)
+        )
+
+    async def stream():
+        with get_broker().subscribe() as subscription:
+            yield f"retry: {LIVE_UPDATES_RETRY_MS}\n\n"
+            while True:
+                try:
+                    change = await subscription.get(timeout=LIVE_UPDATES_HEARTBEAT)
+                except asyncio.TimeoutError:
+                    # Keeps proxies from closing an idle connection
+                    yield ": keepalive\n\n"
+                    continue
+                if wanted(change):
+                    yield f"event: column\ndata: {json.dumps(change)}\n\n"
+
+    response = StreamingHttpResponse(stream(), content_type="text/event-stream")
+    response["Cache-Control"] = "no-cache"
+    # Tells nginx to pass events through as they come instead of buffering them
+    response["X-Accel-Buffering"] = "no"
+    return response
+
+
+@login_required
+def overview(request):
+    """
+    Every location on every day of the event, side by side.
+
+    Only the frame of the grid is rendered here. Each (location, date) column
+    is fetched from grid_column as it scrolls into view, so the page opens as
+    fast for a ten-location festival as for a single room.
+    """
+    current_event = Event.objects.latest("start_date")
+
+    return render(
+        request,
+        "shifts/calendar_overview.html",
+        {
+            "current_event": current_event,
+            "event_dates": current_event.get_dates(),
+            "locations": list(Location.objects.filter(event=current_event)),
+            "hour_slots": _generate_hour_slots(),
+            "live_updates_url": _live_updates_url(event=current_event.id),
         },
     )
 
 
+def _public_day_versions(request, year, month, day):
+    """Data versions the public day page depends on, read once per request."""
+    if not hasattr(request, "_public_day_versions"):
+        current_date = datetime(year, month, day).date()
+        request._public_day_versions = get_versions(SCHEDULE_SCOPE, day_scope(current_date))
+    return request._public_day_versions
+
+
+def _public_day_etag(request, year, month, day):
+    return versions_etag(_public_day_versions(request, year, month, day))
+
+
+def _public_day_last_modified(request, year, month, day):
+    return versions_last_modified(_public_day_versions(request, year, month, day))
+
+
+@condition(etag_func=_public_day_etag, last_modified_func=_public_day_last_modified)
 def public_day_view(request, year, month, day):
     """
     Public view of the day calendar without authentication requirements.
     Shows a simplified version of the day view without administrative controls.
+
+    Unchanged days are answered with 304 from the data versions alone, and the
+    rendered page is cached per data version so repeat visitors skip the queries.
     """
+    cache_key = public_day_cache_key(
+        datetime(year, month, day).date(), _public_day_versions(request, year, month, day)
+    )
+    html = cache.get(cache_key)
+    if html is not None:
+        return HttpResponse(html)
+
     # Get the current event
     current_event = Event.objects.latest("start_date")
 
@@ -426,29 +474,20 @@ def public_day_view(request, year, month, day):
     show_prev = prev_day >= current_event.start_date
 
     hour_slots = _generate_hour_slots()
-    hour_to_position = _get_hour_position_mapping(hour_slots)
 
     # Get all locations for this event
     locations = Location.objects.filter(event=current_event)
 
-    # Get all shifts for the current date with improved prefetching
-    shifts = (
-        Shift.objects.filter(date=current_date, event=current_event)
-        .select_related("position", "location")
-        .prefetch_related(
-            "volunteers",
-            "shiftvolunteer_set",
-            "shiftvolunteer_set__volunteer",
-        )
-    )
+    # Every location's shifts for the day in one query
+    shifts = grid_shifts(current_event, current_date, current_date)
 
     # Process shifts by location
-    shifts_by_location = _process_shifts_for_day_view(shifts, hour_to_position)
+    shifts_by_location = _process_shifts_for_day_view(shifts)
     
     # Check if there are any shifts for this day
-    has_shifts = shifts.exists()
+    has_shifts = bool(shifts_by_location)
 
-    return render(
+    response = render(
         request,
         "shifts/public_day_view.html",
         {
@@ -464,6 +503,8 @@ def public_day_view(request, year, month, day):
             "has_shifts": has_shifts,
         },
     )
+    cache.set(cache_key, response.content, PUBLIC_DAY_CACHE_TIMEOUT)
+    return response
 
 
 @login_required
@@ -499,18 +540,10 @@ def assign_volunteer(request, shift_id):
 
     volunteer = get_object_or_404(Volunteer, id=volunteer_id)
 
-    # Check if shift is full
-    if shift.volunteers.count() >= shift.max_volunteers:
-        return HttpResponseBadRequest("Shift is full")
-
-    # Check if volunteer is already assigned
-    if shift.volunteers.filter(id=volunteer.id).exists():
-        return HttpResponseBadRequest("Volunteer already assigned to this shift")
-
-    # Assign the volunteer
-    ShiftVolunteer.objects.create(
-        shift=shift, volunteer=volunteer, assigned_by=request.user
-    )
+    # Assign the volunteer, checking capacity and duplicates
+    _, errors = bulk_assign([(shift.id, volunteer.id)], assigned_by=request.user)
+    if errors:
+        return HttpResponseBadRequest(errors[0]["error"])
 
     # Return the updated shift card HTML and close the modal
     response = render(
@@ -524,6 +557,39 @@ def assign_volunteer(request, shift_id):
     return response
 
 
+@login_required
+def bulk_assign_volunteers(request):
+    """
+    Assign many volunteers to many shifts in one call, e.g. a pasted roster.
+
+    Expects a JSON body of {"assignments": [{"shift": id, "volunteer": id}, ...]}
+    and returns the created assignments along with the pairs that were rejected.
+    """
+    if request.method != "POST":
+        return HttpResponseBadRequest()
+
+    try:
+        body = json.loads(request.body.decode("utf-8"))
+        pairs = [
+            (int(item["shift"]), int(item["volunteer"])) for item in body["assignments"]
+        ]
+    except (ValueError, TypeError, KeyError):
+        return HttpResponseBadRequest(
+            'Expected {"assignments": [{"shift": id, "volunteer": id}, ...]}'
+        )
+
+    assigned, errors = bulk_assign(pairs, assigned_by=request.user)
+    return JsonResponse(
+        {
+            "assigned": [
+                {"shift": shift_id, "volunteer": volunteer_id}
+                for shift_id, volunteer_id in assigned
+            ],
+            "errors": errors,
+        }
+    )
+
+
 @login_required
 def unassign_volunteer(request, shift_id, volunteer_id):
     if request.method != "DELETE":
@@ -608,62 +674,7 @@ def add_shift_modal(request):
             shift.full_clean()
             shift.save()
 
-            # Check if we're in day view or week view based on the referer and current URL
-            referer = request.META.get("HTTP_REFERER", "")
-            current_path = request.path
-            is_day_view = "day/" in referer or "day/" in current_path
-
-            hour_slots = _generate_hour_slots()
-            hour_to_position = _get_hour_position_mapping(hour_slots)
-
-            if is_day_view:
-                # Get all shifts for the location view
-                shifts = (
-                    Shift.objects.filter(event=event, date=date)
-                    .select_related("position", "location")
-                    .prefetch_related("volunteers")
-                )
-                shifts_by_location = _process_shifts_for_day_view(shifts, hour_to_position)
-
-                response = render(
-                    request,
-                    "shifts/partials/location_columns.html",
-                    {
-                        "shifts_by_location": shifts_by_location,
-                        "locations": Location.objects.filter(event=event),
-                        "hour_slots": hour_slots,
-                        "current_event": event,
-                        "current_date": date,
-                    },
-                )
-                response['HX-Trigger'] = json.dumps({"closeModal": True})
-                response['HX-Reswap'] = 'innerHTML'
-                response['HX-Retarget'] = '#grid-container'
-                return response
-            else:
-                # Get all shifts for the week view
-                shifts = (
-                    Shift.objects.filter(event=event, location=location)
-                    .select_related("position")
-                    .prefetch_related("volunteers")
-                )
-                shifts_by_date = _process_shifts_for_week_view(shifts, hour_to_position)
-
-                response = render(
-                    request,
-                    "shifts/partials/day_columns.html",
-                    {
-                        "current_event": event,
-                        "event_dates": event.get_dates(),
-                        "shifts_by_date": shifts_by_date,
-                        "hour_slots": hour_slots,
-                        "selected_location": location,
-                    },
-                )
-                response['HX-Trigger'] = json.dumps({"closeModal": True})
-                response['HX-Reswap'] = 'innerHTML'
-                response['HX-Retarget'] = '#grid-container'
-                return response
+            return _grid_columns_response(request, event, [(location, date)], _is_day_view(request))
         except ValidationError as e:
             # Format the error message
             error_message = str(e)
@@ -723,7 +734,6 @@ def add_shift_modal(request):
 def assign_volunteers_modal(request, shift_id):
     shift = get_object_or_404(Shift, id=shift_id)
     volunteers = ShiftVolunteer.objects.filter(shift=shift).select_related("volunteer")
-    # TODO: modal doens refresh the week grid when closing
 
     # Get source from request parameters (GET, POST, or HTMX vals)
     source = request.GET.get("source", None)
@@ -756,8 +766,8 @@ def assign_volunteers_modal(request, shift_id):
         .order_by("first_name", "last_name")
     )
 
-    available_volunteers = _enhance_volunteers_with_stats(
-        available_volunteers, shift.event
+    available_volunteers = _flag_conflicts(
+        _enhance_volunteers_with_stats(available_volunteers, shift.event), shift
     )
 
     if request.method == "POST":
@@ -792,92 +802,30 @@ def assign_volunteers_modal(request, shift_id):
                 shift=shift, volunteer_id=volunteer_ids[0]
             ).delete()
         elif action == "close":
-            # Return the updated grid based on the source
-            hour_slots = _generate_hour_slots()
-            hour_to_position = _get_hour_position_mapping(hour_slots)
-
-            if source == "week":
-                # For week view
-                start_date = shift.date - timedelta(days=shift.date.weekday())
-                end_date = start_date + timedelta(days=6)
-
-                # Get all dates in the week using event.get_dates()
-                event_dates = shift.event.get_dates()
-                # Filter to only include dates in the current week
-                event_dates = [
-                    date for date in event_dates if start_date <= date <= end_date
-                ]
-
-                # Get shifts for the week
-                week_shifts = (
-                    Shift.objects.filter(
-                        event=shift.event, date__gte=start_date, date__lte=end_date
-                    )
-                    .select_related("position", "location")
-                    .prefetch_related("volunteers")
-                )
-
-                # Process shifts by date
-                shifts_by_date = {}
-                for date in event_dates:
-                    day_shifts = week_shifts.filter(date=date)
-                    date_str = date.strftime("%Y-%m-%d")
-                    shifts_by_date[date_str] = _process_shifts_for_day_view(
-                        day_shifts, hour_to_position
-                    )
-
-                # Return the updated grid
-                return render(
-                    request,
-                    "shifts/partials/day_columns.html",
-                    {
-                        "event_dates": event_dates,
-                        "shifts_by_date": shifts_by_date,
-                        "locations": Location.objects.filter(event=shift.event),
-                        "hour_slots": hour_slots,
-                        "current_event": shift.event,
-                        "selected_location": None,  # We're showing all locations
-                    },
-                )
-            else:
-                # For day view
-                # Get all shifts for the location view
-                shifts = (
-                    Shift.objects.filter(event=shift.event, date=shift.date)
-                    .select_related("position", "location")
-                    .prefetch_related("volunteers")
-                )
-                shifts_by_location = _process_shifts_for_day_view(
-                    shifts, hour_to_position
-                )
-
-                # Return the updated grid
-                return render(
-                    request,
-                    "shifts/partials/location_columns.html",
-                    {
-                        "shifts_by_location": shifts_by_location,
-                        "locations": Location.objects.filter(event=shift.event),
-                        "hour_slots": hour_slots,
-                        "current_event": shift.event,
-                        "current_date": shift.date,
-                    },
+            # Only this shift's volunteers changed, so only its card is re-rendered
+            card_shift = (
+                Shift.objects.select_related("position", "location", "layout")
+                .prefetch_related("volunteers")
+                .get(pk=shift.pk)
+            )
+            if not apply_stored_layout([card_shift]):
+                return _grid_columns_response(
+                    request, shift.event, [(shift.location, shift.date)], source != "week"
                 )
+            template = (
+                "shifts/partials/day_shift.html"
+                if source == "week"
+                else "shifts/partials/location_shift.html"
+            )
+            response = render(request, template, {"shift": card_shift, "oob": True})
+            response["HX-Reswap"] = "none"
+            return response
         else:
-            # Add the volunteer to the shift if not already at max
-            if volunteers.count() < shift.max_volunteers and volunteer_ids:
-                volunteer_id = volunteer_ids[
-                    0
-                ]  # We're now handling one volunteer at a time
-                if volunteer_id:
-                    volunteer = get_object_or_404(Volunteer, id=volunteer_id)
-                    # Check if this volunteer is already assigned to avoid duplicates
-                    if not ShiftVolunteer.objects.filter(
-                        shift=shift, volunteer=volunteer
-                    ).exists():
-                        ShiftVolunteer.objects.create(
-                            shift=shift, volunteer=volunteer, assigned_by=request.user
-                        )
+            # Add the selected volunteers while the shift has room, skipping duplicates
+            bulk_assign(
+                [(shift.id, int(volunteer_id)) for volunteer_id in volunteer_ids if volunteer_id],
+                assigned_by=request.user,
+            )
 
         # Refresh the volunteer lists
         volunteers = ShiftVolunteer.objects.filter(shift=shift).select_related(
@@ -893,8 +841,8 @@ def assign_volunteers_modal(request, shift_id):
             .order_by("first_name", "last_name")
         )
 
-        available_volunteers = _enhance_volunteers_with_stats(
-            available_volunteers, shift.event
+        available_volunteers = _flag_conflicts(
+            _enhance_volunteers_with_stats(available_volunteers, shift.event), shift
         )
 
         # Return the updated modal with refreshed volunteer lists
@@ -929,52 +877,11 @@ def edit_shift_modal(request, shift_id):
     location = shift.location
     date = shift.date
 
-    # Check if we're in day view or week view based on the referer and current URL
-    referer = request.META.get("HTTP_REFERER", "")
-    current_path = request.path
-    is_day_view = "day/" in referer or "day/" in current_path
+    is_day_view = _is_day_view(request)
 
     if request.method == "DELETE":
         shift.delete()
-
-        if is_day_view:
-            # Get all shifts for the location view
-            shifts = Shift.objects.filter(event=event, date=date)
-            shifts_by_location = _process_shifts_for_day_view(
-                shifts, _get_hour_position_mapping(_generate_hour_slots())
-            )
-
-            hour_slots = _generate_hour_slots()
-            return render(
-                request,
-                "shifts/partials/location_columns.html",
-                {
-                    "shifts_by_location": shifts_by_location,
-                    "locations": Location.objects.filter(event=event),
-                    "hour_slots": hour_slots,
-                    "current_event": event,
-                    "current_date": date,
-                },
-            )
-        else:
-            shifts = Shift.objects.filter(event=event, location=location)
-            shifts_by_date = _process_shifts_for_week_view(
-                shifts,
-                _get_hour_position_mapping(_generate_hour_slots()),
-            )
-
-            hour_slots = _generate_hour_slots()
-            return render(
-                request,
-                "shifts/partials/day_columns.html",
-                {
-                    "current_event": event,
-                    "event_dates": event.get_dates(),
-                    "shifts_by_date": shifts_by_date,
-                    "hour_slots": hour_slots,
-                    "selected_location": location,
-                },
-            )
+        return _grid_columns_response(request, event, [(location, date)], is_day_view)
 
     if request.method == "POST":
         # Handle both regular POST and PUT (via method override)
@@ -982,69 +889,25 @@ def edit_shift_modal(request, shift_id):
         if is_put or not request.headers.get("X-HTTP-Method-Override"):
             # Update the shift
             position = get_object_or_404(Position, id=request.POST.get("position"))
-            location = get_object_or_404(Location, id=request.POST.get("location"))
+            new_location = get_object_or_404(Location, id=request.POST.get("location"))
             start_time = datetime.strptime(request.POST.get("start_time"), "%H:%M").time()
             end_time = datetime.strptime(request.POST.get("end_time"), "%H:%M").time()
             max_volunteers = int(request.POST.get("max_volunteers", 1))
 
             shift.position = position
-            shift.location = location
+            shift.location = new_location
             shift.start_time = start_time
             shift.end_time = end_time
             shift.max_volunteers = max_volunteers
             
             try:
                 shift.save()
-                
-                # For successful saves, return a response that will update the grid
-                # and close the modal via JavaScript
-                if is_day_view:
-                    # Get all shifts for the location view
-                    shifts = Shift.objects.filter(event=event, date=date)
-                    shifts_by_location = _process_shifts_for_day_view(
-                        shifts, _get_hour_position_mapping(_generate_hour_slots())
-                    )
-
-                    hour_slots = _generate_hour_slots()
-                    response = render(
-                        request,
-                        "shifts/partials/location_columns.html",
-                        {
-                            "shifts_by_location": shifts_by_location,
-                            "locations": Location.objects.filter(event=event),
-                            "hour_slots": hour_slots,
-                            "current_event": event,
-                            "current_date": date,
-                        },
-                    )
-                    response['HX-Trigger'] = json.dumps({"closeModal": True})
-                    response['HX-Reswap'] = 'innerHTML'
-                    response['HX-Retarget'] = '#grid-container'
-                    return response
-                else:
-                    # Return updated grid
-                    shifts = Shift.objects.filter(event=event, location=location)
-                    shifts_by_date = _process_shifts_for_week_view(
-                        shifts,
-                        _get_hour_position_mapping(_generate_hour_slots()),
-                    )
-
-                    hour_slots = _generate_hour_slots()
-                    response = render(
-                        request,
-                        "shifts/partials/day_columns.html",
-                        {
-                            "shifts_by_date": shifts_by_date,
-                            "event_dates": event.get_dates(),
-                            "hour_slots": hour_slots,
-                            "current_event": event,
-                            "selected_location": location,
-                        },
-                    )
-                    response['HX-Trigger'] = json.dumps({"closeModal": True})
-                    response['HX-Reswap'] = 'innerHTML'
-                    response['HX-Retarget'] = '#grid-container'
-                    return response
+
+                # Update the column the shift left as well as the one it moved to
+                columns = [(location, date)]
+                if new_location != location:
+                    columns.append((new_location, date))
+                return _grid_columns_response(request, event, columns, is_day_view)
             except ValidationError as e:
                 # Return the modal with the error message
                 error_message = str(e)
@@ -1082,10 +945,11 @@ def send_shift_notifications(request, event, volunteers=None):
     """
     Send personalized email notifications to volunteers about their shifts.
     If volunteers is None, send to all volunteers with shifts in the event.
+
+    Emails are rendered here and then delivered concurrently over pooled SMTP
+    connections, see shifts.notifications.deliver_messages.
     """
-    print(
-        f"Starting send_shift_notifications for event {event} and volunteers {volunteers}"
-    )
+    logger.info("Sending shift notifications for event %s", event)
     if volunteers is None:
         # Get all volunteers who have shifts in this event and haven't been notified
         volunteers = Volunteer.objects.filter(
@@ -1093,50 +957,40 @@ def send_shift_notifications(request, event, volunteers=None):
         ).distinct()
 
     errors = []
+    recipients = []
+    email_messages = []
     for volunteer in volunteers:
-        print(f"Processing volunteer {volunteer}")
-        
         # Prepare email context using the helper function
         shifts, context = _prepare_shift_email_context(request, volunteer, event)
-        
+
         if not shifts:
-            print(f"No shifts found for volunteer {volunteer}")
+            logger.debug("No shifts found for volunteer %s", volunteer)
             continue
-            
-        print(f"Context prepared: {context}")
 
         try:
-            print("Rendering email template")
-            # Render HTML email template
-            html_message = render_to_string(
-                "shifts/email/shift_notification.html", context
-            )
-            plain_message = strip_tags(html_message)
-            print("Template rendered")
-
-            print("Sending email")
-            # Send email
-            send_mail(
-                subject=f"Your Shifts at {event.name}",
-                message=plain_message,
-                from_email=f"Athens Rhythm Hop <{settings.EMAIL_HOST_USER}>",
-                recipient_list=[volunteer.email],
-                html_message=html_message,
-                fail_silently=False,
-            )
-            print("Email sent")
-
-            # Mark notification as sent
-            volunteer.notification_email_sent = True
-            volunteer.save(update_fields=["notification_email_sent"])
-            print("Notification status updated")
+            email_messages.append(build_notification_message(event, context))
+            recipients.append(volunteer)
         except Exception as e:
-            import traceback
-
-            print(f"Error sending email: {str(e)}")
-            print(traceback.format_exc())
+            logger.exception("Error rendering email for %s", volunteer.email)
             errors.append(f"Error sending email to {volunteer.email}: {str(e)}")
 
+    logger.info("Sending %d emails", len(email_messages))
+    delivery_errors = deliver_messages(email_messages)
+
+    sent_ids = []
+    for volunteer, error in zip(recipients, delivery_errors):
+        if error is None:
+            sent_ids.append(volunteer.pk)
+        else:
+            logger.error("Error sending email to %s: %s", volunteer.email, error)
+            errors.append(f"Error sending email to {volunteer.email}: {str(error)}")
+
+    # Mark notifications as sent in one statement, which skips the save signals
+    if sent_ids:
+        Volunteer.objects.filter(pk__in=sent_ids).update(notification_email_sent=True)
+        bump_versions(VOLUNTEERS_SCOPE)
+    logger.info("Sent %d emails", len(sent_ids))
+
     if errors:
         raise Exception("; ".join(errors))
 
@@ -139,6 +139,12 @@ EMAIL_USE_TLS = True
 EMAIL_HOST_USER = config('EMAIL_HOST_USER')
 EMAIL_HOST_PASSWORD = config('EMAIL_HOST_PASSWORD')
 DEFAULT_FROM_EMAIL = 'Athens Rhythm Hop <' + config('EMAIL_HOST_USER') + '>'
+# Parallel SMTP connections used when sending shift notifications
+NOTIFICATION_EMAIL_WORKERS = config('NOTIFICATION_EMAIL_WORKERS', default=4, cast=int)
+
+# How calendar changes reach open pages: 'local' within one process, or
+# 'postgres' through LISTEN/NOTIFY across all worker processes
+LIVE_UPDATES_BACKEND = config('LIVE_UPDATES_BACKEND', default='local')
 
 # Auth settings
 LOGIN_URL = 'login'
@@ -36,6 +36,15 @@ DATABASES = {
     }
 }
 
+# Cache
+# Shared between gunicorn workers, so data versions bumped by one worker are seen by all
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': BASE_DIR / 'cache',
+    }
+}
+
 # Email settings
 EMAIL_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'
 EMAIL_HOST = 'smtp.gmail.com'
@@ -0,0 +1,78 @@
+import random
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from volunteers.models import Volunteer
+from volunteers.search import autocomplete_volunteers, search_volunteers
+
+FIRST_NAMES = ['Maria', 'Eleni', 'Giorgos', 'Nikos', 'Anna', 'Dimitra', 'Kostas', 'Sofia',
+               'Yannis', 'Katerina', 'Alex', 'Chloe', 'Lucas', 'Emma', 'Noah', 'Mia']
+LAST_NAMES = ['Papadopoulos', 'Georgiou', 'Nikolaou', 'Ioannou', 'Smith', 'Martin',
+              'Dubois', 'Rossi', 'Garcia', 'Novak', 'Jensen', 'Kowalski']
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = 'Benchmark volunteer search and autocomplete on a generated dataset (rolled back afterwards)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--volunteers', type=int, default=50000, help='Number of volunteers to generate')
+        parser.add_argument('--repeat', type=int, default=5, help='Runs per query, best time is reported')
+        parser.add_argument('--seed', type=int, default=0)
+
+    def generate(self, count, seed):
+        rng = random.Random(seed)
+        volunteers = []
+        for number in range(count):
+            first_name = rng.choice(FIRST_NAMES)
+            last_name = rng.choice(LAST_NAMES)
+            volunteers.append(Volunteer(
+                first_name=first_name,
+                last_name=last_name,
+                email=f'{first_name.lower()}.{last_name.lower()}.{number}@bench.example.com',
+                phone_number=f'+30{rng.randrange(10 ** 9, 10 ** 10)}',
+            ))
+        Volunteer.objects.bulk_create(volunteers, batch_size=2000)
+
+    def time_query(self, queryset, repeat):
+        best = None
+        for _ in range(repeat):
+            started = time.perf_counter()
+            count = len(queryset.all())
+            elapsed = time.perf_counter() - started
+            best = elapsed if best is None else min(best, elapsed)
+        return best, count
+
+    def handle(self, *args, **options):
+        queries = [
+            ('search', 'mar', lambda qs, q: search_volunteers(qs, q).order_by('first_name', 'last_name', 'id')[:50]),
+            ('search', 'papadopoulos 1234', lambda qs, q: search_volunteers(qs, q)),
+            ('search', '6945', lambda qs, q: search_volunteers(qs, q).order_by('first_name', 'last_name', 'id')[:50]),
+            ('autocomplete', 'ele', lambda qs, q: autocomplete_volunteers(qs, q).order_by('first_name', 'last_name', 'id')[:10]),
+            ('autocomplete', 'sofia ros', lambda qs, q: autocomplete_volunteers(qs, q).order_by('first_name', 'last_name', 'id')[:10]),
+        ]
+
+        try:
+            with transaction.atomic():
+                started = time.perf_counter()
+                self.generate(options['volunteers'], options['seed'])
+                self.stdout.write(
+                    f'Generated {options["volunteers"]} volunteers in {time.perf_counter() - started:.1f}s '
+                    f'({connection.vendor})'
+                )
+                if connection.vendor == 'postgresql':
+                    with connection.cursor() as cursor:
+                        cursor.execute('ANALYZE volunteers_volunteer')
+
+                for mode, query, build in queries:
+                    best, count = self.time_query(build(Volunteer.objects.all(), query), options['repeat'])
+                    self.stdout.write(f'{mode:>12} {query!r:>22}: {best * 1000:8.2f} ms ({count} rows)')
+
+                raise Rollback
+        except Rollback:
+            self.stdout.write(self.style.SUCCESS('Benchmark data rolled back'))
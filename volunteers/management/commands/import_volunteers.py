@@ -1,47 +1,140 @@
+import csv
+import time
+from itertools import islice
+
 import pandas as pd
 from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+from openpyxl import load_workbook
+
 from volunteers.models import Volunteer
+from shifts.cache import SCHEDULE_SCOPE, VOLUNTEERS_SCOPE, bump_versions
 from shifts.models import Position, PositionVolunteer
 from django.contrib.auth.models import User
 
+REQUIRED_COLUMNS = ['Name', 'Surname', 'Email', 'Phone', 'Status', 'Position']
+
+
+def read_rows(file_path):
+    """Stream the rows of a CSV or XLSX file as tuples, starting with the header row."""
+    if file_path.endswith('.csv'):
+        with open(file_path, newline='', encoding='utf-8-sig') as csv_file:
+            yield from csv.reader(csv_file)
+        return
+
+    # Read-only mode streams the sheet instead of loading every cell into memory
+    workbook = load_workbook(file_path, read_only=True, data_only=True)
+    try:
+        yield from workbook.active.iter_rows(values_only=True)
+    finally:
+        workbook.close()
+
+
+def clean(value):
+    """Turn a cell into a stripped string, with empty cells as ''."""
+    if value is None or (isinstance(value, float) and pd.isna(value)):
+        return ''
+    # Phone numbers typed into a spreadsheet come back as numbers
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    return str(value).strip()
+
+
+def format_phones(phones):
+    """Normalize a batch of phone numbers to international format in one vectorized pass."""
+    phones = pd.Series(phones, dtype='string').fillna('')
+    # Remove any spaces or special characters
+    phones = phones.str.replace(r'[^\d+]', '', regex=True)
+    phones = phones.where(~phones.str.startswith('00'), '+' + phones.str[2:])
+    phones = phones.where(phones.str.startswith('+') | (phones == ''), '+30' + phones)
+    return phones.tolist()
+
+
+def batched(iterable, size):
+    iterator = iter(iterable)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
 class Command(BaseCommand):
     help = 'Import volunteers from a CSV or Excel file'
 
     def add_arguments(self, parser):
-        parser.add_argument('file_path', type=str, help='Path to the CSV or Excel file')
-
-    def format_phone(self, phone):
-        if pd.isna(phone):
-            return ''
-        
-        phone = str(phone).strip()
-        if not phone:
-            return ''
-        
-        # Remove any spaces or special characters
-        phone = ''.join(filter(lambda x: x.isdigit() or x in ['+'], phone))
-        
-        # Handle different formats
-        if phone.startswith('00'):
-            return '+' + phone[2:]
-        elif not phone.startswith('+'):
-            return '+30' + phone
-        return phone
+        parser.add_argument('file_path', type=str, help='Path to the CSV or Excel (.xlsx) file')
+        parser.add_argument('--batch-size', type=int, default=1000,
+                            help='Rows upserted per transaction')
+
+    def import_batch(self, rows, positions, system_user):
+        """Upsert one batch of rows, returning (created, updated, positions assigned)."""
+        volunteers = {}
+        position_names = {}
+        phones = format_phones([clean(row.get('Phone')) for row in rows])
+        now = timezone.now()
+
+        for row, phone in zip(rows, phones):
+            email = clean(row.get('Email'))
+            # Later rows for the same email win, like repeated update_or_create calls did
+            volunteers[email] = Volunteer(
+                email=email,
+                first_name=clean(row.get('Name')),
+                last_name=clean(row.get('Surname')),
+                phone_number=phone,
+                notes=(
+                    f"Availiability: {clean(row.get('Availiability')) or 'Not specified'}\n"
+                    f"Level: {clean(row.get('Level')) or 'Not specified'}"
+                ),
+                updated_at=now,
+            )
+            position_name = clean(row.get('Position')).lower()
+            if position_name in positions:
+                position_names.setdefault(email, set()).add(position_name)
+
+        with transaction.atomic():
+            existing = set(
+                Volunteer.objects.filter(email__in=volunteers).values_list('email', flat=True)
+            )
+            Volunteer.objects.bulk_create(
+                volunteers.values(),
+                update_conflicts=True,
+                unique_fields=['email'],
+                update_fields=['first_name', 'last_name', 'phone_number', 'notes', 'updated_at'],
+            )
+
+            volunteer_ids = dict(
+                Volunteer.objects.filter(email__in=position_names).values_list('email', 'id')
+            )
+            assignments = {
+                (volunteer_ids[email], positions[name].id)
+                for email, names in position_names.items()
+                for name in names
+            }
+            already_assigned = set(
+                PositionVolunteer.objects.filter(
+                    volunteer_id__in=volunteer_ids.values()
+                ).values_list('volunteer_id', 'position_id')
+            )
+            new_assignments = assignments - already_assigned
+            PositionVolunteer.objects.bulk_create(
+                [
+                    PositionVolunteer(volunteer_id=volunteer_id, position_id=position_id, assigned_by=system_user)
+                    for volunteer_id, position_id in new_assignments
+                ],
+                ignore_conflicts=True,
+            )
+
+        return len(volunteers) - len(existing), len(existing), len(new_assignments)
 
     def handle(self, *args, **options):
         file_path = options['file_path']
-        
+        started = time.perf_counter()
+
         try:
-            # Read file based on extension
-            if file_path.endswith('.csv'):
-                df = pd.read_csv(file_path)
-            else:
-                df = pd.read_excel(file_path)
-
-            required_columns = ['Name', 'Surname', 'Email', 'Phone', 'Status', 'Position']
-            
+            rows = read_rows(file_path)
+            columns = [clean(column) for column in next(rows, ())]
+
             # Verify required columns exist
-            missing_columns = [col for col in required_columns if col not in df.columns]
+            missing_columns = [col for col in REQUIRED_COLUMNS if col not in columns]
             if missing_columns:
                 self.stdout.write(self.style.ERROR(
                     f'Missing required columns: {", ".join(missing_columns)}'
@@ -50,65 +143,47 @@ class Command(BaseCommand):
 
             # Get all positions for matching
             positions = {p.name.lower(): p for p in Position.objects.all()}
-            
+
             # Get or create system user for position assignments
             system_user, _ = User.objects.get_or_create(
                 username='system',
                 defaults={'is_staff': True, 'is_superuser': True}
             )
 
+            def importable(rows):
+                for values in rows:
+                    row = dict(zip(columns, values))
+                    # Skip if not Status
+                    status = clean(row.get('Status'))
+                    if status and status.lower() != 'yes':
+                        continue
+                    if not clean(row.get('Email')):
+                        self.stdout.write(self.style.WARNING('Skipping row with empty email'))
+                        continue
+                    yield row
+
             # Import volunteers
+            row_count = 0
             created_count = 0
             updated_count = 0
             position_assigned_count = 0
 
-            for _, row in df.iterrows():
-                # Skip if not Status
-                if pd.notna(row['Status']) and row['Status'].lower() != 'yes':
-                    continue
-
-                # Format phone number
-                phone = self.format_phone(row['Phone'])
-
-                # Create or update volunteer
-                email = row['Email']
-                if pd.isna(email):
-                    self.stdout.write(self.style.WARNING(f'Skipping row with empty email'))
-                    continue
-
-                volunteer, created = Volunteer.objects.update_or_create(
-                    email=str(email).strip(),
-                    defaults={
-                        'first_name': str(row['Name']).strip() if pd.notna(row['Name']) else '',
-                        'last_name': str(row['Surname']).strip() if pd.notna(row['Surname']) else '',
-                        'phone_number': phone,
-                        'notes': f"Availiability: {str(row['Availiability']).strip() if pd.notna(row.get('Availiability', '')) else 'Not specified'}\nLevel: {str(row['Level']).strip() if pd.notna(row.get('Level', '')) else 'Not specified'}"
-                    }
-                )
-
-                if created:
-                    created_count += 1
-                else:
-                    updated_count += 1
-
-                # Assign position if it matches
-                if pd.notna(row['Position']):
-                    position_name = row['Position'].strip().lower()
-                    if position_name in positions:
-                        position = positions[position_name]
-                        # Create position assignment if it doesn't exist
-                        _, created = PositionVolunteer.objects.get_or_create(
-                            volunteer=volunteer,
-                            position=position,
-                            defaults={'assigned_by': system_user}
-                        )
-                        if created:
-                            position_assigned_count += 1
+            for batch in batched(importable(rows), options['batch_size']):
+                created, updated, assigned = self.import_batch(batch, positions, system_user)
+                row_count += len(batch)
+                created_count += created
+                updated_count += updated
+                position_assigned_count += assigned
+
+            # bulk_create skips the save signals that invalidate cached pages
+            bump_versions(SCHEDULE_SCOPE, VOLUNTEERS_SCOPE)
 
+            elapsed = time.perf_counter() - started
             self.stdout.write(self.style.SUCCESS(
                 f'Successfully imported {created_count} new volunteers and updated {updated_count} existing volunteers.\n'
-                f'Assigned {position_assigned_count} position assignments.'
+                f'Assigned {position_assigned_count} position assignments.\n'
+                f'Processed {row_count} rows in {elapsed:.2f}s ({row_count / max(elapsed, 1e-9):.0f} rows/sec).'
             ))
 
         except Exception as e:
-            self.stdout.write(self.style.ERROR(f'Error importing volunteers: {str(e)}'))
\ No newline at end of file
+            self.stdout.write(self.style.ERROR(f'Error importing volunteers: {str(e)}'))
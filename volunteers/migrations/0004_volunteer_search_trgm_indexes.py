@@ -0,0 +1,34 @@
+from django.db import migrations
+
+# The fields volunteers.search matched when this migration was written
+SEARCH_FIELDS = ('first_name', 'last_name', 'email', 'phone_number')
+
+
+def create_search_indexes(apps, schema_editor):
+    # Trigram indexes are PostgreSQL only; other databases keep scanning the table
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    for field in SEARCH_FIELDS:
+        schema_editor.execute(
+            f'CREATE INDEX IF NOT EXISTS volunteers_volunteer_{field}_trgm '
+            f'ON volunteers_volunteer USING gin (UPPER({field}::text) gin_trgm_ops)'
+        )
+
+
+def drop_search_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for field in SEARCH_FIELDS:
+        schema_editor.execute(f'DROP INDEX IF EXISTS volunteers_volunteer_{field}_trgm')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('volunteers', '0003_volunteer_confirmation_token_volunteer_has_confirmed'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_indexes, drop_search_indexes),
+    ]
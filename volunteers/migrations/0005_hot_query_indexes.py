@@ -0,0 +1,25 @@
+# Generated by Django 5.2.18 on 2026-10-18 15:35
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('volunteers', '0004_volunteer_search_trgm_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='volunteer',
+            index=models.Index(fields=['confirmation_token'], name='volunteers__confirm_298d86_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='volunteer',
+            index=models.Index(condition=models.Q(('notification_email_sent', False)), fields=['id'], name='volunteer_unnotified_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='volunteer',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['first_name', 'last_name', 'id'], name='volunteer_active_name_idx'),
+        ),
+    ]
@@ -33,4 +33,20 @@ class Volunteer(models.Model):
         return self.confirmation_token
 
     class Meta:
-        ordering = ['first_name', 'last_name']
\ No newline at end of file
+        ordering = ['first_name', 'last_name']
+        indexes = [
+            # Shift confirmation links look volunteers up by token
+            models.Index(fields=['confirmation_token']),
+            # Partial indexes only hold the rows the hot filters select: the
+            # volunteers still to notify, and the active roster in list order
+            models.Index(
+                fields=['id'],
+                condition=models.Q(notification_email_sent=False),
+                name='volunteer_unnotified_idx',
+            ),
+            models.Index(
+                fields=['first_name', 'last_name', 'id'],
+                condition=models.Q(is_active=True),
+                name='volunteer_active_name_idx',
+            ),
+        ]
\ No newline at end of file
@@ -0,0 +1,29 @@
+from functools import reduce
+from operator import or_
+
+from django.db.models import Q
+
+# Fields matched by the volunteer search. On PostgreSQL each one has a pg_trgm
+# GIN index on UPPER(field), which serves both icontains and istartswith lookups
+SEARCH_FIELDS = ("first_name", "last_name", "email", "phone_number")
+
+# Fields matched by autocomplete, where a prefix of the name or email is typed
+AUTOCOMPLETE_FIELDS = ("first_name", "last_name", "email")
+
+
+def _match_any(fields, lookup, term):
+    return reduce(or_, (Q(**{f"{field}__{lookup}": term}) for field in fields))
+
+
+def search_volunteers(volunteers, query):
+    """Filter volunteers so that every word of the query appears in one of the search fields."""
+    for term in query.split():
+        volunteers = volunteers.filter(_match_any(SEARCH_FIELDS, "icontains", term))
+    return volunteers
+
+
+def autocomplete_volunteers(volunteers, query):
+    """Filter volunteers so that every word of the query starts a name or the email."""
+    for term in query.split():
+        volunteers = volunteers.filter(_match_any(AUTOCOMPLETE_FIELDS, "istartswith", term))
+    return volunteers
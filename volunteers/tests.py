@@ -1,3 +1,310 @@
+import csv
+import os
+import tempfile
+from datetime import date, time
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from openpyxl import Workbook
+
+from events.models import Event, Location
+from shifts.models import Position, PositionVolunteer, Shift, ShiftVolunteer
+
+from . import views
+from .models import Volunteer
+
+
+class VolunteerDashboardStatsTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        event = Event.objects.create(
+            name="Festival", start_date=date(2025, 4, 30), end_date=date(2025, 5, 2)
+        )
+        self.position = Position.objects.create(name="Floor", event=event)
+        self.ada = Volunteer.objects.create(
+            first_name="Ada", last_name="Lovelace", email="ada@example.com", has_confirmed=True
+        )
+        Volunteer.objects.create(
+            first_name="Alan", last_name="Turing", email="alan@example.com", is_active=False
+        )
+        PositionVolunteer.objects.create(position=self.position, volunteer=self.ada)
+        self.client.force_login(User.objects.create_user("coordinator"))
+        self.url = reverse("volunteer_list")
+
+    def test_counts(self):
+        context = self.client.get(self.url).context
+        self.assertEqual(context["total_volunteers"], 2)
+        self.assertEqual(context["active_volunteers"], 1)
+        self.assertEqual(context["assigned_volunteers"], 1)
+        self.assertEqual(context["unassigned_volunteers"], 1)
+        self.assertEqual(context["confirmed_volunteers"], 1)
+        self.assertEqual(context["position_stats"][0]["volunteer_count"], 1)
+        self.assertEqual(context["position_stats"][0]["confirmed_count"], 1)
+
+    def test_counts_are_cached_until_volunteers_change(self):
+        with CaptureQueriesContext(connection) as first:
+            self.client.get(self.url, {"search": "ada"})
+        with CaptureQueriesContext(connection) as second:
+            self.client.get(self.url, {"search": "ada"})
+        # The status aggregate and position stats are served from the cache
+        self.assertEqual(len(second), len(first) - 2)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.ada.available_positions.clear()
+        context = self.client.get(self.url, {"search": "ada"}).context
+        self.assertEqual(context["assigned_volunteers"], 0)
+        self.assertEqual(context["position_stats"][0]["volunteer_count"], 0)
+
+
+class VolunteerListPaginationTests(TestCase):
+    def setUp(self):
+        self.client.force_login(User.objects.create_user("coordinator"))
+        self.url = reverse("volunteer_list")
+        for number in range(2 * views.VOLUNTEER_LIST_PAGE_SIZE + 5):
+            Volunteer.objects.create(
+                # Repeated names make the id the deciding part of the cursor
+                first_name=f"Name{number % 7}",
+                last_name="Test",
+                email=f"v{number}@example.com",
+                is_active=number % 2 == 0,
+            )
+
+    def _collect(self, params):
+        response = self.client.get(self.url, params)
+        volunteers = list(response.context["volunteers"])
+        while response.context["next_cursor"]:
+            response = self.client.get(
+                self.url, {**params, "cursor": response.context["next_cursor"]}, HTTP_HX_REQUEST="true"
+            )
+            self.assertTemplateUsed(response, "volunteers/partials/volunteer_list_rows.html")
+            volunteers.extend(response.context["volunteers"])
+        return volunteers
+
+    def test_pages_cover_all_volunteers_in_order(self):
+        volunteers = self._collect({})
+        self.assertEqual(
+            [volunteer.id for volunteer in volunteers],
+            list(Volunteer.objects.order_by("first_name", "last_name", "id").values_list("id", flat=True)),
+        )
+
+    def test_filters_apply_to_every_page(self):
+        volunteers = self._collect({"status": "active"})
+        self.assertEqual(len(volunteers), Volunteer.objects.filter(is_active=True).count())
+
+    def test_invalid_cursor(self):
+        response = self.client.get(self.url, {"cursor": "not-a-cursor"})
+        self.assertEqual(response.status_code, 400)
+
+
+class VolunteerSearchTests(TestCase):
+    def setUp(self):
+        event = Event.objects.create(
+            name="Festival", start_date=date(2025, 4, 30), end_date=date(2025, 5, 2)
+        )
+        location = Location.objects.create(name="Stage", event=event)
+        position = Position.objects.create(name="Floor", event=event)
+        self.shift = Shift.objects.create(
+            event=event,
+            location=location,
+            position=position,
+            date=date(2025, 5, 1),
+            start_time=time(9),
+            end_time=time(12),
+        )
+        self.ada = Volunteer.objects.create(
+            first_name="Ada", last_name="Lovelace", email="ada@example.com", phone_number="+306900000001"
+        )
+        self.adam = Volunteer.objects.create(
+            first_name="Adam", last_name="Smith", email="adam@example.com"
+        )
+        self.grace = Volunteer.objects.create(
+            first_name="Grace", last_name="Hopper", email="grace@adamant.example.com"
+        )
+        PositionVolunteer.objects.create(position=position, volunteer=self.ada)
+        PositionVolunteer.objects.create(position=position, volunteer=self.adam)
+        self.client.force_login(User.objects.create_user("coordinator"))
+
+    def _search(self, query):
+        response = self.client.get(reverse("volunteer_list"), {"search": query})
+        return [volunteer.first_name for volunteer in response.context["volunteers"]]
+
+    def _autocomplete(self, query, **params):
+        response = self.client.get(reverse("volunteer_autocomplete"), {"q": query, **params})
+        return [result["name"] for result in response.json()["results"]]
+
+    def test_search_matches_any_field(self):
+        self.assertEqual(self._search("ada"), ["Ada", "Adam", "Grace"])
+        self.assertEqual(self._search("0000001"), ["Ada"])
+
+    def test_search_matches_every_word(self):
+        self.assertEqual(self._search("ada love"), ["Ada"])
+
+    def test_autocomplete_matches_prefixes(self):
+        self.assertEqual(self._autocomplete("ada"), ["Ada Lovelace", "Adam Smith"])
+        self.assertEqual(self._autocomplete("ada s"), ["Adam Smith"])
+        self.assertEqual(self._autocomplete("  "), [])
+
+    def test_autocomplete_for_shift_skips_assigned_and_unqualified(self):
+        ShiftVolunteer.objects.create(shift=self.shift, volunteer=self.ada)
+        self.assertEqual(self._autocomplete("a", shift=self.shift.id), ["Adam Smith"])
+
+    def test_autocomplete_for_shift_returns_every_match(self):
+        for number in range(views.AUTOCOMPLETE_LIMIT):
+            volunteer = Volunteer.objects.create(
+                first_name=f"Adele{number:02}", last_name="Test", email=f"adele{number}@example.com"
+            )
+            PositionVolunteer.objects.create(position=self.shift.position, volunteer=volunteer)
+
+        self.assertEqual(len(self._autocomplete("ad")), views.AUTOCOMPLETE_LIMIT)
+        # The assign modal hides every candidate missing from the results
+        self.assertEqual(len(self._autocomplete("ad", shift=self.shift.id)), views.AUTOCOMPLETE_LIMIT + 2)
+
+
+class VolunteerScheduleTests(TestCase):
+    def setUp(self):
+        self.event = Event.objects.create(
+            name="Festival", start_date=date(2025, 4, 30), end_date=date(2025, 5, 2)
+        )
+        location = Location.objects.create(name="Stage", event=self.event)
+        position = Position.objects.create(name="Floor", event=self.event)
+        self.shifts = [
+            Shift.objects.create(
+                event=self.event,
+                location=location,
+                position=position,
+                date=day,
+                start_time=time(9),
+                end_time=time(12),
+                max_volunteers=100,
+            )
+            for day in self.event.get_dates()
+        ]
+        self.client.force_login(User.objects.create_user("coordinator"))
+        self.url = reverse("volunteer_schedule")
+
+    def _add_volunteers(self, count):
+        for _ in range(count):
+            number = Volunteer.objects.count()
+            volunteer = Volunteer.objects.create(
+                first_name=f"Volunteer{number:03}", last_name="Test", email=f"v{number}@example.com"
+            )
+            for shift in self.shifts[::2]:
+                ShiftVolunteer.objects.create(shift=shift, volunteer=volunteer)
+
+    def _count_queries(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        return len(queries)
+
+    def test_query_count_does_not_grow_with_volunteers(self):
+        self._add_volunteers(2)
+        baseline = self._count_queries()
+
+        self._add_volunteers(20)
+        self.assertEqual(self._count_queries(), baseline)
+
+    def test_schedule_matrix(self):
+        self._add_volunteers(1)
+
+        volunteer = self.client.get(self.url).context["volunteers"][0]
+        self.assertEqual(volunteer.schedule, [[self.shifts[0]], [], [self.shifts[2]]])
+        self.assertEqual(volunteer.shift_count, 2)
+
+    def test_schedule_skips_assignments_without_a_shift(self):
+        self._add_volunteers(1)
+        ShiftVolunteer.objects.create(shift=None, volunteer=Volunteer.objects.get())
+
+        volunteer = self.client.get(self.url).context["volunteers"][0]
+        self.assertEqual(volunteer.schedule, [[self.shifts[0]], [], [self.shifts[2]]])
+
+    def test_next_page_is_loaded_by_htmx(self):
+        self._add_volunteers(views.SCHEDULE_PAGE_SIZE + 1)
+
+        response = self.client.get(self.url)
+        self.assertContains(response, "?page=2")
+
+        response = self.client.get(self.url, {"page": 2}, HTTP_HX_REQUEST="true")
+        self.assertTemplateUsed(response, "volunteers/partials/volunteer_schedule_rows.html")
+        self.assertEqual(len(response.context["volunteers"]), 1)
+        self.assertNotContains(response, "?page=3")
+
+
+class ImportVolunteersTests(TestCase):
+    header = ["Name", "Surname", "Email", "Phone", "Status", "Position", "Level"]
+
+    def setUp(self):
+        event = Event.objects.create(
+            name="Festival", start_date=date(2025, 4, 30), end_date=date(2025, 5, 2)
+        )
+        self.floor = Position.objects.create(name="Floor", event=event)
+        self.existing = Volunteer.objects.create(
+            first_name="Old", last_name="Name", email="ada@example.com", has_confirmed=True
+        )
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+
+    def _write_csv(self, rows):
+        path = os.path.join(self.directory.name, "volunteers.csv")
+        with open(path, "w", newline="") as csv_file:
+            writer = csv.writer(csv_file)
+            writer.writerow(self.header)
+            writer.writerows(rows)
+        return path
+
+    def _import(self, path, *args):
+        out = StringIO()
+        call_command("import_volunteers", path, *args, stdout=out)
+        return out.getvalue()
+
+    def test_import_csv(self):
+        path = self._write_csv([
+            ["Ada", "Lovelace", "ada@example.com", "0030 6900 000001", "Yes", "floor", "Advanced"],
+            ["Alan", "Turing", "alan@example.com", "6900000002", "", "Unknown", ""],
+            ["Grace", "Hopper", "grace@example.com", "+306900000003", "No", "Floor", ""],
+            ["No", "Email", "", "", "Yes", "Floor", ""],
+        ])
+
+        output = self._import(path, "--batch-size", "1")
+
+        self.assertIn("1 new volunteers and updated 1 existing", output)
+        self.assertIn("rows/sec", output)
+        self.assertEqual(Volunteer.objects.count(), 2)
+
+        ada = Volunteer.objects.get(email="ada@example.com")
+        self.assertEqual(ada.pk, self.existing.pk)
+        self.assertEqual((ada.first_name, ada.phone_number), ("Ada", "+306900000001"))
+        self.assertEqual(ada.notes, "Availiability: Not specified\nLevel: Advanced")
+        self.assertTrue(ada.has_confirmed)
+        self.assertEqual(list(ada.available_positions.all()), [self.floor])
+        self.assertEqual(Volunteer.objects.get(email="alan@example.com").phone_number, "+306900000002")
+
+        # Importing again updates in place and doesn't duplicate position assignments
+        output = self._import(path)
+        self.assertIn("0 new volunteers and updated 2 existing", output)
+        self.assertIn("Assigned 0 position assignments", output)
+
+    def test_import_xlsx(self):
+        workbook = Workbook()
+        workbook.active.append(self.header)
+        workbook.active.append(["Alan", "Turing", "alan@example.com", 6900000002, "yes", "Floor", None])
+        path = os.path.join(self.directory.name, "volunteers.xlsx")
+        workbook.save(path)
+
+        self._import(path)
+
+        alan = Volunteer.objects.get(email="alan@example.com")
+        self.assertEqual(alan.phone_number, "+306900000002")
+        self.assertEqual(list(alan.available_positions.all()), [self.floor])
 
-# Create your tests here.
+    def test_missing_columns(self):
+        path = os.path.join(self.directory.name, "volunteers.csv")
+        with open(path, "w") as csv_file:
+            csv_file.write("Name,Email\n")
+        self.assertIn("Missing required columns: Surname, Phone, Status, Position", self._import(path))
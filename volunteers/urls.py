@@ -4,9 +4,12 @@ from . import views
 urlpatterns = [
     path('volunteers/', views.volunteer_list, name='volunteer_list'),
     path('volunteers/create/', views.volunteer_create, name='volunteer_create'),
+    path('volunteers/autocomplete/', views.volunteer_autocomplete, name='volunteer_autocomplete'),
     path('volunteers/<int:pk>/', views.volunteer_update, name='volunteer_update'),
     path('volunteers/<int:pk>/delete/', views.volunteer_delete, name='volunteer_delete'),
     path('volunteers/<int:volunteer_id>/send-notification/', views.send_volunteer_notification, name='send_volunteer_notification'),
+    path('volunteers/notify/', views.notify_volunteers, name='notify_volunteers'),
+    path('volunteers/notify/<int:job_id>/', views.notification_progress, name='notification_progress'),
     path('volunteers/confirm/<str:token>/', views.confirm_shifts, name='confirm_shifts'),
     path('volunteers/thank-you/', views.confirmation_thank_you, name='confirmation_thank_you'),
     path('schedule/', views.volunteer_schedule, name='volunteer_schedule'),
@@ -1,24 +1,109 @@
+import json
+from collections import defaultdict
 from datetime import datetime, timedelta
 
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
-from django.db.models import Case, Count, F, FloatField, IntegerField, Max, Min, Q, Sum, When
-from django.db.models.functions import Coalesce, ExtractHour, ExtractMinute
-from django.http import HttpResponse, JsonResponse
+from django.core.cache import cache
+from django.core.paginator import Paginator
+from django.db.models import (
+    Count,
+    Exists,
+    F,
+    FloatField,
+    Max,
+    Min,
+    OuterRef,
+    Q,
+    Sum,
+)
+from django.db.models.functions import Coalesce
+from django.http import HttpResponse, HttpResponseBadRequest, JsonResponse
 from django.shortcuts import get_object_or_404, redirect, render
 from django.urls import reverse
 from django.utils import timezone
+from django.utils.http import urlsafe_base64_decode, urlsafe_base64_encode
 from django.views.decorators.csrf import csrf_protect
 from django.views.decorators.http import require_http_methods
 
 from events.models import Event
-from shifts.models import Position, Shift, ShiftVolunteer
+from shifts.cache import VOLUNTEERS_SCOPE, get_versions, versions_etag
+from shifts.models import NotificationJob, Position, PositionVolunteer, Shift, ShiftVolunteer
+from shifts.notifications import enqueue_notifications
 
 from .forms import VolunteerForm
 from .models import Volunteer
+from .search import autocomplete_volunteers, search_volunteers
 
 # Create your views here.
 
+# Dashboard stats are keyed by data version, so this only bounds memory use
+DASHBOARD_CACHE_TIMEOUT = 60 * 60 * 24
+
+# Rows rendered per page of the volunteer list, fetched with a keyset cursor
+VOLUNTEER_LIST_PAGE_SIZE = 50
+
+# Suggestions returned by the volunteer autocomplete
+AUTOCOMPLETE_LIMIT = 10
+
+# Rows rendered per page of the schedule; further pages load as the table is scrolled
+SCHEDULE_PAGE_SIZE = 50
+
+
+def _encode_cursor(volunteer):
+    """Opaque keyset cursor pointing just after the given volunteer."""
+    payload = json.dumps([volunteer.first_name, volunteer.last_name, volunteer.pk])
+    return urlsafe_base64_encode(payload.encode())
+
+
+def _decode_cursor(cursor):
+    """Return the (first_name, last_name, pk) a cursor points after, or raise ValueError."""
+    try:
+        first_name, last_name, pk = json.loads(urlsafe_base64_decode(cursor))
+    except (TypeError, ValueError):
+        raise ValueError(f"Invalid cursor: {cursor!r}")
+    if not isinstance(pk, int):
+        raise ValueError(f"Invalid cursor: {cursor!r}")
+    return first_name, last_name, pk
+
+
+def _volunteer_dashboard_stats():
+    """
+    Status counts and per-position stats for the volunteer list.
+
+    The status counts come from a single conditional aggregate, and the result
+    is cached per volunteer data version, so filtering and searching the list
+    does not recount the whole table.
+    """
+    versions = get_versions(VOLUNTEERS_SCOPE)
+    cache_key = f"volunteers:dashboard:{versions_etag(versions)}"
+    stats = cache.get(cache_key)
+    if stats is not None:
+        return stats
+
+    stats = (
+        Volunteer.objects.annotate(
+            has_positions=Exists(PositionVolunteer.objects.filter(volunteer=OuterRef("pk")))
+        )
+        .aggregate(
+            total_volunteers=Count("pk"),
+            active_volunteers=Count("pk", filter=Q(is_active=True)),
+            assigned_volunteers=Count("pk", filter=Q(has_positions=True)),
+            confirmed_volunteers=Count("pk", filter=Q(has_confirmed=True)),
+        )
+    )
+    stats["unassigned_volunteers"] = stats["total_volunteers"] - stats["assigned_volunteers"]
+
+    stats["position_stats"] = list(
+        Position.objects.annotate(
+            volunteer_count=Count("volunteers"),
+            confirmed_count=Count("volunteers", filter=Q(volunteers__has_confirmed=True))
+        ).values("id", "name", "color", "volunteer_count", "confirmed_count")
+    )
+
+    cache.set(cache_key, stats, DASHBOARD_CACHE_TIMEOUT)
+    return stats
+
 
 @login_required
 def volunteer_list(request):
@@ -32,12 +117,7 @@ def volunteer_list(request):
 
     # Apply search filter
     if search_query:
-        volunteers = volunteers.filter(
-            Q(first_name__icontains=search_query)
-            | Q(last_name__icontains=search_query)
-            | Q(email__icontains=search_query)
-            | Q(phone_number__icontains=search_query)
-        )
+        volunteers = search_volunteers(volunteers, search_query)
 
     # Apply position filter
     if position_filter:
@@ -54,64 +134,61 @@ def volunteer_list(request):
         elif status_filter == "unassigned":
             volunteers = volunteers.filter(available_positions__isnull=True)
 
-    # Get total volunteers and status counts
-    total_volunteers = Volunteer.objects.count()
-    active_volunteers = Volunteer.objects.filter(is_active=True).count()
-    assigned_volunteers = (
-        Volunteer.objects.filter(available_positions__isnull=False).distinct().count()
+    # Fetch one page of volunteers after the cursor, in a stable keyset order
+    cursor = request.GET.get("cursor")
+    if cursor:
+        try:
+            first_name, last_name, pk = _decode_cursor(cursor)
+        except ValueError:
+            return HttpResponseBadRequest("Invalid cursor")
+        volunteers = volunteers.filter(
+            Q(first_name__gt=first_name)
+            | Q(first_name=first_name, last_name__gt=last_name)
+            | Q(first_name=first_name, last_name=last_name, pk__gt=pk)
+        )
+    page_ids = list(
+        volunteers.order_by("first_name", "last_name", "id").values_list("id", flat=True)[
+            : VOLUNTEER_LIST_PAGE_SIZE + 1
+        ]
+    )
+    has_next = len(page_ids) > VOLUNTEER_LIST_PAGE_SIZE
+    page_ids = page_ids[:VOLUNTEER_LIST_PAGE_SIZE]
+
+    # Add annotations for the current page only
+    page_volunteers = list(
+        Volunteer.objects.filter(id__in=page_ids)
+        .prefetch_related("available_positions")
+        .annotate(
+            total_shifts=Count("shifts"),
+            total_hours=Sum(F("shifts__duration_minutes") / 60.0, output_field=FloatField()),
+        )
+        .order_by("first_name", "last_name", "id")
     )
-    unassigned_volunteers = Volunteer.objects.filter(
-        available_positions__isnull=True
-    ).count()
-    confirmed_volunteers = Volunteer.objects.filter(has_confirmed=True).count()
-
-    # Get position stats
-    position_stats = Position.objects.annotate(
-        volunteer_count=Count("volunteers"),
-        confirmed_count=Count("volunteers", filter=Q(volunteers__has_confirmed=True))
-    ).values("id", "name", "color", "volunteer_count", "confirmed_count")
-
-    # Add annotations to filtered queryset
-    volunteers = volunteers.annotate(
-        total_shifts=Count("shifts"),
-        total_hours=Sum(
-            Case(
-                # When end_time is less than start_time, it means the shift crosses midnight
-                When(
-                    shifts__end_time__lt=F('shifts__start_time'),
-                    then=(
-                        # For shifts crossing midnight: add 24 hours to end_time before calculating
-                        (ExtractHour("shifts__end_time") + 24) * 60
-                        + ExtractMinute("shifts__end_time")
-                        - ExtractHour("shifts__start_time") * 60
-                        - ExtractMinute("shifts__start_time")
-                    )
-                ),
-                # Normal case when shift doesn't cross midnight
-                default=(
-                    ExtractHour("shifts__end_time") * 60
-                    + ExtractMinute("shifts__end_time")
-                    - ExtractHour("shifts__start_time") * 60
-                    - ExtractMinute("shifts__start_time")
-                ),
-                output_field=IntegerField(),
-            ) / 60.0,
-            output_field=FloatField(),
-        ),
-    ).order_by("first_name", "last_name")
+
+    next_cursor = _encode_cursor(page_volunteers[-1]) if has_next else None
+    next_query = request.GET.copy()
+    next_query["cursor"] = next_cursor or ""
+
+    context = {
+        "volunteers": page_volunteers,
+        "positions": Position.objects.all(),
+        "next_cursor": next_cursor,
+        "next_query": next_query.urlencode(),
+    }
+
+    # Infinite scroll requests only need the next batch of rows
+    if request.headers.get("HX-Request"):
+        return render(request, "volunteers/partials/volunteer_list_rows.html", context)
+
+    # Get total volunteers, status counts and position stats
+    dashboard_stats = _volunteer_dashboard_stats()
 
     return render(
         request,
         "volunteers/volunteer_list.html",
         {
-            "volunteers": volunteers,
-            "total_volunteers": total_volunteers,
-            "active_volunteers": active_volunteers,
-            "assigned_volunteers": assigned_volunteers,
-            "unassigned_volunteers": unassigned_volunteers,
-            "confirmed_volunteers": confirmed_volunteers,
-            "position_stats": position_stats,
-            "positions": Position.objects.all(),
+            **context,
+            **dashboard_stats,
             "search_query": search_query,
             "position_filter": position_filter,
             "status_filter": status_filter,
@@ -119,6 +196,40 @@ def volunteer_list(request):
     )
 
 
+@login_required
+def volunteer_autocomplete(request):
+    """
+    Suggest volunteers whose name or email starts with the typed words.
+
+    With a ``shift`` parameter, only active volunteers who can work the shift's
+    position and are not yet assigned to it are suggested. Those are the
+    candidates the assign modal has already rendered and filters down to the
+    matches, so every match is returned rather than the first few.
+    """
+    query = request.GET.get("q", "").strip()
+    if not query:
+        return JsonResponse({"results": []})
+
+    volunteers = autocomplete_volunteers(Volunteer.objects.all(), query).order_by(
+        "first_name", "last_name", "id"
+    )
+
+    shift_id = request.GET.get("shift")
+    if shift_id:
+        shift = get_object_or_404(Shift, id=shift_id)
+        volunteers = volunteers.filter(
+            available_positions=shift.position, is_active=True
+        ).exclude(shifts=shift)
+    else:
+        volunteers = volunteers[:AUTOCOMPLETE_LIMIT]
+
+    results = [
+        {"id": pk, "name": f"{first_name} {last_name}", "email": email}
+        for pk, first_name, last_name, email in volunteers.values_list("id", "first_name", "last_name", "email")
+    ]
+    return JsonResponse({"results": results})
+
+
 @login_required
 def volunteer_create(request):
     if request.method == "POST":
@@ -210,57 +321,46 @@ def volunteer_schedule(request):
     else:
         event_dates = []
 
-    # Get active volunteers with their shifts and stats
+    # Get active volunteers with their stats, one page at a time
     volunteers = (
         Volunteer.objects.filter(is_active=True)
-        .prefetch_related("shifts")
         .annotate(
             shift_count=Count("shifts"),
-            total_hours=Sum(
-                Case(
-                    # When end_time is less than start_time, it means the shift crosses midnight
-                    When(
-                        shifts__end_time__lt=F('shifts__start_time'),
-                        then=(
-                            # For shifts crossing midnight: add 24 hours to end_time before calculating
-                            (ExtractHour("shifts__end_time") + 24) * 60
-                            + ExtractMinute("shifts__end_time")
-                            - ExtractHour("shifts__start_time") * 60
-                            - ExtractMinute("shifts__start_time")
-                        )
-                    ),
-                    # Normal case when shift doesn't cross midnight
-                    default=(
-                        ExtractHour("shifts__end_time") * 60
-                        + ExtractMinute("shifts__end_time")
-                        - ExtractHour("shifts__start_time") * 60
-                        - ExtractMinute("shifts__start_time")
-                    ),
-                    output_field=IntegerField(),
-                ) / 60.0,
-                output_field=FloatField(),
-            ),
+            total_hours=Sum(F("shifts__duration_minutes") / 60.0, output_field=FloatField()),
+        )
+        .order_by("first_name", "last_name", "id")
+    )
+    page = Paginator(volunteers, SCHEDULE_PAGE_SIZE).get_page(request.GET.get("page"))
+    page_volunteers = list(page.object_list)
+
+    # Build the volunteer x date matrix for this page from a single ordered query
+    shifts_by_volunteer = defaultdict(lambda: defaultdict(list))
+    assignments = (
+        ShiftVolunteer.objects.filter(
+            volunteer_id__in=[volunteer.id for volunteer in page_volunteers], shift__isnull=False
         )
-        .order_by("first_name", "last_name")
+        .select_related("shift__position", "shift__location")
+        .order_by("volunteer_id", "shift__date", "shift__start_time")
     )
+    for assignment in assignments:
+        shift = assignment.shift
+        shifts_by_volunteer[assignment.volunteer_id][shift.date].append(shift)
 
-    # Create a lookup of shifts by volunteer and date
-    shifts_by_volunteer = {}
-    for volunteer in volunteers:
-        shifts_by_volunteer[volunteer.id] = {
-            date: list(volunteer.shifts.filter(date=date).order_by("start_time"))
-            for date in event_dates
-        }
+    for volunteer in page_volunteers:
+        volunteer_shifts = shifts_by_volunteer[volunteer.id]
+        volunteer.schedule = [volunteer_shifts.get(date, []) for date in event_dates]
 
-    return render(
-        request,
-        "volunteers/volunteer_schedule.html",
-        {
-            "volunteers": volunteers,
-            "days": event_dates,
-            "shifts_by_volunteer": shifts_by_volunteer,
-        },
-    )
+    context = {
+        "volunteers": page_volunteers,
+        "page": page,
+        "days": event_dates,
+    }
+
+    # Infinite scroll requests only need the next batch of rows
+    if request.headers.get("HX-Request"):
+        return render(request, "volunteers/partials/volunteer_schedule_rows.html", context)
+
+    return render(request, "volunteers/volunteer_schedule.html", context)
 
 
 @login_required
@@ -304,6 +404,33 @@ def send_volunteer_notification(request, volunteer_id):
         return JsonResponse({"status": "error", "message": str(e)}, status=500)
 
 
+@login_required
+@require_http_methods(["POST"])
+def notify_volunteers(request):
+    """Queue shift notification emails for every volunteer who hasn't been notified."""
+    event = Event.objects.filter(end_date__gte=timezone.now()).first()
+    if not event:
+        return HttpResponseBadRequest("No active event found")
+
+    job = enqueue_notifications(event, request.build_absolute_uri("/"), created_by=request.user)
+    return render(
+        request,
+        "volunteers/partials/notification_progress.html",
+        {"job": job, "progress": job.get_progress()},
+    )
+
+
+@login_required
+def notification_progress(request, job_id):
+    """Polled by HTMX to show how far the send_notifications worker got with a job."""
+    job = get_object_or_404(NotificationJob, pk=job_id)
+    return render(
+        request,
+        "volunteers/partials/notification_progress.html",
+        {"job": job, "progress": job.get_progress()},
+    )
+
+
 def confirm_shifts(request, token):
     """Handle volunteer shift confirmation via email link."""
     try: